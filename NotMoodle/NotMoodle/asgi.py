@@ -3,14 +3,27 @@ ASGI config for NotMoodle project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server so the async assistant endpoint can wait on the
+model without holding a worker, e.g.::
+
+    uvicorn NotMoodle.asgi:application --workers 2
+
+Under WSGI (including ``manage.py runserver``) Django has to collect a
+streamed assistant answer before sending any of it. With DEBUG on, static
+files are served here too, as runserver would.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "NotMoodle.settings")
 
 application = get_asgi_application()
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
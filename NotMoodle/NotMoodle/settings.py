@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import json
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -55,6 +56,7 @@ INSTALLED_APPS = [
     "course_management",
     "classroom_and_grading",
     "assist",  # NotMoodle AI Assistant
+    "jobs",  # DB-backed background job queue (manage.py run_worker)
 ]
 
 MIDDLEWARE = [
@@ -88,6 +90,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "NotMoodle.wsgi.application"
+ASGI_APPLICATION = "NotMoodle.asgi.application"
 
 
 # Database
@@ -271,10 +274,133 @@ SOCIAL_AUTH_DISCONNECT_ERROR_URL = "/404/"
 
 MEDIA_RUL = "/meida"
 
+# Caches
+# The rate limiter's counters and students' profile context must be visible to every
+# worker process (and invalidated in all of them), so their aliases use Redis when
+# AI_CACHE_REDIS_URL is set (needs the redis package) and the database otherwise
+# (the tables are created by assist's migrations)
+def _shared_cache(table):
+    if os.getenv("AI_CACHE_REDIS_URL"):
+        return {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": os.getenv("AI_CACHE_REDIS_URL")}
+    return {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": table}
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "rate_limit": _shared_cache("assist_rate_limit_cache"),
+    "profile_context": _shared_cache("assist_profile_context_cache"),
+}
+
 # ---- NotMoodle AI Assistant (Ollama + RAG) ----
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 AI_CHAT_MODEL = os.getenv("AI_CHAT_MODEL", "llama3.1:latest")
 AI_EMBED_MODEL = os.getenv("AI_EMBED_MODEL", "nomic-embed-text")
 AI_DAILY_QUESTION_LIMIT = int(os.getenv("AI_DAILY_QUESTION_LIMIT", "100"))
+# The limit applies over a rolling window counted in the cache (assist.rate_limit)
+AI_RATE_LIMIT_WINDOW = int(os.getenv("AI_RATE_LIMIT_WINDOW", str(24 * 3600)))  # seconds
+AI_RATE_LIMIT_BUCKETS = int(os.getenv("AI_RATE_LIMIT_BUCKETS", "24"))  # window granularity
+# Cache alias holding the counters; it must be shared by every worker process (Redis or the database)
+AI_RATE_LIMIT_CACHE = "rate_limit"
+# Pooled HTTP client for Ollama (assist.http_client): pool size, keep-alive and per-operation timeouts
+OLLAMA_HTTP_MAX_CONNECTIONS = int(os.getenv("OLLAMA_HTTP_MAX_CONNECTIONS", "20"))
+OLLAMA_HTTP_MAX_KEEPALIVE = int(os.getenv("OLLAMA_HTTP_MAX_KEEPALIVE", "10"))
+OLLAMA_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_HTTP_KEEPALIVE_EXPIRY", "30"))
+OLLAMA_HTTP_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_HTTP_CONNECT_TIMEOUT", "5"))
+OLLAMA_HTTP_TIMEOUTS = {
+    "embed": float(os.getenv("OLLAMA_EMBED_TIMEOUT", "60")),
+    "chat": float(os.getenv("OLLAMA_CHAT_TIMEOUT", "120")),
+}
+# Embedding throughput: texts per /api/embed request, parallel requests, retry policy
+AI_EMBED_BATCH_SIZE = int(os.getenv("AI_EMBED_BATCH_SIZE", "32"))
+AI_EMBED_CONCURRENCY = int(os.getenv("AI_EMBED_CONCURRENCY", "4"))
+AI_EMBED_MAX_RETRIES = int(os.getenv("AI_EMBED_MAX_RETRIES", "3"))
+AI_EMBED_RETRY_BACKOFF = float(os.getenv("AI_EMBED_RETRY_BACKOFF", "0.5"))
+# Persistent embedding cache size (LRU-evicted); 0 disables it
+AI_EMBED_CACHE_MAX_ENTRIES = int(os.getenv("AI_EMBED_CACHE_MAX_ENTRIES", "200000"))
+# Seconds before a hit refreshes an entry's LRU timestamp; puts between size checks and evictions
+AI_EMBED_CACHE_TOUCH_INTERVAL = int(os.getenv("AI_EMBED_CACHE_TOUCH_INTERVAL", "3600"))
+AI_EMBED_CACHE_EVICT_EVERY = int(os.getenv("AI_EMBED_CACHE_EVICT_EVERY", "100"))
+# Chunk size for RAG indexing (assist.chunking), in tokens of AI_TOKENIZER
+AI_CHUNK_TOKENS = int(os.getenv("AI_CHUNK_TOKENS", "256"))
+AI_CHUNK_OVERLAP_TOKENS = int(os.getenv("AI_CHUNK_OVERLAP_TOKENS", "40"))
+# Assignment PDFs/attachments in the RAG index (assist.pdf_text; needs the optional `pypdf` package).
+# Parsed in a process pool of AI_PDF_WORKERS (0 = one per CPU), at most AI_PDF_MAX_CHARS per file
+AI_INDEX_PDFS = os.getenv("AI_INDEX_PDFS", "True").lower() in ("true", "1", "yes")
+AI_PDF_WORKERS = int(os.getenv("AI_PDF_WORKERS", "0"))
+AI_PDF_MAX_CHARS = int(os.getenv("AI_PDF_MAX_CHARS", "200000"))
+# Seconds a student's cached profile context (grades, deadlines) lives; signals also invalidate it
+AI_PROFILE_CONTEXT_TTL = int(os.getenv("AI_PROFILE_CONTEXT_TTL", "300"))
+# Cache alias holding it; it must be shared by every worker process so invalidation reaches them all
+AI_PROFILE_CACHE = "profile_context"
+# Semantic answer cache: reuse answers to similar general questions about the same lesson
+AI_ANSWER_CACHE_ENABLED = os.getenv("AI_ANSWER_CACHE_ENABLED", "True").lower() in ("true", "1", "yes")
+AI_ANSWER_CACHE_SIMILARITY = float(os.getenv("AI_ANSWER_CACHE_SIMILARITY", "0.95"))  # minimum cosine similarity
+AI_ANSWER_CACHE_MAX_AGE = int(os.getenv("AI_ANSWER_CACHE_MAX_AGE", str(7 * 24 * 3600)))  # seconds
+# Identical questions asked while one is being answered share its answer (assist.single_flight)
+AI_COALESCE_QUESTIONS = os.getenv("AI_COALESCE_QUESTIONS", "True").lower() in ("true", "1", "yes")
+# Fair-share chat admission (assist.admission): concurrent completions per process, and when to shed load
+AI_CHAT_CONCURRENCY = int(os.getenv("AI_CHAT_CONCURRENCY", "4"))
+AI_CHAT_MAX_QUEUE = int(os.getenv("AI_CHAT_MAX_QUEUE", "32"))
+AI_CHAT_MAX_QUEUE_PER_USER = int(os.getenv("AI_CHAT_MAX_QUEUE_PER_USER", "3"))
+AI_CHAT_QUEUE_TIMEOUT = float(os.getenv("AI_CHAT_QUEUE_TIMEOUT", "30"))  # seconds a request may wait for a slot
+# Generation budgets (assist.generation): max_tokens per kind of answer; "brief" applies while at least
+# AI_BRIEF_QUEUE_DEPTH requests wait for a chat slot, "factual" to short questions asking for a fact
+AI_GENERATION_BUDGETS = {
+    "default": int(os.getenv("AI_MAX_TOKENS", "512")),
+    "brief": int(os.getenv("AI_MAX_TOKENS_BRIEF", "256")),
+    "factual": int(os.getenv("AI_MAX_TOKENS_FACTUAL", "160")),
+}
+AI_BRIEF_QUEUE_DEPTH = int(os.getenv("AI_BRIEF_QUEUE_DEPTH", "4"))
+AI_FACTUAL_MAX_WORDS = int(os.getenv("AI_FACTUAL_MAX_WORDS", "12"))
+AI_CHAT_STOP = json.loads(os.getenv("AI_CHAT_STOP", "[]"))
+# The chat model's context window (its num_ctx, e.g. OLLAMA_CONTEXT_LENGTH); prompts leave room for the answer
+AI_CHAT_NUM_CTX = int(os.getenv("AI_CHAT_NUM_CTX", "4096"))
+# Token counting (assist.tokenizers): HeuristicTokenizer works without extra packages; for exact
+# counts use HuggingFaceTokenizer with {"path": ".../tokenizer.json"} or TiktokenTokenizer
+AI_TOKENIZER = os.getenv("AI_TOKENIZER", "assist.tokenizers.HeuristicTokenizer")
+AI_TOKENIZER_OPTIONS = json.loads(os.getenv("AI_TOKENIZER_OPTIONS", "{}"))
+# Prompt budget (assist.prompt): tokens for system prompt + question; 0 disables trimming
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", "3000"))
+AI_PROMPT_MIN_CHUNKS = int(os.getenv("AI_PROMPT_MIN_CHUNKS", "2"))  # chunks kept before profile sections go
+AI_PROMPT_TRIM_ORDER = ["RECENT PAST ASSIGNMENTS", "ENROLLED COURSES", "ENROLLED LESSONS", "UPCOMING ASSIGNMENTS"]
+# ANN index on DocumentChunk.embedding: "hnsw" or "ivfflat" (build-time, read by assist migration 0007)
+AI_VECTOR_INDEX = os.getenv("AI_VECTOR_INDEX", "hnsw")
+AI_HNSW_M = int(os.getenv("AI_HNSW_M", "16"))
+AI_HNSW_EF_CONSTRUCTION = int(os.getenv("AI_HNSW_EF_CONSTRUCTION", "64"))
+AI_IVFFLAT_LISTS = int(os.getenv("AI_IVFFLAT_LISTS", "100"))
+# Index a quantized embedding instead (pgvector >= 0.7): "none", "halfvec" (2x smaller) or
+# "binary" (32x smaller); read by assist migration 0010. Quantized searches re-rank this many
+# nearest candidates with the full-precision embedding
+AI_VECTOR_QUANTIZATION = os.getenv("AI_VECTOR_QUANTIZATION", "none")
+AI_VECTOR_RERANK_CANDIDATES = int(os.getenv("AI_VECTOR_RERANK_CANDIDATES", "40"))
+# Per-query recall/latency knobs (higher = better recall, slower)
+AI_HNSW_EF_SEARCH = int(os.getenv("AI_HNSW_EF_SEARCH", "40"))
+AI_IVFFLAT_PROBES = int(os.getenv("AI_IVFFLAT_PROBES", "10"))
+# pgvector >= 0.8 only: "relaxed_order" keeps filtered (per-lesson) searches from returning too few rows
+AI_VECTOR_ITERATIVE_SCAN = os.getenv("AI_VECTOR_ITERATIVE_SCAN", "")
+# Vector store for chunk retrieval (assist.vector_store): pgvector on PostgreSQL; elsewhere a
+# memory-mapped NumPy index under AI_VECTOR_STORE_PATH (needs numpy), kept in sync by indexing
+AI_VECTOR_STORE = os.getenv(
+    "AI_VECTOR_STORE",
+    "assist.vector_store.PgVectorStore" if USING_POSTGRESQL else "assist.vector_store.NumpyVectorStore",
+)
+AI_VECTOR_STORE_OPTIONS = json.loads(os.getenv("AI_VECTOR_STORE_OPTIONS", "{}"))
+AI_VECTOR_STORE_PATH = Path(os.getenv("AI_VECTOR_STORE_PATH", BASE_DIR / "vector_store"))
+# Hybrid retrieval (assist.hybrid_search): Postgres full-text search fused with vector search
+AI_LEXICAL_SEARCH_ENABLED = os.getenv("AI_LEXICAL_SEARCH_ENABLED", "True").lower() in ("true", "1", "yes")
+AI_SEARCH_CONFIG = os.getenv("AI_SEARCH_CONFIG", "english")  # text search configuration (read by migration 0009)
+AI_HYBRID_CANDIDATES = int(os.getenv("AI_HYBRID_CANDIDATES", "20"))  # chunks per ranking before fusion
+AI_HYBRID_RRF_K = int(os.getenv("AI_HYBRID_RRF_K", "60"))  # reciprocal rank fusion constant
+# Questions of at most this many words that contain a code (e.g. "CS101 week 3") skip embedding
+AI_LEXICAL_FAST_PATH_MAX_WORDS = int(os.getenv("AI_LEXICAL_FAST_PATH_MAX_WORDS", "4"))
+
+# ---- Background jobs (manage.py run_worker) ----
+# Run jobs inline at enqueue time instead of waiting for a worker (local dev without a worker)
+JOBS_RUN_INLINE = os.getenv("JOBS_RUN_INLINE", "False").lower() in ("true", "1", "yes")
+JOBS_RETRY_BACKOFF = int(os.getenv("JOBS_RETRY_BACKOFF", "30"))  # seconds, doubled per attempt
+JOBS_STALE_AFTER = int(os.getenv("JOBS_STALE_AFTER", "600"))  # requeue running jobs silent this long
+JOBS_WORKER_TIMEOUT = int(os.getenv("JOBS_WORKER_TIMEOUT", "60"))  # a worker silent this long counts as stopped
 
 MEDIA_ROOT = BASE_DIR / "media"
\ No newline at end of file
@@ -65,7 +65,13 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.dummy.DummyCache",
-    }
+    },
+    "rate_limit": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    },
+    "profile_context": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    },
 }
 
 # ============================
@@ -113,6 +119,20 @@ OLLAMA_BASE_URL = "http://localhost:11434"
 AI_CHAT_MODEL = "llama3.1:latest"
 AI_EMBED_MODEL = "nomic-embed-text"
 AI_DAILY_QUESTION_LIMIT = 100
+AI_EMBED_BATCH_SIZE = 32
+AI_EMBED_CONCURRENCY = 4
+AI_EMBED_MAX_RETRIES = 3
+AI_EMBED_RETRY_BACKOFF = 0  # no sleeping between retries in tests
+AI_EMBED_CACHE_MAX_ENTRIES = 10000
+# Views are tested against the pgvector path (USING_POSTGRESQL toggles availability);
+# NumpyVectorStore tests select it explicitly
+AI_VECTOR_STORE = "assist.vector_store.PgVectorStore"
+# Parse PDFs inline rather than in a process pool
+AI_PDF_WORKERS = 1
+
+# Jobs stay queued in tests; run them explicitly with jobs.services.run_job
+JOBS_RUN_INLINE = False
+JOBS_RETRY_BACKOFF = 0
 
 # ============================
 # CELERY (if used in future)
@@ -26,6 +26,8 @@ urlpatterns = [
     path("lessons/", include(("lesson_management.urls", "lessons"), namespace="lessons")),
     # AI Assistant
     path("", include(("assist.urls", "assist"), namespace="assist")),
+    # Background job status
+    path("jobs/", include(("jobs.urls", "jobs"), namespace="jobs")),
 
     # Direct route for generic 404 page (for explicit redirects)
     path("404/", wp_views.error_404, name="error_404"),
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DocumentChunk, StudentQuestion
+from .models import DocumentChunk, EmbeddingCacheEntry, StudentQuestion
 
 
 @admin.register(DocumentChunk)
@@ -10,12 +10,20 @@ class DocumentChunkAdmin(admin.ModelAdmin):
     readonly_fields = ["embedding", "created_at"]
 
 
+@admin.register(EmbeddingCacheEntry)
+class EmbeddingCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ["id", "model", "text_hash", "hits", "created_at", "last_used_at"]
+    list_filter = ["model"]
+    search_fields = ["text_hash"]
+    readonly_fields = ["embedding", "created_at", "last_used_at"]
+
+
 @admin.register(StudentQuestion)
 class StudentQuestionAdmin(admin.ModelAdmin):
-    list_display = ["id", "user", "question_preview", "tokens_in", "tokens_out", "created_at"]
-    list_filter = ["created_at"]
+    list_display = ["id", "user", "question_preview", "lesson", "from_cache", "coalesced", "budget", "tokens_in", "tokens_out", "queue_wait_ms", "generation_ms", "created_at"]
+    list_filter = ["created_at", "from_cache", "coalesced", "cacheable", "budget", "truncated"]
     search_fields = ["user__username", "question", "answer"]
-    readonly_fields = ["created_at"]
+    readonly_fields = ["question_embedding", "cached_from", "created_at"]
 
     def question_preview(self, obj):
         return obj.question[:50] + "..." if len(obj.question) > 50 else obj.question
@@ -0,0 +1,238 @@
+"""
+Fair-share admission queue in front of the chat model.
+
+At most settings.AI_CHAT_CONCURRENCY chat completions run at once per process
+(set it to Ollama's OLLAMA_NUM_PARALLEL divided by the number of workers).
+Further requests wait in per-user queues that are served round-robin, so a
+student with many questions in flight gets one slot per round instead of
+starving everyone else.
+
+Overload is shed early instead of surfacing as model timeouts: check() and
+slot() raise Overloaded, with a Retry-After estimate, once
+settings.AI_CHAT_MAX_QUEUE requests (or AI_CHAT_MAX_QUEUE_PER_USER of one
+user's) are waiting, and a request that waits longer than
+AI_CHAT_QUEUE_TIMEOUT seconds gives up the same way.
+
+Waiters may belong to different event loops (one per request under WSGI), so
+the queue is guarded by a thread lock and slots are handed over with
+call_soon_threadsafe. get_stats() reports this process's counters (served to
+staff at /api/notmoodle/admission/), and every shed or timed-out request is
+logged as a warning on the "assist.admission" logger.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Hashable, Optional
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats = {"admitted": 0, "queued": 0, "shed": 0, "timed_out": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+
+class Overloaded(Exception):
+    """The chat model is saturated; try again after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Assistant is busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class Ticket:
+    """One admitted request: how long it queued, and when it got its slot."""
+    wait: float = 0.0
+    admitted_at: float = 0.0
+
+    @property
+    def wait_ms(self) -> int:
+        return round(self.wait * 1000)
+
+
+class _Waiter:
+    def __init__(self, user_key: Hashable):
+        self.user_key = user_key
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+
+
+class AdmissionQueue:
+    """Concurrency cap plus per-user round-robin queues; see the module docstring."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting = 0
+        # user -> their waiters, oldest first; the first user is served next
+        self._queues: "OrderedDict[Hashable, Deque[_Waiter]]" = OrderedDict()
+        self._service_time = 10.0  # moving average of seconds a slot is held
+
+    @staticmethod
+    def limit() -> int:
+        return max(1, getattr(settings, "AI_CHAT_CONCURRENCY", 4))
+
+    def depth(self) -> Dict[str, int]:
+        with self._lock:
+            return {"active": self._active, "waiting": self._waiting}
+
+    def _retry_after(self) -> int:
+        """Seconds until the current queue has likely drained."""
+        return max(1, math.ceil(self._service_time * (self._waiting + 1) / self.limit()))
+
+    def _full(self, user_key: Hashable) -> bool:
+        if self._active < self.limit() and not self._waiting:
+            return False
+        mine = len(self._queues.get(user_key, ()))
+        return (
+            self._waiting >= getattr(settings, "AI_CHAT_MAX_QUEUE", 32)
+            or mine >= getattr(settings, "AI_CHAT_MAX_QUEUE_PER_USER", 3)
+        )
+
+    def _shed(self, user_key: Hashable) -> Overloaded:
+        """Count and log a request turned away because the queue is full (lock held)."""
+        _count(shed=1)
+        logger.warning(
+            "Chat queue full, shedding request from %s (%d active, %d waiting)",
+            user_key, self._active, self._waiting,
+        )
+        return Overloaded(self._retry_after())
+
+    def check(self, user_key: Hashable) -> None:
+        """Raise Overloaded now if `user_key`'s request would be shed."""
+        with self._lock:
+            if self._full(user_key):
+                raise self._shed(user_key)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting users in turn (lock held)."""
+        while self._active < self.limit() and self._queues:
+            user_key, waiters = self._queues.popitem(last=False)
+            waiter = waiters.popleft()
+            if waiters:
+                self._queues[user_key] = waiters  # to the back of the round
+            self._waiting -= 1
+            self._active += 1
+            try:
+                waiter.loop.call_soon_threadsafe(self._deliver, waiter)
+            except RuntimeError:
+                self._active -= 1  # the waiter's event loop has closed
+
+    def _deliver(self, waiter: _Waiter) -> None:
+        # Runs in the waiter's loop; it may have stopped waiting after being picked
+        if waiter.future.cancelled():
+            self.release(None)
+        else:
+            waiter.future.set_result(None)
+
+    def _remove(self, waiter: _Waiter) -> bool:
+        """Take a waiter out of its queue (lock held); False if it was already picked."""
+        waiters = self._queues.get(waiter.user_key)
+        if waiters is None or waiter not in waiters:
+            return False
+        waiters.remove(waiter)
+        if not waiters:
+            del self._queues[waiter.user_key]
+        self._waiting -= 1
+        return True
+
+    async def acquire(self, user_key: Hashable) -> Ticket:
+        """Wait for a slot; raises Overloaded when shed or after AI_CHAT_QUEUE_TIMEOUT seconds."""
+        start = time.monotonic()
+        with self._lock:
+            if self._active < self.limit() and not self._waiting:
+                self._active += 1
+                _count(admitted=1)
+                return Ticket(admitted_at=start)
+            if self._full(user_key):
+                raise self._shed(user_key)
+            waiter = _Waiter(user_key)
+            self._queues.setdefault(user_key, deque()).append(waiter)
+            self._waiting += 1
+        _count(queued=1)
+
+        try:
+            await asyncio.wait_for(waiter.future, getattr(settings, "AI_CHAT_QUEUE_TIMEOUT", 30.0))
+        except BaseException as exc:
+            with self._lock:
+                queued = self._remove(waiter)
+                retry_after = self._retry_after()
+            if not queued and waiter.future.done() and not waiter.future.cancelled():
+                self.release(None)  # picked just as it stopped waiting
+            if isinstance(exc, asyncio.TimeoutError):
+                _count(timed_out=1)
+                logger.warning(
+                    "Chat request from %s timed out after %.1fs in the queue", user_key, time.monotonic() - start,
+                )
+                raise Overloaded(retry_after) from None
+            raise
+
+        now = time.monotonic()
+        ticket = Ticket(wait=now - start, admitted_at=now)
+        _count(admitted=1, wait_seconds=ticket.wait)
+        with _stats_lock:
+            _stats["max_wait_seconds"] = max(_stats["max_wait_seconds"], ticket.wait)
+        return ticket
+
+    def release(self, ticket: Optional[Ticket]) -> None:
+        """Free a slot and pass it to the next user in line."""
+        with self._lock:
+            self._active -= 1
+            if ticket is not None:
+                self._service_time += 0.2 * (time.monotonic() - ticket.admitted_at - self._service_time)
+            self._dispatch()
+
+
+_queue = AdmissionQueue()
+
+
+def depth() -> Dict[str, int]:
+    """Requests holding a slot ("active") and waiting for one ("waiting") in this process."""
+    return _queue.depth()
+
+
+def check(user_key: Hashable) -> None:
+    """Shed a request early, before any retrieval work, when the queue is full."""
+    _queue.check(user_key)
+
+
+@asynccontextmanager
+async def slot(user_key: Hashable) -> AsyncIterator[Ticket]:
+    """
+    Hold one chat slot for the body of the `async with`.
+
+    Raises:
+        Overloaded: The queue is full or the wait timed out
+    """
+    ticket = await _queue.acquire(user_key)
+    try:
+        yield ticket
+    finally:
+        _queue.release(ticket)
+
+
+def get_stats() -> Dict[str, float]:
+    """Process-wide admission counters since start (or the last reset), plus the current depth."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["mean_wait_seconds"] = stats["wait_seconds"] / stats["admitted"] if stats["admitted"] else 0.0
+    return {**stats, **_queue.depth()}
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def _count(**deltas) -> None:
+    with _stats_lock:
+        for key, value in deltas.items():
+            _stats[key] += value
@@ -0,0 +1,83 @@
+"""
+Semantic cache of assistant answers to general questions about a lesson.
+
+When a student asks a non-personal question scoped to a lesson, the question's
+embedding is stored on its StudentQuestion. A later question about the same
+lesson whose embedding is at least settings.AI_ANSWER_CACHE_SIMILARITY cosine
+similar, and asked within settings.AI_ANSWER_CACHE_MAX_AGE seconds, gets that
+answer back without a chat completion.
+
+Cacheable answers are generated without the student's profile in the prompt,
+so a cached answer never carries another student's details. Re-indexing a
+lesson (assist.indexing.index_lesson) invalidates its cached answers.
+"""
+import re
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import Count, Q, QuerySet
+from django.utils import timezone
+from pgvector.django import CosineDistance
+
+from .models import StudentQuestion
+
+
+# Questions about the student themselves (their grades, deadlines, progress) are never shared
+_PERSONAL = re.compile(
+    r"\b(i|i'm|i've|i'd|me|my|mine|myself|grades?|marks?|scores?|credits?|gpa|deadlines?|due|"
+    r"submit\w*|submission\w*|enrol\w*|progress|passed|failed)\b",
+    re.IGNORECASE,
+)
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "AI_ANSWER_CACHE_ENABLED", True)
+
+
+def is_personal(question: str) -> bool:
+    """Whether a question is about the student themselves, so its answer must not reach others."""
+    return bool(_PERSONAL.search(question))
+
+
+def is_cacheable(question: str, lesson_id: Optional[int]) -> bool:
+    """Whether a question may be answered from (and stored in) the cache."""
+    return is_enabled() and bool(lesson_id) and not is_personal(question)
+
+
+def candidates(question_embedding: List[float], lesson_id: int) -> QuerySet[StudentQuestion]:
+    """Fresh cached questions for the lesson above the similarity threshold, nearest first."""
+    max_distance = 1 - getattr(settings, "AI_ANSWER_CACHE_SIMILARITY", 0.95)
+    since = timezone.now() - timedelta(seconds=getattr(settings, "AI_ANSWER_CACHE_MAX_AGE", 7 * 24 * 3600))
+    return (
+        StudentQuestion.objects
+        .filter(lesson_id=lesson_id, cacheable=True, created_at__gte=since)
+        .annotate(distance=CosineDistance("question_embedding", question_embedding))
+        .filter(distance__lte=max_distance)
+        .order_by("distance")
+        .only("id", "answer")
+    )
+
+
+def lookup(question_embedding: List[float], lesson_id: int) -> Optional[StudentQuestion]:
+    """The closest cached question whose answer can be reused, if any."""
+    return candidates(question_embedding, lesson_id).first()
+
+
+def invalidate_lesson(lesson_id: int) -> int:
+    """Stop serving cached answers for a lesson; returns the number invalidated."""
+    return StudentQuestion.objects.filter(lesson_id=lesson_id, cacheable=True).update(cacheable=False)
+
+
+def get_stats(since=None) -> Dict[str, float]:
+    """
+    Hit rate over cache-eligible questions, optionally only those asked after `since`.
+
+    Computed from StudentQuestion rows, so it covers every worker process.
+    """
+    questions = StudentQuestion.objects.filter(question_embedding__isnull=False)
+    if since is not None:
+        questions = questions.filter(created_at__gte=since)
+    counts = questions.aggregate(eligible=Count("id"), hits=Count("id", filter=Q(from_cache=True)))
+    counts["hit_rate"] = counts["hits"] / counts["eligible"] if counts["eligible"] else 0.0
+    return counts
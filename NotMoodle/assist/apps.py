@@ -5,3 +5,6 @@ class AssistConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "assist"
     verbose_name = "NotMoodle AI Assistant"
+
+    def ready(self):
+        from . import checks  # noqa: F401  (registers the system checks)
@@ -0,0 +1,30 @@
+"""
+System checks for the AI assistant's configuration.
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.core.cache.backends.locmem import LocMemCache
+
+from . import rate_limit, selectors
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    """The question limit and profile invalidation only reach every worker if their caches are shared."""
+    shared = [
+        ("AI_RATE_LIMIT_CACHE", rate_limit.get_cache(), "students get the daily question limit once per worker"),
+        ("AI_PROFILE_CACHE", selectors.get_cache(), "other workers keep serving a student's stale grades and deadlines"),
+    ]
+    warnings = []
+    for setting, cache, consequence in shared:
+        if isinstance(cache, LocMemCache):
+            warnings.append(Warning(
+                f"The AI assistant's settings.{setting} cache is process-local.",
+                hint=(
+                    f"Each worker process keeps its own copy, so {consequence}. Point the "
+                    f"{getattr(settings, setting, 'default')!r} cache alias at a shared backend such as "
+                    f"Redis or the database."
+                ),
+                id="assist.W001",
+            ))
+    return warnings
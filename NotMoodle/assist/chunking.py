@@ -0,0 +1,214 @@
+"""
+Token-aware streaming chunker for RAG indexing.
+
+chunk_stream() reads text as an iterable of pieces (a file, a generator of PDF
+pages, or one string) and yields chunks as soon as they are full, so only the
+current paragraph and chunk are held in memory. Sizes are measured with the
+configured tokenizer (assist.tokenizers):
+
+- chunks hold at most settings.AI_CHUNK_TOKENS tokens;
+- each chunk starts with the last settings.AI_CHUNK_OVERLAP_TOKENS tokens of
+  the previous one (whole sentences where they fit, otherwise trailing words);
+- sentences are never split unless one alone is over the budget;
+- a paragraph longer than the budget starts a new chunk, without overlap, so
+  its chunk boundaries do not move when text before it is edited (and
+  re-indexing only embeds the chunks that actually changed);
+- headings (short lines without closing punctuation, "# Markdown", "Label:")
+  never end a chunk: they move to the chunk holding the text they introduce,
+  even if that takes it a few tokens over the budget.
+"""
+import re
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from django.conf import settings
+
+from .tokenizers import count_tokens
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+_ABBREVIATIONS = ("e.g.", "i.e.", "etc.", "vs.", "Dr.", "Mr.", "Mrs.", "Ms.", "Prof.", "No.", "Fig.")
+_HEADING_MAX_WORDS = 12
+
+
+class Unit(NamedTuple):
+    """A sentence (or heading, or piece of an over-long sentence) and its token count, joiner included."""
+
+    text: str
+    tokens: int
+    joiner: str = " "  # placed before it when it follows another unit in a chunk
+    heading: bool = False
+    starts_chunk: bool = False
+
+
+def iter_paragraphs(stream: Iterable[str]) -> Iterator[str]:
+    """Paragraphs (separated by blank lines) of a text stream, whatever the piece boundaries."""
+    buffer = ""
+    for piece in stream:
+        buffer += piece
+        start = 0
+        for match in _PARAGRAPH_BREAK.finditer(buffer):
+            if match.end() == len(buffer):
+                break  # more blank lines may follow in the next piece
+            paragraph = buffer[start:match.start()].strip()
+            if paragraph:
+                yield paragraph
+            start = match.end()
+        buffer = buffer[start:]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def is_heading(line: str, next_line: str = "") -> bool:
+    """
+    A Markdown heading, a "Label:" line, or a short line without closing
+    punctuation (other than "Label: value"). Followed by a line starting in lower case, a short line is
+    more likely a wrapped sentence (as in PDF text) than a heading.
+    """
+    line, next_line = line.strip(), next_line.strip()
+    if not line:
+        return False
+    if line.startswith("#") or line.endswith(":"):
+        return True
+    if len(line.split()) > _HEADING_MAX_WORDS or line[-1] in ".!?;," or ": " in line:
+        return False  # too long, a sentence, or a "Label: value" line
+    return not next_line or not next_line[0].islower()
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of one paragraph (common abbreviations do not end a sentence)."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_BREAK.finditer(text):
+        if text.endswith(_ABBREVIATIONS, 0, match.start()):
+            continue
+        sentences.append(text[start:match.start()])
+        start = match.end()
+    sentences.append(text[start:])
+    return [sentence for sentence in sentences if sentence.strip()]
+
+
+def _split_words(text: str, max_tokens: int, count: Callable[[str], int]) -> Iterator[str]:
+    """Pieces of an over-long sentence, each within `max_tokens` (a single huge word stays whole)."""
+    words = []
+    tokens = 0
+    for word in text.split():
+        word_tokens = count(" " + word)
+        if words and tokens + word_tokens > max_tokens:
+            yield " ".join(words)
+            words, tokens = [], 0
+        words.append(word)
+        tokens += word_tokens
+    if words:
+        yield " ".join(words)
+
+
+def iter_units(stream: Iterable[str], max_tokens: int, count: Callable[[str], int], overlap_tokens: int = 0) -> Iterator[Unit]:
+    """
+    Headings and sentences of a text stream, in order. Sentences over
+    `max_tokens` are cut into pieces that leave room for the overlap, and the
+    first unit of a paragraph over `max_tokens` is marked `starts_chunk`.
+    """
+    for paragraph in iter_paragraphs(stream):
+        joiner = "\n\n"
+        first_line, _, rest = paragraph.partition("\n")
+        if is_heading(first_line, rest.lstrip().partition("\n")[0]):
+            yield Unit(first_line.strip(), count(joiner + first_line.strip()), joiner, heading=True)
+            paragraph, joiner = rest.strip(), "\n"
+            if not paragraph:
+                continue
+        units = []
+        for sentence in split_sentences(paragraph):
+            tokens = count(joiner + sentence)
+            if tokens <= max_tokens:
+                units.append(Unit(sentence, tokens, joiner))
+            else:
+                for piece in _split_words(sentence, max_tokens - overlap_tokens - count(joiner), count):
+                    units.append(Unit(piece, count(joiner + piece), joiner))
+                    joiner = " "
+            joiner = " "
+        if units and sum(unit.tokens for unit in units) > max_tokens:
+            units[0] = units[0]._replace(starts_chunk=True)
+        yield from units
+
+
+def _overlap(units: List[Unit], overlap_tokens: int, count: Callable[[str], int]) -> List[Unit]:
+    """The tail of a chunk worth at most `overlap_tokens`: whole units, or the last unit's trailing words."""
+    tail = []
+    tokens = 0
+    for unit in reversed(units):
+        if tokens + unit.tokens > overlap_tokens:
+            break
+        tail.insert(0, unit)
+        tokens += unit.tokens
+    if tail or not units or overlap_tokens <= 0:
+        return tail
+
+    words = []
+    for word in reversed(units[-1].text.split()):
+        word_tokens = count(" " + word)
+        if tokens + word_tokens > overlap_tokens:
+            break
+        words.insert(0, word)
+        tokens += word_tokens
+    return [Unit(" ".join(words), tokens, units[-1].joiner)] if words else []
+
+
+def _join(units: List[Unit]) -> str:
+    return "".join((unit.joiner if i else "") + unit.text for i, unit in enumerate(units))
+
+
+def chunk_stream(
+    stream: Iterable[str],
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+    count: Callable[[str], int] = None,
+) -> Iterator[str]:
+    """
+    Yield chunks of at most `max_tokens` tokens, each repeating the last
+    `overlap_tokens` tokens of the one before.
+
+    Args:
+        stream: Text as an iterable of pieces (pass [text] for a single string)
+        max_tokens: Token budget per chunk (default settings.AI_CHUNK_TOKENS)
+        overlap_tokens: Overlap between chunks (default settings.AI_CHUNK_OVERLAP_TOKENS)
+        count: Token counter (default: the configured tokenizer)
+    """
+    if max_tokens is None:
+        max_tokens = getattr(settings, "AI_CHUNK_TOKENS", 256)
+    if overlap_tokens is None:
+        overlap_tokens = getattr(settings, "AI_CHUNK_OVERLAP_TOKENS", 40)
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    count = count or count_tokens
+
+    current: List[Unit] = []
+    tokens = 0
+    fresh = 0  # units in `current` that are not overlap from the previous chunk
+    for unit in iter_units(stream, max_tokens, count, overlap_tokens):
+        if fresh and (unit.starts_chunk or tokens + unit.tokens > max_tokens):
+            # Headings go with the text after them
+            carry = []
+            while fresh and current[-1].heading:
+                carry.insert(0, current.pop())
+                fresh -= 1
+            if fresh:
+                yield _join(current)
+            if fresh and not unit.starts_chunk:
+                current = _overlap(current, overlap_tokens, count)
+            else:
+                # No overlap before a long paragraph (or when only overlap preceded the headings)
+                current = []
+            current += carry
+            tokens = sum(u.tokens for u in current)
+            fresh = len(carry)
+            if not fresh and tokens + unit.tokens > max_tokens:
+                current, tokens = [], 0
+        current.append(unit)
+        tokens += unit.tokens
+        fresh += 1
+    if fresh:
+        yield _join(current)
+
+
+def chunk_text(text: str, max_tokens: Optional[int] = None, overlap_tokens: Optional[int] = None) -> List[str]:
+    """All chunks of one string."""
+    return list(chunk_stream([text], max_tokens, overlap_tokens))
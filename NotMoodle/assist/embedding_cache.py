@@ -0,0 +1,124 @@
+"""
+Persistent embedding cache keyed by (embed model, normalized text hash).
+
+Consulted by assist.ollama.embed_texts so unchanged chunks are never re-embedded.
+The table is bounded by settings.AI_EMBED_CACHE_MAX_ENTRIES; the least recently
+used entries are evicted once it grows past that. Set it to 0 to disable the cache.
+
+To keep lookups cheap on the question path, an entry's last_used_at (and hit
+count) is only refreshed once it is settings.AI_EMBED_CACHE_TOUCH_INTERVAL
+seconds old, and the table is only counted and trimmed every
+settings.AI_EMBED_CACHE_EVICT_EVERY puts per process (and after each
+index_lessons_for_rag run), so it may briefly exceed its bound.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmbeddingCacheEntry
+
+
+_WHITESPACE = re.compile(r"\s+")
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_puts_since_evict = 0
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "AI_EMBED_CACHE_MAX_ENTRIES", 0) > 0
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace so cosmetic edits still hit the cache."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def get_stats() -> Dict[str, int]:
+    """Process-wide hit/miss/eviction counters since start (or the last reset)."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def _count(**deltas) -> None:
+    with _stats_lock:
+        for key, value in deltas.items():
+            _stats[key] += value
+
+
+def get_many(model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+    """
+    Look up cached embeddings for `texts`.
+    
+    Returns a list aligned with `texts` holding the embedding or None on a miss.
+    Hits last used more than AI_EMBED_CACHE_TOUCH_INTERVAL seconds ago have their
+    LRU timestamp and hit count bumped in one update; fresher hits write nothing.
+    """
+    hashes = [text_hash(text) for text in texts]
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=getattr(settings, "AI_EMBED_CACHE_TOUCH_INTERVAL", 3600))
+    rows = {}
+    stale_ids = []
+    for row_id, row_hash, embedding, last_used_at in (
+        EmbeddingCacheEntry.objects
+        .filter(model=model, text_hash__in=set(hashes))
+        .values_list("id", "text_hash", "embedding", "last_used_at")
+    ):
+        rows[row_hash] = embedding
+        if last_used_at <= stale_before:
+            stale_ids.append(row_id)
+    if stale_ids:
+        EmbeddingCacheEntry.objects.filter(id__in=stale_ids).update(hits=F("hits") + 1, last_used_at=now)
+
+    results = [None if h not in rows else [float(x) for x in rows[h]] for h in hashes]
+    hits = sum(1 for r in results if r is not None)
+    _count(hits=hits, misses=len(results) - hits)
+    return results
+
+
+def put_many(model: str, texts: Sequence[str], embeddings: Sequence[List[float]]) -> None:
+    """Store embeddings for `texts`; every AI_EMBED_CACHE_EVICT_EVERY puts, evict down to the configured size."""
+    global _puts_since_evict
+    entries = {}
+    for text, embedding in zip(texts, embeddings):
+        key = text_hash(text)
+        entries[key] = EmbeddingCacheEntry(model=model, text_hash=key, embedding=embedding)
+    EmbeddingCacheEntry.objects.bulk_create(entries.values(), ignore_conflicts=True, batch_size=500)
+    with _stats_lock:
+        _puts_since_evict += 1
+        due = _puts_since_evict >= getattr(settings, "AI_EMBED_CACHE_EVICT_EVERY", 100)
+        if due:
+            _puts_since_evict = 0
+    if due:
+        evict()
+
+
+def evict(max_entries: Optional[int] = None) -> int:
+    """Delete least recently used entries beyond `max_entries`; returns how many were removed."""
+    if max_entries is None:
+        max_entries = getattr(settings, "AI_EMBED_CACHE_MAX_ENTRIES", 0)
+    excess = EmbeddingCacheEntry.objects.count() - max_entries
+    if excess <= 0:
+        return 0
+    stale_ids = list(
+        EmbeddingCacheEntry.objects.order_by("last_used_at", "id").values_list("id", flat=True)[:excess]
+    )
+    deleted, _ = EmbeddingCacheEntry.objects.filter(id__in=stale_ids).delete()
+    _count(evictions=deleted)
+    return deleted
@@ -0,0 +1,103 @@
+"""
+Generation budgets for assistant answers.
+
+Every chat completion is sent with a max_tokens cap (and the AI_CHAT_STOP
+sequences), so answer length, and with it latency, is bounded. The cap
+depends on the kind of request:
+
+- "factual": short questions with a one-line answer ("When is assignment 2
+  due?", "Which week covers recursion?");
+- "brief": any other question while the admission queue (assist.admission)
+  has at least settings.AI_BRIEF_QUEUE_DEPTH requests waiting, trading
+  verbosity for a bounded p95 latency;
+- "default": everything else.
+
+settings.AI_GENERATION_BUDGETS maps each name to its max_tokens. The model is
+also told the budget, so it plans an answer that fits rather than being cut
+off mid-sentence, and the prompt is kept within settings.AI_CHAT_NUM_CTX
+minus the answer budget so the model never truncates the system prompt.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from django.conf import settings
+
+from . import admission
+from .tokenizers import count_tokens
+
+
+DEFAULT_BUDGETS = {"default": 512, "brief": 256, "factual": 160}
+
+_INSTRUCTIONS = {
+    "factual": "This is a quick factual question: answer directly in one to three sentences.",
+    "brief": "Keep this answer to one short paragraph.",
+}
+
+# Questions that want a fact, not an explanation
+_FACTUAL = re.compile(
+    r"^(when|where|who|which|how (many|much|long|old)|is|are|does|do|did|can|will|"
+    r"what (time|date|day|week|room|percentage|weight|grade|score|mark)s?)\b",
+    re.IGNORECASE,
+)
+_ELABORATE = re.compile(
+    r"\b(explain|why|how (do|does|can|should|would|to)|compare|difference|describe|examples?|steps?|help me|walk me)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Generation limits for one answer."""
+    name: str
+    max_tokens: int
+    stop: List[str] = field(default_factory=list)
+
+    @property
+    def instruction(self) -> str:
+        words = max(10, self.max_tokens * 3 // 4 // 10 * 10)
+        return " ".join(filter(None, [_INSTRUCTIONS.get(self.name), f"Stay under about {words} words."]))
+
+    def prompt_budget(self) -> int:
+        """Tokens the prompt may use: the configured budget, within what the context window leaves."""
+        budget = getattr(settings, "AI_PROMPT_TOKEN_BUDGET", 3000)
+        num_ctx = getattr(settings, "AI_CHAT_NUM_CTX", 0)
+        if num_ctx:
+            room = max(1, num_ctx - self.max_tokens - count_tokens(self.instruction))
+            budget = min(budget, room) if budget else room
+        return budget
+
+    def apply(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """The messages with the length instruction appended to the system prompt."""
+        messages = [dict(message) for message in messages]
+        if messages and messages[0]["role"] == "system":
+            messages[0]["content"] = f"{messages[0]['content'].rstrip()}\n\n{self.instruction}\n"
+        return messages
+
+    def options(self) -> Dict:
+        """Keyword arguments for assist.ollama's chat functions."""
+        return {"max_tokens": self.max_tokens, "stop": self.stop or None}
+
+
+def is_factual(question: str) -> bool:
+    """A short question asking for a fact (a date, a count, yes or no)."""
+    question = question.strip()
+    return (
+        len(question.split()) <= getattr(settings, "AI_FACTUAL_MAX_WORDS", 12)
+        and bool(_FACTUAL.match(question))
+        and not _ELABORATE.search(question)
+    )
+
+
+def get_budget(name: str) -> Budget:
+    budgets = {**DEFAULT_BUDGETS, **getattr(settings, "AI_GENERATION_BUDGETS", {})}
+    return Budget(name, budgets[name], list(getattr(settings, "AI_CHAT_STOP", [])))
+
+
+def select_budget(question: str) -> Budget:
+    """The budget for answering `question` now, given the admission queue's depth."""
+    if is_factual(question):
+        return get_budget("factual")
+    if admission.depth()["waiting"] >= getattr(settings, "AI_BRIEF_QUEUE_DEPTH", 4):
+        return get_budget("brief")
+    return get_budget("default")
@@ -0,0 +1,107 @@
+"""
+Process-wide pooled HTTP clients for talking to Ollama.
+
+One sync httpx.Client per process and one httpx.AsyncClient per event loop,
+created lazily and reused so embedding batches and questions ride on
+keep-alive connections instead of opening a TCP connection per call.
+Pool limits and per-operation timeouts come from the OLLAMA_HTTP_* settings.
+
+The clients are dropped in a forked child (gunicorn/uwsgi workers forked after
+the parent made a request), so no two processes ever share a pooled socket.
+"""
+import asyncio
+import os
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+from django.conf import settings
+
+
+# Per-operation read timeouts (seconds) used when an operation is not configured
+DEFAULT_TIMEOUTS = {
+    "embed": 60.0,
+    "chat": 120.0,
+}
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+# An AsyncClient's connections belong to the event loop that opened them, so keep one per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def pool_limits() -> httpx.Limits:
+    """Connection pool limits from settings."""
+    return httpx.Limits(
+        max_connections=getattr(settings, "OLLAMA_HTTP_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=getattr(settings, "OLLAMA_HTTP_MAX_KEEPALIVE", 10),
+        keepalive_expiry=getattr(settings, "OLLAMA_HTTP_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def timeout(operation: str) -> httpx.Timeout:
+    """
+    Timeout for one kind of request ("embed" or "chat").
+
+    Reading (and waiting for a free pooled connection) is bounded by
+    settings.OLLAMA_HTTP_TIMEOUTS[operation]; connecting by OLLAMA_HTTP_CONNECT_TIMEOUT.
+    """
+    timeouts = {**DEFAULT_TIMEOUTS, **getattr(settings, "OLLAMA_HTTP_TIMEOUTS", {})}
+    read = timeouts.get(operation, DEFAULT_TIMEOUTS["chat"])
+    return httpx.Timeout(read, connect=getattr(settings, "OLLAMA_HTTP_CONNECT_TIMEOUT", 5.0))
+
+
+def _new_client() -> httpx.Client:
+    return httpx.Client(limits=pool_limits(), timeout=timeout("chat"))
+
+
+def _new_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(limits=pool_limits(), timeout=timeout("chat"))
+
+
+def get_client() -> httpx.Client:
+    """The process's shared sync client (thread-safe)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _new_client()
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """The shared AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _async_clients[loop] = _new_async_client()
+    return client
+
+
+def close_client() -> None:
+    """Close the sync client; the next request opens a new one with current settings."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+async def aclose_client() -> None:
+    """Close the running event loop's AsyncClient."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _reset_after_fork() -> None:
+    # Forget (don't close) the parent's clients: their sockets are still the parent's connections
+    global _client, _client_lock, _async_clients
+    _client = None
+    _client_lock = threading.Lock()
+    _async_clients = weakref.WeakKeyDictionary()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
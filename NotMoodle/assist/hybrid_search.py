@@ -0,0 +1,118 @@
+"""
+Full-text (lexical) retrieval over DocumentChunk and its fusion with vector search.
+
+Each chunk has a `search_vector` tsvector (GIN-indexed by migration 0009)
+holding its lesson's unit code and title (weight A) and its content (weight B),
+refreshed by assist.indexing.index_lesson. Lexical search finds exact unit
+codes and terms ("CS101", "recursion") that embeddings blur; views.hybrid_search
+merges its ranking with the vector ranking by reciprocal rank fusion.
+
+Short, code-like questions ("CS101 week 3") are answered from the lexical
+ranking alone when it finds anything, skipping the embedding call.
+Full-text search needs PostgreSQL; elsewhere lexical search returns nothing.
+"""
+import re
+from typing import Dict, Hashable, List, Optional, Sequence
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import BooleanField, Case, F, Value, When
+
+from .models import DocumentChunk
+
+
+# Unit codes and similar identifiers: letters followed by digits (CS101, FIT1045, COMP2123a)
+_CODE = re.compile(r"\b[A-Za-z]{2,}\d{2,}[A-Za-z]?\b")
+_WORD = re.compile(r"\w+")
+MAX_QUERY_TERMS = 32
+
+
+def is_available() -> bool:
+    return connection.vendor == "postgresql" and getattr(settings, "AI_LEXICAL_SEARCH_ENABLED", True)
+
+
+def search_config() -> str:
+    return getattr(settings, "AI_SEARCH_CONFIG", "english")
+
+
+def is_code_like(question: str) -> bool:
+    """Whether a question is short and names a code, so lexical matches can be trusted alone."""
+    words = _WORD.findall(question)
+    max_words = getattr(settings, "AI_LEXICAL_FAST_PATH_MAX_WORDS", 4)
+    return 0 < len(words) <= max_words and bool(_CODE.search(question))
+
+
+def chunk_search_vector(lesson) -> SearchVector:
+    """The tsvector expression for one lesson's chunks."""
+    config = search_config()
+    return (
+        SearchVector(Value(f"{lesson.unit_code} {lesson.title}"), weight="A", config=config)
+        + SearchVector("content", weight="B", config=config)
+    )
+
+
+def update_search_vectors(lesson) -> int:
+    """Recompute the lesson's chunk tsvectors; returns the number of chunks updated."""
+    if connection.vendor != "postgresql":
+        return 0
+    return DocumentChunk.objects.filter(lesson=lesson).update(search_vector=chunk_search_vector(lesson))
+
+
+def _query(question: str) -> Optional[SearchQuery]:
+    # OR the terms together: a natural-language question rarely has every word in one chunk
+    config = search_config()
+    terms = _WORD.findall(question)[:MAX_QUERY_TERMS]
+    query = None
+    for term in terms:
+        term_query = SearchQuery(term, search_type="plain", config=config)
+        query = term_query if query is None else query | term_query
+    return query
+
+
+def lexical_search(question: str, lesson_id: Optional[int] = None, limit: int = 5) -> List[Dict[str, str]]:
+    """
+    Chunks matching the question's terms, best first (chunks from `lesson_id` first).
+
+    Returns:
+        List of dicts with 'content', 'lesson_title', 'lesson_code' keys
+    """
+    query = _query(question)
+    if query is None or not is_available():
+        return []
+
+    in_lesson = Case(When(lesson_id=lesson_id, then=Value(True)), default=Value(False), output_field=BooleanField())
+    rows = (
+        DocumentChunk.objects
+        .filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query), in_lesson=in_lesson if lesson_id else Value(False))
+        .order_by("-in_lesson", "-rank", "id")
+        .values("content", "lesson__title", "lesson__unit_code")[:limit]
+    )
+    return [
+        {"content": row["content"], "lesson_title": row["lesson__title"], "lesson_code": row["lesson__unit_code"]}
+        for row in rows
+    ]
+
+
+def _key(chunk: Dict[str, str]) -> Hashable:
+    return chunk["lesson_code"], chunk["content"]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[List[Dict[str, str]]], k: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Merge ranked chunk lists: each chunk scores sum(1 / (k + rank)) over the lists it appears in.
+
+    Ties keep the order of first appearance (so earlier rankings win).
+    """
+    if k is None:
+        k = getattr(settings, "AI_HYBRID_RRF_K", 60)
+    scores = {}
+    chunks = {}
+    for ranking in rankings:
+        for rank, chunk in enumerate(ranking, start=1):
+            key = _key(chunk)
+            chunks.setdefault(key, chunk)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    order = {key: position for position, key in enumerate(chunks)}
+    return [chunks[key] for key in sorted(chunks, key=lambda key: (-scores[key], order[key]))]
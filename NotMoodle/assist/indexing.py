@@ -0,0 +1,146 @@
+"""
+Incremental RAG indexing of lessons.
+
+Each lesson's text is fingerprinted; when the fingerprint changes the text is
+re-chunked and only chunks whose content hash is new are embedded. Chunks that
+no longer appear are deleted in bulk, and unchanged chunks keep their rows.
+"""
+import hashlib
+from collections import defaultdict
+from typing import Dict
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from lesson_management.models import Lesson
+from .models import DocumentChunk, LessonIndexState
+from . import answer_cache, chunking, hybrid_search, ollama, pdf_text, vector_store
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def prepare_lesson_content(lesson) -> str:
+    """
+    Extract and combine all text content from a lesson.
+    
+    Args:
+        lesson: Lesson model instance
+    
+    Returns:
+        Combined text content
+    """
+    parts = [
+        f"Unit Code: {lesson.unit_code}",
+        f"Title: {lesson.title}",
+    ]
+    
+    if lesson.description:
+        parts.append(f"Description: {lesson.description}")
+    
+    if lesson.objectives:
+        parts.append(f"Learning Objectives: {lesson.objectives}")
+    
+    for rl in lesson.reading_list.all():
+        parts.append(f"Reading: {rl.title} - {rl.description}")
+    
+    # Assignment PDFs and attachments (text cached by file hash, see assist.pdf_text)
+    documents = pdf_text.lesson_documents(lesson)
+    texts = pdf_text.extract_texts(field_file for _, field_file in documents)
+    for label, field_file in documents:
+        text = texts.get(field_file.name, "").strip()
+        if text:
+            parts.append(f"{label}:\n\n{text}")
+    
+    return "\n\n".join(parts)
+
+
+def lessons_needing_index():
+    """Published lessons that are unindexed, flagged dirty, or edited since they were indexed."""
+    return Lesson.objects.filter(status="published").filter(
+        Q(index_state__isnull=True)
+        | Q(index_state__dirty=True)
+        | Q(date_of_update__gt=F("index_state__indexed_at"))
+    )
+
+
+def index_lesson(lesson, force: bool = False) -> Dict[str, int]:
+    """
+    Bring one lesson's chunks up to date with its current content.
+    
+    Args:
+        lesson: Lesson model instance
+        force: Rebuild every chunk even if the fingerprint and hashes match
+    
+    Returns:
+        Dict with counts of `created`, `deleted` and `kept` chunks, and
+        `unchanged` = 1 when the fingerprint matched and nothing was done
+    
+    Raises:
+        httpx.HTTPError: If embedding new chunks fails (the index is left untouched)
+    """
+    content = prepare_lesson_content(lesson)
+    fingerprint = content_hash(content)
+    state = LessonIndexState.objects.filter(lesson=lesson).first()
+    if not force and state is not None and state.fingerprint == fingerprint:
+        if state.dirty:
+            LessonIndexState.objects.filter(pk=state.pk).update(dirty=False, indexed_at=timezone.now())
+        return {"created": 0, "deleted": 0, "kept": 0, "unchanged": 1}
+
+    chunks = chunking.chunk_text(content) if content.strip() else []
+
+    # Match new chunks to existing rows by content hash (a multiset: duplicates are kept once each)
+    existing = defaultdict(list)
+    if not force:
+        for chunk_id, chunk_hash in lesson.chunks.values_list("id", "content_hash"):
+            existing[chunk_hash].append(chunk_id)
+    kept_ids = []
+    to_create = []
+    for text in chunks:
+        chunk_hash = content_hash(text)
+        if existing[chunk_hash]:
+            kept_ids.append(existing[chunk_hash].pop())
+        else:
+            to_create.append((text, chunk_hash))
+
+    embeddings = ollama.embed_texts([text for text, _ in to_create]) if to_create else []
+
+    with transaction.atomic():
+        stale = lesson.chunks.exclude(id__in=kept_ids)
+        stale_ids = list(stale.values_list("id", flat=True))
+        deleted, _ = stale.delete()
+        created = DocumentChunk.objects.bulk_create([
+            DocumentChunk(
+                lesson=lesson,
+                content=text,
+                content_hash=chunk_hash,
+                embedding=embedding,
+                token_count=ollama.estimate_tokens(text),
+            )
+            for (text, chunk_hash), embedding in zip(to_create, embeddings)
+        ])
+        if any(chunk.pk is None for chunk in created):  # backends without RETURNING
+            created = list(lesson.chunks.exclude(id__in=kept_ids))
+        vector_store.sync_on_commit(stale_ids, [(chunk.pk, lesson.pk, chunk.embedding) for chunk in created])
+        # Kept chunks too: the lesson code or title may be what changed
+        hybrid_search.update_search_vectors(lesson)
+        LessonIndexState.objects.update_or_create(
+            lesson=lesson,
+            defaults={"fingerprint": fingerprint, "dirty": False, "indexed_at": timezone.now()},
+        )
+        # Answers were grounded in the old content
+        answer_cache.invalidate_lesson(lesson.pk)
+
+    return {"created": len(to_create), "deleted": deleted, "kept": len(kept_ids), "unchanged": 0}
+
+
+def remove_unpublished_chunks() -> int:
+    """Delete chunks (and index state) of lessons that are no longer published."""
+    LessonIndexState.objects.exclude(lesson__status="published").delete()
+    stale = DocumentChunk.objects.exclude(lesson__status="published")
+    stale_ids = list(stale.values_list("id", flat=True))
+    deleted, _ = stale.delete()
+    vector_store.sync_on_commit(stale_ids)
+    return deleted
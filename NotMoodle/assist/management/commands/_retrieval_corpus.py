@@ -0,0 +1,101 @@
+"""
+Fixture corpus for benchmark_hybrid_search: lessons, their chunks, and questions
+labelled with the lesson whose chunks should answer them.
+
+Unit codes are unusual on purpose so they don't collide with real lessons.
+"""
+
+LESSONS = [
+    {
+        "unit_code": "QXA1010",
+        "title": "Introduction to Programming",
+        "chunks": [
+            "Variables name values in memory. Python variables are dynamically typed, so the same name can refer to an int and later a string.",
+            "Control flow uses if, elif and else. Loops repeat work: for iterates over a sequence, while repeats until a condition is false.",
+            "Functions package reusable steps. Parameters receive arguments, and return sends a value back to the caller.",
+        ],
+    },
+    {
+        "unit_code": "QXA2020",
+        "title": "Data Structures",
+        "chunks": [
+            "A stack is last-in first-out: push adds to the top and pop removes from the top. Undo history is a classic use.",
+            "A queue is first-in first-out. Breadth-first search keeps the frontier of nodes to visit in a queue.",
+            "A binary heap keeps the smallest element at the root, so a priority queue can pop the minimum in logarithmic time.",
+        ],
+    },
+    {
+        "unit_code": "QXA2030",
+        "title": "Algorithms and Complexity",
+        "chunks": [
+            "Big-O notation describes how running time grows with input size; merge sort runs in O(n log n).",
+            "Recursion solves a problem by calling the same function on smaller inputs until reaching a base case.",
+            "Dynamic programming stores answers to overlapping subproblems, as in computing Fibonacci numbers bottom-up.",
+        ],
+    },
+    {
+        "unit_code": "QXB3040",
+        "title": "Databases",
+        "chunks": [
+            "A relational table stores rows with the same columns. A primary key uniquely identifies each row.",
+            "Normalization removes redundancy: third normal form requires every non-key column to depend only on the key.",
+            "An index such as a B-tree lets the database find matching rows without scanning the whole table.",
+        ],
+    },
+    {
+        "unit_code": "QXB3050",
+        "title": "Computer Networks",
+        "chunks": [
+            "TCP provides reliable, ordered delivery with a three-way handshake; UDP sends datagrams without guarantees.",
+            "DNS resolves host names such as example.com to IP addresses through a hierarchy of name servers.",
+            "HTTP is a request-response protocol; status 404 means the resource was not found.",
+        ],
+    },
+    {
+        "unit_code": "QXC1060",
+        "title": "Discrete Mathematics",
+        "chunks": [
+            "A proof by induction shows a base case and that the statement for n implies the statement for n + 1.",
+            "Sets are unordered collections; the union contains elements in either set and the intersection those in both.",
+            "A graph has vertices and edges; a tree is a connected graph with no cycles.",
+        ],
+    },
+    {
+        "unit_code": "QXC2070",
+        "title": "Operating Systems",
+        "chunks": [
+            "A process has its own address space; threads within a process share memory but have separate stacks.",
+            "Deadlock needs mutual exclusion, hold and wait, no preemption and circular wait.",
+            "Virtual memory maps pages to frames; a page fault loads a missing page from disk.",
+        ],
+    },
+    {
+        "unit_code": "QXD3080",
+        "title": "Software Engineering",
+        "chunks": [
+            "Unit tests check small pieces of code in isolation; continuous integration runs them on every commit.",
+            "Version control with git records history; branches let features develop separately before merging.",
+            "Agile teams work in short sprints and adjust the plan from feedback at each review.",
+        ],
+    },
+]
+
+# (question, unit code of the lesson that should answer it)
+QUERIES = [
+    ("QXA2020", "QXA2020"),
+    ("QXB3040 notes", "QXB3040"),
+    ("what is in QXC2070", "QXC2070"),
+    ("QXD3080 week 2", "QXD3080"),
+    ("QXA1010 loops", "QXA1010"),
+    ("QXB3050 handshake", "QXB3050"),
+    ("How does a priority queue find the minimum quickly?", "QXA2020"),
+    ("Why would I add an index to a table?", "QXB3040"),
+    ("What happens when a program touches memory that is not loaded?", "QXC2070"),
+    ("How do I prove something holds for every natural number?", "QXC1060"),
+    ("What does the 404 status code mean?", "QXB3050"),
+    ("Explain O(n log n) sorting", "QXA2030"),
+    ("What is the difference between TCP and UDP?", "QXB3050"),
+    ("When should I use recursion instead of a loop?", "QXA2030"),
+    ("How do branches work in git?", "QXD3080"),
+    ("What is third normal form?", "QXB3040"),
+]
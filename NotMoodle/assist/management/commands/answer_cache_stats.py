@@ -0,0 +1,34 @@
+"""
+Report the semantic answer cache hit rate and how many questions were coalesced
+into an identical question already being answered (assist.single_flight).
+
+Usage:
+    python manage.py answer_cache_stats [--days 7]
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from assist import answer_cache, single_flight
+
+
+class Command(BaseCommand):
+    help = "Show how many assistant questions were answered from the semantic answer cache or coalesced"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="Only questions asked in the last N days (0 = all time)")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"]) if options["days"] else None
+        stats = answer_cache.get_stats(since=since)
+        period = f"last {options['days']} days" if since else "all time"
+        self.stdout.write(
+            f"Answer cache ({period}): {stats['hits']} hits / {stats['eligible']} eligible questions "
+            f"({stats['hit_rate']:.1%} hit rate)"
+        )
+        coalesced = single_flight.get_stats(since=since)
+        self.stdout.write(
+            f"Coalesced ({period}): {coalesced['coalesced']} of {coalesced['questions']} questions "
+            f"({coalesced['coalesced_rate']:.1%})"
+        )
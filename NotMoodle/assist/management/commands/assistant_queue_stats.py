@@ -0,0 +1,54 @@
+"""
+Report how long assistant questions waited for a chat slot (assist.admission)
+and how long generation took under each budget (assist.generation).
+
+Usage:
+    python manage.py assistant_queue_stats [--days 7]
+"""
+import statistics
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from assist.models import StudentQuestion
+
+
+def _percentiles(values) -> str:
+    values = sorted(values)
+    n = len(values)
+    return f"p50 {statistics.median(values):.0f}ms, p95 {values[min(n - 1, int(n * 0.95))]}ms, max {values[-1]}ms"
+
+
+class Command(BaseCommand):
+    help = "Show queue wait and generation latency percentiles for assistant questions that called the chat model"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="Only questions asked in the last N days (0 = all time)")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"]) if options["days"] else None
+        questions = StudentQuestion.objects.filter(queue_wait_ms__isnull=False)
+        if since is not None:
+            questions = questions.filter(created_at__gte=since)
+        rows = list(questions.values_list("queue_wait_ms", "budget", "generation_ms", "tokens_out", "truncated"))
+        period = f"last {options['days']} days" if since else "all time"
+        if not rows:
+            self.stdout.write(f"Queue wait ({period}): no model calls recorded")
+            return
+
+        waits = [wait for wait, *_ in rows]
+        queued = sum(1 for wait in waits if wait)
+        n = len(waits)
+        self.stdout.write(f"Queue wait ({period}): {n} model calls, {queued} queued ({queued / n:.1%}); {_percentiles(waits)}")
+
+        for budget in sorted({budget for _, budget, *_ in rows}):
+            answers = [row for row in rows if row[1] == budget and row[2] is not None]
+            if not answers:
+                continue
+            truncated = sum(1 for *_, was_truncated in answers if was_truncated)
+            self.stdout.write(
+                f"  {budget or '(none)'} budget: {len(answers)} answers, "
+                f"mean {statistics.mean(row[3] for row in answers):.0f} tokens, "
+                f"generation {_percentiles([row[2] for row in answers])}, {truncated / len(answers):.1%} truncated"
+            )
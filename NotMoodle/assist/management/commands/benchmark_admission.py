@@ -0,0 +1,87 @@
+"""
+Simulate exam-week load on the chat admission queue (assist.admission).
+
+One heavy user sends a burst of questions while light users each send one,
+against a simulated model that holds a slot for --chat-latency-ms. The same
+load is run through:
+
+- a plain FIFO semaphore with the same concurrency, as before admission
+  control, and
+- the fair-share admission queue, with its per-user round-robin and load
+  shedding (settings.AI_CHAT_MAX_QUEUE, AI_CHAT_MAX_QUEUE_PER_USER).
+
+and reports p50/p95 latency for each kind of user, and how many were shed.
+
+Usage:
+    python manage.py benchmark_admission [--concurrency 2] [--heavy 40] [--light 20] [--chat-latency-ms 200]
+"""
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from assist import admission
+
+
+async def _fifo(questions, concurrency: int, latency: float):
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+
+    async def ask(user):
+        async with semaphore:
+            await asyncio.sleep(latency)
+        return user, time.perf_counter() - start
+
+    return await asyncio.gather(*(ask(user) for user in questions))
+
+
+async def _fair(questions, latency: float):
+    start = time.perf_counter()
+
+    async def ask(user):
+        try:
+            async with admission.slot(user):
+                await asyncio.sleep(latency)
+        except admission.Overloaded:
+            return user, None
+        return user, time.perf_counter() - start
+
+    return await asyncio.gather(*(ask(user) for user in questions))
+
+
+def _summary(latencies) -> str:
+    served = sorted(latency for latency in latencies if latency is not None)
+    shed = len(latencies) - len(served)
+    if not served:
+        return f"all {shed} shed"
+    p95 = served[min(len(served) - 1, int(len(served) * 0.95))]
+    return f"p50 {statistics.median(served) * 1000:6.0f}ms  p95 {p95 * 1000:6.0f}ms  shed {shed}"
+
+
+class Command(BaseCommand):
+    help = "Compare FIFO and fair-share chat admission for one heavy user and many light users"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="Concurrent chat completions")
+        parser.add_argument("--heavy", type=int, default=40, help="Questions sent at once by the heavy user")
+        parser.add_argument("--light", type=int, default=20, help="Light users, one question each")
+        parser.add_argument("--chat-latency-ms", type=float, default=200.0, help="Simulated chat completion latency")
+
+    def handle(self, *args, **options):
+        latency = options["chat_latency_ms"] / 1000
+        # The heavy user's burst arrives first, then the light users' questions
+        questions = ["heavy"] * options["heavy"] + [f"light{i}" for i in range(options["light"])]
+
+        runs = {"FIFO semaphore": asyncio.run(_fifo(questions, options["concurrency"], latency))}
+        with override_settings(AI_CHAT_CONCURRENCY=options["concurrency"], AI_CHAT_QUEUE_TIMEOUT=3600):
+            admission.reset_stats()
+            runs["Fair-share queue"] = asyncio.run(_fair(questions, latency))
+
+        for label, results in runs.items():
+            heavy = [latency for user, latency in results if user == "heavy"]
+            light = [latency for user, latency in results if user != "heavy"]
+            self.stdout.write(f"{label}:")
+            self.stdout.write(f"  heavy user   {_summary(heavy)}")
+            self.stdout.write(f"  light users  {_summary(light)}")
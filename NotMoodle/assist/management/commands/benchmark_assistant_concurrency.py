@@ -0,0 +1,137 @@
+"""
+Benchmark sync vs async assistant throughput against a local stand-in LLM server.
+
+Starts a threaded HTTP server that answers /api/embed and /v1/chat/completions
+after a simulated latency, then sends the same burst of concurrent questions
+(embed the question, then one chat completion) through:
+
+- the sync client on a fixed pool of worker threads, as a WSGI deployment
+  with that many workers would serve them, and
+- the async client on a single event loop, as the async ask_assistant view
+  does under ASGI.
+
+Usage:
+    python manage.py benchmark_assistant_concurrency [--questions 64] [--workers 4] [--chat-latency-ms 500]
+"""
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from assist import ollama
+
+
+def _make_handler(embed_latency: float, chat_latency: float, dim: int):
+    class StandInLLM(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if self.path == "/api/embed":
+                time.sleep(embed_latency)
+                payload = {"embeddings": [[0.1] * dim for _ in body["input"]]}
+            elif self.path == "/v1/chat/completions":
+                time.sleep(chat_latency)
+                question = body["messages"][-1]["content"]
+                payload = {"choices": [{"message": {"content": f"Answer to: {question}"}}]}
+            else:
+                self.send_error(404)
+                return
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return StandInLLM
+
+
+def _messages(question: str):
+    return [{"role": "system", "content": "You are a tutor."}, {"role": "user", "content": question}]
+
+
+# Latencies are measured from the start of the burst, so time spent waiting
+# for a free sync worker counts, as it would for a queued HTTP request
+def _ask_sync(question: str, start: float) -> float:
+    ollama.embed_texts([question], model="bench", use_cache=False)
+    ollama.chat(_messages(question), model="bench")
+    return time.perf_counter() - start
+
+
+async def _ask_async(question: str, start: float) -> float:
+    await ollama.aembed_texts([question], model="bench", use_cache=False)
+    await ollama.achat(_messages(question), model="bench")
+    return time.perf_counter() - start
+
+
+def _run_sync(questions, workers: int, start: float):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda question: _ask_sync(question, start), questions))
+
+
+async def _run_async(questions, start: float):
+    try:
+        return await asyncio.gather(*(_ask_async(question, start) for question in questions))
+    finally:
+        await ollama.aclose_client()
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # the whole burst connects at once
+
+
+class Command(BaseCommand):
+    help = "Compare sync worker-pool and async event-loop throughput for assistant questions against a stand-in LLM"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=64, help="Concurrent questions in the burst")
+        parser.add_argument("--workers", type=int, default=4, help="Sync worker threads (WSGI workers)")
+        parser.add_argument("--embed-latency-ms", type=float, default=20.0, help="Simulated embedding latency")
+        parser.add_argument("--chat-latency-ms", type=float, default=500.0, help="Simulated chat completion latency")
+        parser.add_argument("--dim", type=int, default=768, help="Embedding dimensions")
+
+    def handle(self, *args, **options):
+        handler = _make_handler(options["embed_latency_ms"] / 1000, options["chat_latency_ms"] / 1000, options["dim"])
+        server = _StandInServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        questions = [f"Benchmark question {i}?" for i in range(options["questions"])]
+
+        results = {}
+        try:
+            with override_settings(OLLAMA_BASE_URL=base_url):
+                ollama.close_client()
+                start = time.perf_counter()
+                latencies = _run_sync(questions, options["workers"], start)
+                results[f"Sync ({options['workers']} workers)"] = (time.perf_counter() - start, latencies)
+                ollama.close_client()
+
+                start = time.perf_counter()
+                latencies = asyncio.run(_run_async(questions, start))
+                results["Async (1 event loop)"] = (time.perf_counter() - start, latencies)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        n = len(questions)
+        for label, (elapsed, latencies) in results.items():
+            latencies = sorted(latencies)
+            p95 = latencies[min(n - 1, int(n * 0.95))]
+            self.stdout.write(
+                f"{label}: {elapsed:.2f}s, {n / elapsed:.1f} questions/s, "
+                f"p50 {statistics.median(latencies) * 1000:.0f}ms, p95 {p95 * 1000:.0f}ms"
+            )
+        (sync_elapsed, _), (async_elapsed, _) = results.values()
+        self.stdout.write(self.style.SUCCESS(f"Async throughput: {sync_elapsed / async_elapsed:.1f}x sync"))
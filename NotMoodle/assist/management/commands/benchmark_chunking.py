@@ -0,0 +1,97 @@
+"""
+Micro-benchmark for the RAG chunker (assist.chunking) on large inputs.
+
+Builds a synthetic document of the requested size from the retrieval fixture
+corpus (headings, paragraphs and PDF-style wrapped lines), then chunks it:
+
+- string: the whole document passed as one string
+- stream: the same text fed in 64 KiB pieces, as a file or PDF pages would be
+
+and reports throughput, peak traced memory and the token size of the chunks.
+In stream mode the timing also covers generating the input; tracing memory slows
+both modes alike.
+
+Usage:
+    python manage.py benchmark_chunking [--megabytes 5] [--tokens 256] [--overlap 40]
+"""
+import itertools
+import statistics
+import textwrap
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from assist.chunking import chunk_stream
+from assist.tokenizers import count_tokens
+
+from ._retrieval_corpus import LESSONS
+
+PIECE_SIZE = 64 * 1024
+
+
+def synthetic_pieces(size: int):
+    """About `size` characters of lesson-like text, generated piece by piece."""
+    bodies = [
+        "\n\n".join(lesson["chunks"]) + "\n\n" + textwrap.fill(" ".join(lesson["chunks"]), width=80) + "\n\n"
+        for lesson in LESSONS
+    ]
+    emitted = 0
+    for n, (lesson, body) in enumerate(itertools.cycle(zip(LESSONS, bodies))):
+        if emitted >= size:
+            return
+        section = f"# {lesson['title']} (part {n})\n\n{body}"
+        emitted += len(section)
+        yield section
+
+
+def stream_pieces(size: int):
+    """synthetic_pieces regrouped into PIECE_SIZE pieces, cutting mid-paragraph."""
+    buffer = ""
+    for section in synthetic_pieces(size):
+        buffer += section
+        while len(buffer) >= PIECE_SIZE:
+            yield buffer[:PIECE_SIZE]
+            buffer = buffer[PIECE_SIZE:]
+    if buffer:
+        yield buffer
+
+
+class Command(BaseCommand):
+    help = "Measure chunking throughput, memory and chunk sizes on a large synthetic document"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--megabytes", type=float, default=5.0, help="Size of the synthetic document")
+        parser.add_argument("--tokens", type=int, default=None, help="Chunk budget (default AI_CHUNK_TOKENS)")
+        parser.add_argument("--overlap", type=int, default=None, help="Overlap (default AI_CHUNK_OVERLAP_TOKENS)")
+
+    def handle(self, *args, **options):
+        size = int(options["megabytes"] * 1024 * 1024)
+        modes = {
+            "string": lambda: ["".join(synthetic_pieces(size))],
+            "stream": lambda: stream_pieces(size),
+        }
+        self.stdout.write(f"{size / 1024 / 1024:.1f} MB of synthetic lesson text")
+
+        for name, make_input in modes.items():
+            tracemalloc.start()
+            pieces = make_input()
+            chunks = chunk_stream(pieces, options["tokens"], options["overlap"])
+            sizes = []
+            elapsed = 0.0
+            while True:
+                # Time the chunker only, not the token counts measured below
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                elapsed += time.perf_counter() - start
+                if chunk is None:
+                    break
+                sizes.append(count_tokens(chunk))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(
+                f"  {name:<7} {size / 1024 / 1024 / elapsed:6.2f} MB/s  peak {peak / 1024 / 1024:7.1f} MB  "
+                f"{len(sizes)} chunks, tokens min {min(sizes)} / mean {statistics.mean(sizes):.0f} / "
+                f"max {max(sizes)} (stdev {statistics.pstdev(sizes):.0f})"
+            )
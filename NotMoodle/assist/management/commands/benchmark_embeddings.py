@@ -0,0 +1,111 @@
+"""
+Benchmark embed_texts against a local stand-in Ollama server.
+
+Starts a threaded HTTP server that answers /api/embed and /api/embeddings with
+fixed-size vectors after a simulated model latency, then times the original
+one-request-per-text loop against the batched, concurrent embed_texts.
+
+Usage:
+    python manage.py benchmark_embeddings [--texts 500] [--latency-ms 20]
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from assist import ollama
+
+
+def _make_handler(latency: float, per_item: float, dim: int):
+    class StandInOllama(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if self.path == "/api/embed":
+                inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                time.sleep(latency + per_item * len(inputs))
+                payload = {"embeddings": [[float(len(text) % 7)] * dim for text in inputs]}
+            elif self.path == "/api/embeddings":
+                time.sleep(latency + per_item)
+                payload = {"embedding": [float(len(body["prompt"]) % 7)] * dim}
+            else:
+                self.send_error(404)
+                return
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return StandInOllama
+
+
+def _sequential_embed(base_url: str, texts, model: str):
+    """The pre-batching implementation: one request per text on a fresh client."""
+    embeddings = []
+    with httpx.Client(timeout=60.0) as client:
+        for text in texts:
+            response = client.post(f"{base_url}/api/embeddings", json={"model": model, "prompt": text})
+            response.raise_for_status()
+            embeddings.append(response.json()["embedding"])
+    return embeddings
+
+
+class Command(BaseCommand):
+    help = "Compare sequential and batched embedding throughput against a local stand-in Ollama server"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--texts", type=int, default=500, help="Number of texts to embed")
+        parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated per-request latency")
+        parser.add_argument("--per-item-ms", type=float, default=1.0, help="Simulated per-text model time")
+        parser.add_argument("--dim", type=int, default=768, help="Embedding dimensions")
+        parser.add_argument("--batch-size", type=int, default=32)
+        parser.add_argument("--concurrency", type=int, default=4)
+
+    def handle(self, *args, **options):
+        handler = _make_handler(options["latency_ms"] / 1000, options["per_item_ms"] / 1000, options["dim"])
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        texts = [f"Benchmark chunk {i}: " + "lorem ipsum " * (i % 50) for i in range(options["texts"])]
+
+        try:
+            start = time.perf_counter()
+            expected = _sequential_embed(base_url, texts, "bench")
+            sequential = time.perf_counter() - start
+
+            with override_settings(
+                OLLAMA_BASE_URL=base_url,
+                AI_EMBED_BATCH_SIZE=options["batch_size"],
+                AI_EMBED_CONCURRENCY=options["concurrency"],
+            ):
+                ollama.close_client()
+                start = time.perf_counter()
+                batched_result = ollama.embed_texts(texts, model="bench", use_cache=False)
+                batched = time.perf_counter() - start
+                ollama.close_client()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        if batched_result != expected:
+            self.stdout.write(self.style.ERROR("Batched embeddings differ from sequential results"))
+            return
+
+        n = len(texts)
+        self.stdout.write(f"Sequential /api/embeddings: {sequential:.2f}s ({n / sequential:.0f} texts/s)")
+        self.stdout.write(
+            f"Batched /api/embed (batch={options['batch_size']}, concurrency={options['concurrency']}): "
+            f"{batched:.2f}s ({n / batched:.0f} texts/s)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {sequential / batched:.1f}x, results identical and in order"))
@@ -0,0 +1,116 @@
+"""
+Latency and hit-rate benchmark for vector, full-text and hybrid chunk retrieval.
+
+Loads a small fixture corpus (_retrieval_corpus.py) into the database inside a
+transaction that is rolled back at the end, embeds it, then runs each labelled
+question through:
+
+- vector: embedding + cosine search (views.search_chunks)
+- lexical: full-text search only (hybrid_search.lexical_search)
+- hybrid: embedding + both rankings fused by RRF (views.hybrid_search)
+- auto: what ask_assistant does, i.e. the lexical fast path for code-like
+  questions that match, hybrid otherwise
+
+A question is a hit when a chunk of its labelled lesson is in the top k.
+Latencies include the embedding call where one is made. Existing chunks stay
+searchable, so results also reflect the real corpus.
+
+Usage:
+    python manage.py benchmark_hybrid_search [--top-k 5] [--repeat 3]
+"""
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from assist import hybrid_search
+from assist.models import DocumentChunk
+from assist.ollama import embed_texts
+from assist.views import hybrid_search as fused_search, search_chunks
+from lesson_management.models import Lesson
+from teachersManagement.models import TeacherProfile
+
+from ._retrieval_corpus import LESSONS, QUERIES
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare vector, full-text and hybrid retrieval on a fixture corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per question (latency is the median)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Hybrid search benchmarks need PostgreSQL (full-text search and pgvector)")
+
+        try:
+            with transaction.atomic():
+                self._load_corpus()
+                self._run(options["top_k"], options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _load_corpus(self):
+        user = User.objects.create(username="benchmark-hybrid-search")
+        designer = TeacherProfile.objects.create(user=user)
+        texts = [text for lesson in LESSONS for text in lesson["chunks"]]
+        embeddings = iter(embed_texts(texts))
+        for spec in LESSONS:
+            lesson = Lesson.objects.create(
+                unit_code=spec["unit_code"], title=spec["title"], estimated_effort=1,
+                lesson_designer=designer, status="published",
+            )
+            DocumentChunk.objects.bulk_create([
+                DocumentChunk(lesson=lesson, content=text, embedding=next(embeddings)) for text in spec["chunks"]
+            ])
+            hybrid_search.update_search_vectors(lesson)
+
+    def _run(self, top_k, repeat):
+        def embed(question):
+            return embed_texts([question], use_cache=False)[0]
+
+        def auto(question):
+            if hybrid_search.is_code_like(question):
+                rows = hybrid_search.lexical_search(question, limit=top_k)
+                if rows:
+                    return rows
+            return fused_search(question, embed(question), top_k=top_k)
+
+        modes = {
+            "vector": lambda q: search_chunks(embed(q), top_k=top_k),
+            "lexical": lambda q: hybrid_search.lexical_search(q, limit=top_k),
+            "hybrid": lambda q: fused_search(q, embed(q), top_k=top_k),
+            "auto": auto,
+        }
+
+        self.stdout.write(
+            f"{len(QUERIES)} questions over {DocumentChunk.objects.count()} chunks, k={top_k}, median of {repeat} runs"
+        )
+        for name, search in modes.items():
+            hits = 0
+            code_hits = 0
+            latencies = []
+            for question, expected in QUERIES:
+                runs = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    rows = search(question)
+                    runs.append((time.perf_counter() - start) * 1000)
+                latencies.append(statistics.median(runs))
+                if any(row["lesson_code"] == expected for row in rows):
+                    hits += 1
+                    code_hits += hybrid_search.is_code_like(question)
+            codes = sum(hybrid_search.is_code_like(question) for question, _ in QUERIES)
+            p95 = sorted(latencies)[int(0.95 * (len(latencies) - 1))]
+            self.stdout.write(
+                f"  {name:<8} hit@{top_k} {hits / len(QUERIES):.2f} (code-like {code_hits}/{codes})  "
+                f"mean {statistics.mean(latencies):.1f} ms  p95 {p95:.1f} ms"
+            )
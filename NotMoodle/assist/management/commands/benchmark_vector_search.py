@@ -0,0 +1,141 @@
+"""
+Recall-vs-latency benchmark for the ANN index on DocumentChunk.embedding.
+
+Samples query vectors (existing chunk embeddings, or embedded --question texts),
+runs an exact search as ground truth, then the index search at each ef_search
+(HNSW) or probes (IVFFlat) value, and reports recall@k and latency.
+
+With a quantized index (AI_VECTOR_QUANTIZATION, migration 0010) the index search
+is the quantized candidate search plus full-precision re-rank that retrieval
+uses; --candidates compares re-rank depths. The on-disk size of the table and
+each vector index is printed first, as a proxy for the memory they need.
+
+Usage:
+    python manage.py benchmark_vector_search [--queries 50] [--top-k 5] [--values 10,20,40,80,160]
+                                             [--candidates 20,40,80]
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from pgvector.django import CosineDistance
+
+from assist.models import DocumentChunk
+from assist.ollama import embed_texts
+from assist.vector_search import ann_session, quantization, rerank_candidates
+
+
+class Command(BaseCommand):
+    help = "Compare ANN (HNSW/IVFFlat) results against exact search on the chunk corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=50, help="Number of sampled query vectors")
+        parser.add_argument("--question", action="append", default=[], help="Embed and use this question (repeatable)")
+        parser.add_argument("--top-k", type=int, default=5)
+        parser.add_argument("--lesson-id", type=int, help="Benchmark searches filtered to one lesson")
+        parser.add_argument(
+            "--values",
+            default="",
+            help="Comma-separated ef_search (HNSW) or probes (IVFFlat) values; defaults depend on the index",
+        )
+        parser.add_argument(
+            "--candidates",
+            default="",
+            help="Comma-separated re-rank depths to compare with a quantized index (default AI_VECTOR_RERANK_CANDIDATES)",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Vector index benchmarks need PostgreSQL with pgvector")
+
+        mode = quantization()
+        index_type = self._index_type()
+        if index_type is None:
+            raise CommandError("No HNSW or IVFFlat index found on assist_documentchunk.embedding")
+        knob = "ef_search" if index_type == "hnsw" else "probes"
+        default_values = "10,20,40,80,160" if index_type == "hnsw" else "1,5,10,20,50"
+        values = [int(v) for v in (options["values"] or default_values).split(",")]
+
+        queries = self._query_vectors(options["queries"], options["question"])
+        if not queries:
+            raise CommandError("No chunks indexed yet; run index_lessons_for_rag first")
+
+        top_k = options["top_k"]
+        queryset = DocumentChunk.objects.all()
+        if options.get("lesson_id"):
+            queryset = queryset.filter(lesson_id=options["lesson_id"])
+
+        depths = [None]
+        if mode != "none":
+            default_depth = str(getattr(settings, "AI_VECTOR_RERANK_CANDIDATES", 40))
+            depths = [int(v) for v in (options["candidates"] or default_depth).split(",")]
+
+        def search(vector, candidates=None, **session):
+            with ann_session(**session):
+                start = time.perf_counter()
+                narrowed = queryset
+                if candidates is not None:
+                    narrowed = rerank_candidates(queryset, vector, max(top_k, candidates), mode)
+                ids = list(
+                    narrowed.order_by(CosineDistance("embedding", vector)).values_list("id", flat=True)[:top_k]
+                )
+                return ids, time.perf_counter() - start
+
+        exact = [search(vector, exact=True) for vector in queries]
+        exact_ms = [elapsed * 1000 for _, elapsed in exact]
+        self._report_sizes()
+        self.stdout.write(
+            f"{index_type.upper()} index ({mode if mode != 'none' else 'full precision'}), "
+            f"{queryset.count()} chunks, {len(queries)} queries, k={top_k}"
+        )
+        self.stdout.write(f"  exact: mean {statistics.mean(exact_ms):.2f} ms")
+
+        for depth in depths:
+            for value in values:
+                recalls = []
+                latencies = []
+                for vector, (truth, _) in zip(queries, exact):
+                    ids, elapsed = search(vector, depth, **{knob: max(value, depth or 0)})
+                    latencies.append(elapsed * 1000)
+                    if truth:
+                        recalls.append(len(set(ids) & set(truth)) / len(truth))
+                p95 = sorted(latencies)[int(0.95 * (len(latencies) - 1))]
+                label = f"{knob}={value:<4}" + (f" candidates={depth:<4}" if depth else "")
+                self.stdout.write(
+                    f"  {label} recall@{top_k} {statistics.mean(recalls or [1.0]):.3f}  "
+                    f"mean {statistics.mean(latencies):.2f} ms  p95 {p95:.2f} ms"
+                )
+
+    def _report_sizes(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_size_pretty(pg_table_size('assist_documentchunk'))")
+            self.stdout.write(f"Table assist_documentchunk: {cursor.fetchone()[0]}")
+            cursor.execute(
+                "SELECT indexname, pg_size_pretty(pg_relation_size(indexname::regclass)) FROM pg_indexes "
+                "WHERE tablename = 'assist_documentchunk' AND indexdef LIKE %s ORDER BY indexname",
+                ["%embedding%"],
+            )
+            for name, size in cursor.fetchall():
+                self.stdout.write(f"  index {name}: {size}")
+
+    def _index_type(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes WHERE tablename = 'assist_documentchunk' AND indexdef LIKE %s",
+                ["%embedding%"],
+            )
+            definitions = " ".join(row[0].lower() for row in cursor.fetchall())
+        for index_type in ("hnsw", "ivfflat"):
+            if f"using {index_type}" in definitions:
+                return index_type
+        return None
+
+    def _query_vectors(self, count, questions):
+        if questions:
+            return embed_texts(questions)
+        return [
+            list(embedding)
+            for embedding in DocumentChunk.objects.order_by("?").values_list("embedding", flat=True)[:count]
+        ]
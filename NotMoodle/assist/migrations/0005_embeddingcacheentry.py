@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:52
+
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assist", "0004_rename_assist_docu_lesson__a1b2c3_idx_assist_docu_lesson__9efbd5_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmbeddingCacheEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model", models.CharField(help_text="Embedding model name", max_length=100)),
+                ("text_hash", models.CharField(help_text="SHA-256 of the normalized text", max_length=64)),
+                ("embedding", pgvector.django.vector.VectorField(help_text="Cached embedding vector (any dimension)")),
+                ("hits", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("last_used_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("model", "text_hash"), name="assist_embedding_cache_key")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:54
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_content_hash(apps, schema_editor):
+    """Hash existing chunks so the first incremental run keeps them instead of re-embedding."""
+    DocumentChunk = apps.get_model("assist", "DocumentChunk")
+    chunks = list(DocumentChunk.objects.only("id", "content"))
+    for chunk in chunks:
+        chunk.content_hash = hashlib.sha256(chunk.content.encode("utf-8")).hexdigest()
+    DocumentChunk.objects.bulk_update(chunks, ["content_hash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assist", "0005_embeddingcacheentry"),
+        ("lesson_management", "0011_lessonresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentchunk",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 of the content; unchanged chunks are kept on re-index",
+                max_length=64,
+            ),
+        ),
+        migrations.CreateModel(
+            name="LessonIndexState",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("fingerprint", models.CharField(blank=True, default="", max_length=64)),
+                ("dirty", models.BooleanField(db_index=True, default=True)),
+                ("indexed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "lesson",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="index_state",
+                        to="lesson_management.lesson",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
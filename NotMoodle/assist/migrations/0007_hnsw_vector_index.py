@@ -0,0 +1,65 @@
+"""
+Replace the IVFFlat index on DocumentChunk.embedding with HNSW (cosine).
+
+Set AI_VECTOR_INDEX=ivfflat before migrating to keep an IVFFlat index instead.
+Build parameters come from settings (AI_HNSW_M, AI_HNSW_EF_CONSTRUCTION,
+AI_IVFFLAT_LISTS); search parameters are applied per query by assist.vector_search.
+"""
+from django.conf import settings
+from django.db import migrations, connection
+
+IVFFLAT_INDEX = "assist_documentchunk_embedding_ivfflat_idx"
+HNSW_INDEX = "assist_documentchunk_embedding_hnsw_idx"
+
+
+def create_ann_index(apps, schema_editor):
+    """Only create vector index on PostgreSQL."""
+    if connection.vendor != 'postgresql':
+        return
+
+    if getattr(settings, "AI_VECTOR_INDEX", "hnsw") == "ivfflat":
+        lists = int(getattr(settings, "AI_IVFFLAT_LISTS", 100))
+        schema_editor.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {IVFFLAT_INDEX}
+            ON assist_documentchunk USING ivfflat (embedding vector_cosine_ops)
+            WITH (lists = {lists});
+        """)
+        return
+
+    m = int(getattr(settings, "AI_HNSW_M", 16))
+    ef_construction = int(getattr(settings, "AI_HNSW_EF_CONSTRUCTION", 64))
+    schema_editor.execute(f"""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS {HNSW_INDEX}
+        ON assist_documentchunk USING hnsw (embedding vector_cosine_ops)
+        WITH (m = {m}, ef_construction = {ef_construction});
+    """)
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {IVFFLAT_INDEX};")
+
+
+def drop_ann_index(apps, schema_editor):
+    """Restore the original IVFFlat index."""
+    if connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(f"""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS {IVFFLAT_INDEX}
+        ON assist_documentchunk USING ivfflat (embedding vector_cosine_ops)
+        WITH (lists = 100);
+    """)
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {HNSW_INDEX};")
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY operations cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('assist', '0006_lesson_index_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=create_ann_index,
+            reverse_code=drop_ann_index,
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:08
+
+import django.db.models.deletion
+import pgvector.django.vector
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assist", "0007_hnsw_vector_index"),
+        ("lesson_management", "0011_lessonresult"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentquestion",
+            name="cacheable",
+            field=models.BooleanField(
+                default=False,
+                help_text="Answer may be served to similar questions; cleared when the lesson is re-indexed",
+            ),
+        ),
+        migrations.AddField(
+            model_name="studentquestion",
+            name="cached_from",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Earlier question whose answer was reused",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="cache_hits",
+                to="assist.studentquestion",
+            ),
+        ),
+        migrations.AddField(
+            model_name="studentquestion",
+            name="from_cache",
+            field=models.BooleanField(default=False, help_text="Answered from the semantic cache"),
+        ),
+        migrations.AddField(
+            model_name="studentquestion",
+            name="lesson",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Lesson the question was asked about",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="ai_questions",
+                to="lesson_management.lesson",
+            ),
+        ),
+        migrations.AddField(
+            model_name="studentquestion",
+            name="question_embedding",
+            field=pgvector.django.vector.VectorField(
+                blank=True,
+                dimensions=768,
+                help_text="Embedding of a cache-eligible (general, lesson-scoped) question",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentquestion",
+            index=models.Index(fields=["lesson", "cacheable", "-created_at"], name="assist_stud_lesson__b9ae74_idx"),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:21
+"""
+Add DocumentChunk.search_vector for full-text search (assist.hybrid_search).
+
+On PostgreSQL existing chunks are backfilled (lesson code and title weighted
+A, content weighted B, text search config from settings.AI_SEARCH_CONFIG) and
+a GIN index is built. Elsewhere the column is added but stays empty.
+"""
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import connection, migrations
+
+GIN_INDEX = "assist_documentchunk_search_vector_gin_idx"
+
+
+def backfill_and_index(apps, schema_editor):
+    """Only on PostgreSQL."""
+    if connection.vendor != "postgresql":
+        return
+
+    config = getattr(settings, "AI_SEARCH_CONFIG", "english")
+    schema_editor.execute(
+        """
+        UPDATE assist_documentchunk AS chunk
+        SET search_vector =
+            setweight(to_tsvector(%s::regconfig, coalesce(lesson.unit_code, '') || ' ' || coalesce(lesson.title, '')), 'A')
+            || setweight(to_tsvector(%s::regconfig, coalesce(chunk.content, '')), 'B')
+        FROM lesson_management_lesson AS lesson
+        WHERE lesson.id = chunk.lesson_id;
+        """,
+        params=[config, config],
+    )
+    schema_editor.execute(f"""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS {GIN_INDEX}
+        ON assist_documentchunk USING gin (search_vector);
+    """)
+
+
+def drop_index(apps, schema_editor):
+    if connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {GIN_INDEX};")
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY operations cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("assist", "0008_student_question_answer_cache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentchunk",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                help_text="Full-text vector of the lesson code/title and content, for lexical search",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(
+            code=backfill_and_index,
+            reverse_code=drop_index,
+        ),
+    ]
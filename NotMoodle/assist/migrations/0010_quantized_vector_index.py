@@ -0,0 +1,79 @@
+"""
+Index a quantized DocumentChunk.embedding when settings.AI_VECTOR_QUANTIZATION
+is "halfvec" or "binary" (needs pgvector >= 0.7 on the server).
+
+The quantized expression index replaces the full-precision one from migration
+0007; embeddings stay float32 in the table for the re-rank step in
+assist.vector_search.rerank_candidates. With "none" nothing changes.
+
+To switch an existing database, migrate back to 0009 (restoring the
+full-precision index), change AI_VECTOR_QUANTIZATION, and migrate again.
+"""
+from django.conf import settings
+from django.db import migrations, connection
+
+DIMENSIONS = 768
+IVFFLAT_INDEX = "assist_documentchunk_embedding_ivfflat_idx"
+HNSW_INDEX = "assist_documentchunk_embedding_hnsw_idx"
+QUANTIZED_INDEXES = {
+    # name, indexed expression, operator class
+    "halfvec": ("assist_documentchunk_embedding_halfvec_idx", f"(embedding::halfvec({DIMENSIONS}))", "halfvec_cosine_ops"),
+    "binary": ("assist_documentchunk_embedding_binary_idx", f"(binary_quantize(embedding)::bit({DIMENSIONS}))", "bit_hamming_ops"),
+}
+
+
+def _index_method():
+    """USING clause for the configured index type."""
+    if getattr(settings, "AI_VECTOR_INDEX", "hnsw") == "ivfflat":
+        return f"ivfflat (%s %s) WITH (lists = {int(getattr(settings, 'AI_IVFFLAT_LISTS', 100))})"
+    m = int(getattr(settings, "AI_HNSW_M", 16))
+    ef_construction = int(getattr(settings, "AI_HNSW_EF_CONSTRUCTION", 64))
+    return f"hnsw (%s %s) WITH (m = {m}, ef_construction = {ef_construction})"
+
+
+def create_quantized_index(apps, schema_editor):
+    """Only on PostgreSQL, and only when quantization is configured."""
+    if connection.vendor != "postgresql":
+        return
+    mode = getattr(settings, "AI_VECTOR_QUANTIZATION", "none") or "none"
+    if mode == "none":
+        return
+
+    name, expression, opclass = QUANTIZED_INDEXES[mode]
+    schema_editor.execute(f"""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}
+        ON assist_documentchunk USING {_index_method() % (expression, opclass)};
+    """)
+    # The full-precision index is what no longer fits in memory; re-ranking reads the table
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {HNSW_INDEX};")
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {IVFFLAT_INDEX};")
+
+
+def restore_full_index(apps, schema_editor):
+    """Rebuild the full-precision index from migration 0007 and drop quantized ones."""
+    if connection.vendor != "postgresql":
+        return
+
+    name = IVFFLAT_INDEX if getattr(settings, "AI_VECTOR_INDEX", "hnsw") == "ivfflat" else HNSW_INDEX
+    schema_editor.execute(f"""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}
+        ON assist_documentchunk USING {_index_method() % ("embedding", "vector_cosine_ops")};
+    """)
+    for quantized_name, _, _ in QUANTIZED_INDEXES.values():
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {quantized_name};")
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY operations cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("assist", "0009_document_chunk_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=create_quantized_index,
+            reverse_code=restore_full_index,
+        ),
+    ]
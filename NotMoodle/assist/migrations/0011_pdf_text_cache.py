@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assist", "0010_quantized_vector_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PdfTextCacheEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("file_hash", models.CharField(help_text="SHA-256 of the PDF bytes", max_length=64, unique=True)),
+                (
+                    "text",
+                    models.TextField(
+                        blank=True, help_text="Extracted text (empty if the PDF had none or failed to parse)"
+                    ),
+                ),
+                ("page_count", models.PositiveIntegerField(default=0)),
+                (
+                    "error",
+                    models.CharField(
+                        blank=True, default="", help_text="Why extraction failed, if it did", max_length=255
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
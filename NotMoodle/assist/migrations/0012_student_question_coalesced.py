@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assist", "0011_pdf_text_cache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentquestion",
+            name="coalesced",
+            field=models.BooleanField(
+                default=False,
+                help_text="Answered by joining an identical question already in progress (assist.single_flight)",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assist", "0012_student_question_coalesced"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentquestion",
+            name="queue_wait_ms",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Milliseconds spent waiting for a chat slot (assist.admission); empty if the model was not called",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assist", "0013_student_question_queue_wait"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentquestion",
+            name="budget",
+            field=models.CharField(blank=True, default="", help_text="Generation budget applied", max_length=16),
+        ),
+        migrations.AddField(
+            model_name="studentquestion",
+            name="first_token_ms",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Milliseconds from getting a chat slot to the first piece of the answer",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="studentquestion",
+            name="generation_ms",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Milliseconds from getting a chat slot to the end of the answer", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="studentquestion",
+            name="max_tokens",
+            field=models.PositiveIntegerField(blank=True, help_text="Answer token cap sent to the model", null=True),
+        ),
+        migrations.AddField(
+            model_name="studentquestion",
+            name="truncated",
+            field=models.BooleanField(default=False, help_text="The answer was cut off at max_tokens"),
+        ),
+    ]
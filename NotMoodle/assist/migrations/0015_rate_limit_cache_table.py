@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:02
+"""
+Create the table for the rate limiter's database cache (assist.rate_limit).
+
+createcachetable only acts on aliases using DatabaseCache and skips tables
+that already exist, so this is a no-op with Redis or other backends.
+"""
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assist", "0014_student_question_generation_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:15
+"""
+Create the table for the profile context's database cache (assist.selectors).
+
+As in 0015, createcachetable skips aliases that are not database caches and
+tables that already exist.
+"""
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assist", "0015_rate_limit_cache_table"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
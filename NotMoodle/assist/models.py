@@ -1,6 +1,9 @@
 """Models for NotMoodle AI Assistant (RAG-powered chatbot)."""
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from pgvector.django import VectorField
 
 
@@ -16,6 +19,12 @@ class DocumentChunk(models.Model):
         related_name="chunks"
     )
     content = models.TextField(help_text="Text content of this chunk")
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="SHA-256 of the content; unchanged chunks are kept on re-index"
+    )
     embedding = VectorField(
         dimensions=768,  # nomic-embed-text produces 768-dim vectors
         help_text="Vector embedding for semantic search"
@@ -24,6 +33,12 @@ class DocumentChunk(models.Model):
         default=0,
         help_text="Approximate token count for this chunk"
     )
+    # GIN-indexed on PostgreSQL (migration 0009); filled by assist.hybrid_search.update_search_vectors
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Full-text vector of the lesson code/title and content, for lexical search"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -37,6 +52,66 @@ class DocumentChunk(models.Model):
         return f"Chunk {self.id} from {self.lesson.unit_code}: {preview}"
 
 
+class LessonIndexState(models.Model):
+    """
+    Fingerprint of the lesson content the current chunks were built from.
+    
+    `dirty` is set by signals when the lesson or its reading list changes, so
+    index_lessons_for_rag only has to look at lessons that may have changed.
+    """
+    lesson = models.OneToOneField(
+        "lesson_management.Lesson",
+        on_delete=models.CASCADE,
+        related_name="index_state"
+    )
+    fingerprint = models.CharField(max_length=64, blank=True, default="")
+    dirty = models.BooleanField(default=True, db_index=True)
+    indexed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Index state for lesson {self.lesson_id} ({'dirty' if self.dirty else 'clean'})"
+
+
+class EmbeddingCacheEntry(models.Model):
+    """
+    Cached embedding for a normalized piece of text under one embed model.
+    
+    Lets re-indexing skip Ollama for chunks whose text has not changed.
+    See assist.embedding_cache for lookup and eviction.
+    """
+    model = models.CharField(max_length=100, help_text="Embedding model name")
+    text_hash = models.CharField(max_length=64, help_text="SHA-256 of the normalized text")
+    embedding = VectorField(help_text="Cached embedding vector (any dimension)")
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["model", "text_hash"], name="assist_embedding_cache_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.model}:{self.text_hash[:12]}"
+
+
+class PdfTextCacheEntry(models.Model):
+    """
+    Text extracted from one PDF, keyed by the SHA-256 of the file's bytes.
+    
+    Lets re-indexing skip parsing for assignment PDFs and attachments that have
+    not changed. See assist.pdf_text.
+    """
+    file_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the PDF bytes")
+    text = models.TextField(blank=True, help_text="Extracted text (empty if the PDF had none or failed to parse)")
+    page_count = models.PositiveIntegerField(default=0)
+    error = models.CharField(max_length=255, blank=True, default="", help_text="Why extraction failed, if it did")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"PDF text {self.file_hash[:12]} ({self.page_count} pages)"
+
+
 class StudentQuestion(models.Model):
     """
     Log of student questions to the AI assistant.
@@ -58,14 +133,160 @@ class StudentQuestion(models.Model):
         default=0,
         help_text="Approximate output tokens"
     )
+    # Semantic answer cache (see assist.answer_cache)
+    lesson = models.ForeignKey(
+        "lesson_management.Lesson",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="ai_questions",
+        help_text="Lesson the question was asked about"
+    )
+    question_embedding = VectorField(
+        dimensions=768,
+        null=True,
+        blank=True,
+        help_text="Embedding of a cache-eligible (general, lesson-scoped) question"
+    )
+    cacheable = models.BooleanField(
+        default=False,
+        help_text="Answer may be served to similar questions; cleared when the lesson is re-indexed"
+    )
+    cached_from = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="cache_hits",
+        help_text="Earlier question whose answer was reused"
+    )
+    from_cache = models.BooleanField(default=False, help_text="Answered from the semantic cache")
+    coalesced = models.BooleanField(
+        default=False,
+        help_text="Answered by joining an identical question already in progress (assist.single_flight)"
+    )
+    queue_wait_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Milliseconds spent waiting for a chat slot (assist.admission); empty if the model was not called"
+    )
+    # Generation budget and timing (see assist.generation); empty if the model was not called
+    budget = models.CharField(max_length=16, blank=True, default="", help_text="Generation budget applied")
+    max_tokens = models.PositiveIntegerField(null=True, blank=True, help_text="Answer token cap sent to the model")
+    truncated = models.BooleanField(default=False, help_text="The answer was cut off at max_tokens")
+    first_token_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Milliseconds from getting a chat slot to the first piece of the answer"
+    )
+    generation_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Milliseconds from getting a chat slot to the end of the answer"
+    )
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["user", "-created_at"]),
+            models.Index(fields=["lesson", "cacheable", "-created_at"]),
         ]
 
     def __str__(self):
         preview = self.question[:50] + "..." if len(self.question) > 50 else self.question
         return f"Q from {self.user.username} at {self.created_at:%Y-%m-%d}: {preview}"
+
+
+# ---------------------------
+# Signals
+# ---------------------------
+def _mark_lesson_dirty(lesson_id):
+    """Flag the lesson for re-indexing and queue a background re-index job."""
+    from jobs.services import enqueue_on_commit
+
+    # Lessons without a state row are treated as unindexed, so a plain UPDATE is enough
+    LessonIndexState.objects.filter(lesson_id=lesson_id, dirty=False).update(dirty=True)
+    enqueue_on_commit("assist.index_lesson", {"lesson_id": lesson_id}, dedupe_key=f"lesson:{lesson_id}")
+
+
+@receiver(post_save, sender="lesson_management.Lesson")
+def mark_index_dirty_on_lesson_save(sender, instance, raw=False, **kwargs):
+    # Drafts never have chunks, unless they were published before (which left a state row)
+    if not raw and (instance.status == "published" or LessonIndexState.objects.filter(lesson=instance).exists()):
+        _mark_lesson_dirty(instance.pk)
+
+
+@receiver(post_save, sender="lesson_management.ReadingList")
+@receiver(post_delete, sender="lesson_management.ReadingList")
+def mark_index_dirty_on_reading_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _mark_lesson_dirty(instance.lesson_id)
+
+
+@receiver(post_save, sender="lesson_management.Assignment")
+@receiver(post_delete, sender="lesson_management.Assignment")
+def mark_index_dirty_on_assignment_change(sender, instance, raw=False, **kwargs):
+    # The assignment PDF is part of the lesson's indexed content
+    if not raw:
+        _mark_lesson_dirty(instance.lesson_id)
+
+
+@receiver(post_save, sender="lesson_management.AssignmentAttachment")
+@receiver(post_delete, sender="lesson_management.AssignmentAttachment")
+def mark_index_dirty_on_attachment_change(sender, instance, raw=False, **kwargs):
+    from lesson_management.models import Assignment
+
+    if raw:
+        return
+    # Gone when the attachment is deleted along with its assignment (which marks the lesson itself)
+    lesson_id = Assignment.objects.filter(pk=instance.assignment_id).values_list("lesson_id", flat=True).first()
+    if lesson_id is not None:
+        _mark_lesson_dirty(lesson_id)
+
+
+# Cached profile context (assist.selectors.get_user_profile_context)
+@receiver(post_save, sender="classroom_and_grading.AssignmentGrade")
+@receiver(post_delete, sender="classroom_and_grading.AssignmentGrade")
+@receiver(post_save, sender="lesson_management.AssignmentSubmission")
+@receiver(post_delete, sender="lesson_management.AssignmentSubmission")
+@receiver(post_save, sender="course_management.Enrollment")
+@receiver(post_delete, sender="course_management.Enrollment")
+@receiver(post_save, sender="lesson_management.LessonEnrollment")
+@receiver(post_delete, sender="lesson_management.LessonEnrollment")
+@receiver(post_save, sender="lesson_management.VideoProgress")
+@receiver(post_save, sender="lesson_management.ReadingListProgress")
+@receiver(post_save, sender="student_management.ManageCreditPoint")
+def invalidate_profile_context_on_student_change(sender, instance, raw=False, **kwargs):
+    from .selectors import invalidate_profile_context_for_students
+
+    if not raw:
+        invalidate_profile_context_for_students([instance.student_id])
+
+
+@receiver(post_save, sender="student_management.Student")
+def invalidate_profile_context_on_student_save(sender, instance, raw=False, **kwargs):
+    from .selectors import invalidate_profile_context
+
+    if not raw:
+        invalidate_profile_context([instance.user_id])
+
+
+@receiver(post_save, sender="lesson_management.Lesson")
+@receiver(post_save, sender="lesson_management.Assignment")
+@receiver(post_delete, sender="lesson_management.Assignment")
+@receiver(post_save, sender="lesson_management.ReadingList")
+@receiver(post_delete, sender="lesson_management.ReadingList")
+def invalidate_profile_context_on_lesson_change(sender, instance, raw=False, **kwargs):
+    from .selectors import invalidate_profile_context_for_lesson
+
+    if not raw:
+        invalidate_profile_context_for_lesson(instance.pk if sender._meta.model_name == "lesson" else instance.lesson_id)
+
+
+@receiver(post_save, sender=StudentQuestion)
+def count_question_for_rate_limit(sender, instance, created, raw=False, **kwargs):
+    from .rate_limit import record_question
+
+    if created and not raw:
+        record_question(instance.user_id)
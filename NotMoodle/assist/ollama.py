@@ -4,51 +4,174 @@ Ollama client for embeddings and chat completion.
 Provides typed interfaces to Ollama's API for:
 - Generating text embeddings (nomic-embed-text)
 - Chat completions (llama3.1:8b-instruct)
+
+Each call has an async twin (aembed_texts, achat, achat_stream) for the async
+assistant view. All requests go through the pooled clients in assist.http_client.
 """
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import httpx
-from typing import List, Dict, Optional
+from asgiref.sync import sync_to_async
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 from django.conf import settings
 
+from . import embedding_cache, http_client
+from .tokenizers import count_tokens
+
+
+# Statuses worth retrying: rate limited or the server/model is temporarily unavailable
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Set once the server answers 404 on /api/embed (Ollama < 0.3); use per-text /api/embeddings after that
+_legacy_embed_endpoint = False
+
+
+def close_client() -> None:
+    """Close the pooled sync client; the next request opens a new one with current settings."""
+    global _legacy_embed_endpoint
+    http_client.close_client()
+    _legacy_embed_endpoint = False
+
+
+async def aclose_client() -> None:
+    """Close the running event loop's pooled AsyncClient."""
+    await http_client.aclose_client()
+
+
+def _post_with_retry(client: httpx.Client, url: str, payload: dict) -> httpx.Response:
+    """
+    POST with exponential backoff on transport errors and retryable statuses.
+
+    Other HTTP errors are raised immediately.
+    """
+    retries = getattr(settings, "AI_EMBED_MAX_RETRIES", 3)
+    backoff = getattr(settings, "AI_EMBED_RETRY_BACKOFF", 0.5)
+    attempt = 0
+    while True:
+        try:
+            response = client.post(url, json=payload, timeout=http_client.timeout("embed"))
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                response.raise_for_status()
+                return response
+        except httpx.TransportError:
+            if attempt >= retries:
+                raise
+        time.sleep(backoff * (2 ** attempt))
+        attempt += 1
+
+
+def _embed_batch(client: httpx.Client, texts: List[str], model: str) -> List[List[float]]:
+    """Embed one batch, using the multi-input /api/embed endpoint when the server has it."""
+    global _legacy_embed_endpoint
+    base_url = settings.OLLAMA_BASE_URL
+
+    if not _legacy_embed_endpoint:
+        try:
+            response = _post_with_retry(client, f"{base_url}/api/embed", {"model": model, "input": texts})
+            return response.json()["embeddings"]
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            _legacy_embed_endpoint = True
+
+    # Older servers: the embeddings endpoint takes a single prompt
+    return [
+        _post_with_retry(client, f"{base_url}/api/embeddings", {"model": model, "prompt": text}).json()["embedding"]
+        for text in texts
+    ]
+
+
+def _embed_uncached(texts: List[str], model: str) -> List[List[float]]:
+    """Embed texts in concurrent batches, bypassing the cache."""
+    batch_size = max(1, getattr(settings, "AI_EMBED_BATCH_SIZE", 32))
+    concurrency = max(1, getattr(settings, "AI_EMBED_CONCURRENCY", 4))
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    client = http_client.get_client()
 
-def embed_texts(texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+    if len(batches) == 1 or concurrency == 1:
+        results = [_embed_batch(client, batch, model) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as pool:
+            # map() yields in submission order, so the output lines up with `texts`
+            results = list(pool.map(lambda batch: _embed_batch(client, batch, model), batches))
+
+    return [embedding for batch in results for embedding in batch]
+
+
+def embed_texts(texts: List[str], model: Optional[str] = None, use_cache: bool = True) -> List[List[float]]:
     """
     Generate embeddings for a list of texts using Ollama.
     
+    Texts are split into batches of settings.AI_EMBED_BATCH_SIZE and sent with up
+    to settings.AI_EMBED_CONCURRENCY requests in flight over a shared pooled client.
+    Texts already in the embedding cache (assist.embedding_cache) are not sent.
+    
     Args:
         texts: List of text strings to embed
         model: Embedding model name (defaults to settings.AI_EMBED_MODEL)
+        use_cache: Consult and fill the persistent embedding cache
     
     Returns:
-        List of embedding vectors (each is a list of floats)
+        List of embedding vectors (each is a list of floats), in the same order as `texts`
     
     Raises:
-        httpx.HTTPError: If the Ollama API request fails
+        httpx.HTTPError: If the Ollama API request fails after retries
     """
     if not texts:
         return []
     
     model = model or settings.AI_EMBED_MODEL
-    url = f"{settings.OLLAMA_BASE_URL}/api/embeddings"
-    
-    embeddings = []
-    
-    # Process each text individually (Ollama embeddings endpoint expects single prompt)
-    with httpx.Client(timeout=60.0) as client:
-        for text in texts:
-            payload = {
-                "model": model,
-                "prompt": text,
-            }
-            response = client.post(url, json=payload)
-            response.raise_for_status()
-            
-            data = response.json()
-            embeddings.append(data["embedding"])
-    
-    return embeddings
+    if use_cache and embedding_cache.is_enabled():
+        embeddings = embedding_cache.get_many(model, texts)
+        # Embed each distinct missing text once
+        missing = list(dict.fromkeys(text for text, e in zip(texts, embeddings) if e is None))
+        if missing:
+            fresh = dict(zip(missing, _embed_uncached(missing, model)))
+            embedding_cache.put_many(model, missing, [fresh[text] for text in missing])
+            embeddings = [e if e is not None else fresh[text] for text, e in zip(texts, embeddings)]
+        return embeddings
 
+    return _embed_uncached(texts, model)
 
-def chat(messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
+
+def _record_usage(usage: Optional[dict], data: dict) -> None:
+    """
+    Copy the server's token counts (prompt_tokens, completion_tokens) into the
+    caller's dict, and why generation ended ("finish_reason": "length" when
+    max_tokens cut the answer short).
+    """
+    if usage is None:
+        return
+    if data.get("usage"):
+        usage.update(data["usage"])
+    if data.get("choices") and data["choices"][0].get("finish_reason"):
+        usage["finish_reason"] = data["choices"][0]["finish_reason"]
+
+
+def _stream_piece(data: str, usage: Optional[dict]) -> Optional[str]:
+    """Content of one streamed chunk; the final chunk carries only usage."""
+    chunk = json.loads(data)
+    _record_usage(usage, chunk)
+    if not chunk.get("choices"):
+        return None
+    return chunk["choices"][0].get("delta", {}).get("content") or None
+
+
+def _limits(max_tokens: Optional[int], stop: Optional[List[str]]) -> dict:
+    """Generation limits for the request payload (omitted when not set)."""
+    limits = {}
+    if max_tokens:
+        limits["max_tokens"] = max_tokens
+    if stop:
+        limits["stop"] = list(stop)
+    return limits
+
+
+def chat(messages: List[Dict[str, str]], model: Optional[str] = None, usage: Optional[dict] = None,
+         max_tokens: Optional[int] = None, stop: Optional[List[str]] = None) -> str:
     """
     Generate a chat completion using Ollama's OpenAI-compatible API.
     
@@ -56,6 +179,9 @@ def chat(messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
         messages: List of message dicts with 'role' and 'content' keys
                   Example: [{"role": "system", "content": "..."}, {"role": "user", "content": "..."}]
         model: Chat model name (defaults to settings.AI_CHAT_MODEL)
+        usage: Optional dict filled with the server-reported token usage
+        max_tokens: Cap on the answer's length in tokens (see assist.generation)
+        stop: Sequences that end generation
     
     Returns:
         Assistant's response text
@@ -70,27 +196,205 @@ def chat(messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
         "model": model,
         "messages": messages,
         "stream": False,
+        **_limits(max_tokens, stop),
+    }
+    
+    response = http_client.get_client().post(url, json=payload, timeout=http_client.timeout("chat"))
+    response.raise_for_status()
+    
+    data = response.json()
+    _record_usage(usage, data)
+    return data["choices"][0]["message"]["content"]
+
+
+def chat_stream(messages: List[Dict[str, str]], model: Optional[str] = None,
+                usage: Optional[dict] = None, max_tokens: Optional[int] = None,
+                stop: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Stream a chat completion from Ollama's OpenAI-compatible API.
+    
+    Args:
+        messages: List of message dicts with 'role' and 'content' keys
+        model: Chat model name (defaults to settings.AI_CHAT_MODEL)
+        usage: Optional dict filled with the server-reported token usage once the stream ends
+        max_tokens: Cap on the answer's length in tokens (see assist.generation)
+        stop: Sequences that end generation
+    
+    Yields:
+        Pieces of the assistant's response text as the model produces them
+    
+    Raises:
+        httpx.HTTPError: If the Ollama API request fails
+    """
+    model = model or settings.AI_CHAT_MODEL
+    url = f"{settings.OLLAMA_BASE_URL}/v1/chat/completions"
+    
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+        **_limits(max_tokens, stop),
     }
     
-    with httpx.Client(timeout=120.0) as client:
-        response = client.post(url, json=payload)
+    with http_client.get_client().stream("POST", url, json=payload, timeout=http_client.timeout("chat")) as response:
         response.raise_for_status()
-        
-        data = response.json()
-        return data["choices"][0]["message"]["content"]
+        # Server-sent events: "data: {json}" lines, terminated by "data: [DONE]"
+        for line in response.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            piece = _stream_piece(data, usage)
+            if piece:
+                yield piece
 
 
 def estimate_tokens(text: str) -> int:
     """
-    Estimate token count for a text string.
-    
-    Uses rough heuristic: ~4 characters per token (common for English).
-    For production, consider using tiktoken or similar.
+    Count tokens in a text string with the configured tokenizer (assist.tokenizers).
     
     Args:
-        text: Text to estimate tokens for
+        text: Text to count tokens for
     
     Returns:
-        Estimated token count
+        Token count
+    """
+    return count_tokens(text)
+
+
+# ---------------------------
+# Async API
+# ---------------------------
+async def _apost_with_retry(client: httpx.AsyncClient, url: str, payload: dict) -> httpx.Response:
+    """Async counterpart of _post_with_retry."""
+    retries = getattr(settings, "AI_EMBED_MAX_RETRIES", 3)
+    backoff = getattr(settings, "AI_EMBED_RETRY_BACKOFF", 0.5)
+    attempt = 0
+    while True:
+        try:
+            response = await client.post(url, json=payload, timeout=http_client.timeout("embed"))
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                response.raise_for_status()
+                return response
+        except httpx.TransportError:
+            if attempt >= retries:
+                raise
+        await asyncio.sleep(backoff * (2 ** attempt))
+        attempt += 1
+
+
+async def _aembed_batch(
+    client: httpx.AsyncClient, texts: List[str], model: str, semaphore: asyncio.Semaphore
+) -> List[List[float]]:
+    """Async counterpart of _embed_batch; every request holds `semaphore` while in flight."""
+    global _legacy_embed_endpoint
+    base_url = settings.OLLAMA_BASE_URL
+
+    async def post(url, payload):
+        async with semaphore:
+            return await _apost_with_retry(client, url, payload)
+
+    if not _legacy_embed_endpoint:
+        try:
+            response = await post(f"{base_url}/api/embed", {"model": model, "input": texts})
+            return response.json()["embeddings"]
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            _legacy_embed_endpoint = True
+
+    # Older servers take one prompt per request; the semaphore bounds how many run at once
+    responses = await asyncio.gather(*(
+        post(f"{base_url}/api/embeddings", {"model": model, "prompt": text})
+        for text in texts
+    ))
+    return [response.json()["embedding"] for response in responses]
+
+
+async def _aembed_uncached(texts: List[str], model: str) -> List[List[float]]:
+    """Embed texts in batches with at most AI_EMBED_CONCURRENCY requests in flight (on either endpoint)."""
+    batch_size = max(1, getattr(settings, "AI_EMBED_BATCH_SIZE", 32))
+    concurrency = max(1, getattr(settings, "AI_EMBED_CONCURRENCY", 4))
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+    client = http_client.get_async_client()
+
+    # gather() returns results in argument order
+    results = await asyncio.gather(*(_aembed_batch(client, batch, model, semaphore) for batch in batches))
+
+    return [embedding for batch in results for embedding in batch]
+
+
+async def aembed_texts(texts: List[str], model: Optional[str] = None, use_cache: bool = True) -> List[List[float]]:
+    """
+    Async version of embed_texts; same batching, ordering, retries and cache.
+    
+    Raises:
+        httpx.HTTPError: If the Ollama API request fails after retries
+    """
+    if not texts:
+        return []
+
+    model = model or settings.AI_EMBED_MODEL
+    if use_cache and embedding_cache.is_enabled():
+        embeddings = await sync_to_async(embedding_cache.get_many)(model, texts)
+        missing = list(dict.fromkeys(text for text, e in zip(texts, embeddings) if e is None))
+        if missing:
+            fresh = dict(zip(missing, await _aembed_uncached(missing, model)))
+            await sync_to_async(embedding_cache.put_many)(model, missing, [fresh[text] for text in missing])
+            embeddings = [e if e is not None else fresh[text] for text, e in zip(texts, embeddings)]
+        return embeddings
+
+    return await _aembed_uncached(texts, model)
+
+
+async def achat(messages: List[Dict[str, str]], model: Optional[str] = None, usage: Optional[dict] = None,
+                max_tokens: Optional[int] = None, stop: Optional[List[str]] = None) -> str:
+    """
+    Async version of chat.
+    
+    Raises:
+        httpx.HTTPError: If the Ollama API request fails
+    """
+    model = model or settings.AI_CHAT_MODEL
+    url = f"{settings.OLLAMA_BASE_URL}/v1/chat/completions"
+    payload = {"model": model, "messages": messages, "stream": False, **_limits(max_tokens, stop)}
+
+    response = await http_client.get_async_client().post(url, json=payload, timeout=http_client.timeout("chat"))
+    response.raise_for_status()
+    data = response.json()
+    _record_usage(usage, data)
+    return data["choices"][0]["message"]["content"]
+
+
+async def achat_stream(messages: List[Dict[str, str]], model: Optional[str] = None,
+                       usage: Optional[dict] = None, max_tokens: Optional[int] = None,
+                       stop: Optional[List[str]] = None) -> AsyncIterator[str]:
+    """
+    Async version of chat_stream; yields pieces of the response text.
+    
+    Raises:
+        httpx.HTTPError: If the Ollama API request fails
     """
-    return len(text) // 4
+    model = model or settings.AI_CHAT_MODEL
+    url = f"{settings.OLLAMA_BASE_URL}/v1/chat/completions"
+    payload = {
+        "model": model, "messages": messages, "stream": True, "stream_options": {"include_usage": True},
+        **_limits(max_tokens, stop),
+    }
+
+    async with http_client.get_async_client().stream(
+        "POST", url, json=payload, timeout=http_client.timeout("chat")
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            piece = _stream_piece(data, usage)
+            if piece:
+                yield piece
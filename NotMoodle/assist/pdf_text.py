@@ -0,0 +1,170 @@
+"""
+Text extraction from assignment PDFs and attachments for RAG indexing.
+
+Files are identified by the SHA-256 of their bytes. Text already extracted for
+a hash is read from PdfTextCacheEntry, so an unchanged file is parsed once no
+matter how often its lesson is re-indexed (or which lesson it is uploaded to).
+Misses are parsed page by page in a process pool (settings.AI_PDF_WORKERS)
+with the optional `pypdf` package; without it PDFs are left out of the index.
+
+index_lessons_for_rag calls extract_for_lessons() for every selected lesson
+up front, so one pool works through the whole catalog's PDFs before indexing
+starts and index_lesson only reads the cache.
+"""
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+
+from .models import PdfTextCacheEntry
+
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_stats_lock = threading.Lock()
+_stats = {"cached": 0, "parsed": 0, "failed": 0, "missing": 0}
+
+
+def is_enabled() -> bool:
+    """PDF indexing is switched on and pypdf is installed."""
+    return getattr(settings, "AI_INDEX_PDFS", True) and importlib.util.find_spec("pypdf") is not None
+
+
+def get_stats() -> Dict[str, int]:
+    """Process-wide counters since start (or the last reset): files served from cache, parsed, failed, missing."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def _count(**deltas) -> None:
+    with _stats_lock:
+        for key, value in deltas.items():
+            _stats[key] += value
+
+
+def lesson_documents(lesson) -> List[Tuple[str, object]]:
+    """(label, FieldFile) for every PDF of the lesson's assignments, in a stable order."""
+    documents = []
+    for assignment in sorted(lesson.assignments.all(), key=lambda a: a.pk):
+        if assignment.pdf:
+            documents.append((f"Assignment {assignment.title}", assignment.pdf))
+        for attachment in sorted(assignment.attachments.all(), key=lambda a: a.pk):
+            if attachment.file:
+                documents.append((f"Assignment {assignment.title} attachment {attachment.filename()}", attachment.file))
+    return documents
+
+
+def file_hash(field_file) -> str:
+    """SHA-256 of a stored file, read in chunks."""
+    digest = hashlib.sha256()
+    with field_file.storage.open(field_file.name, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source(field_file):
+    """A local path the worker can open, or the bytes for remote storages."""
+    try:
+        return field_file.storage.path(field_file.name)
+    except NotImplementedError:
+        with field_file.storage.open(field_file.name, "rb") as handle:
+            return handle.read()
+
+
+def _extract_file(source, max_chars: int) -> Tuple[str, int, str]:
+    """
+    Text of one PDF as (text, page count, error). Runs in a worker process.
+
+    Pages are read one at a time and reading stops at `max_chars`, so a huge
+    file never has all of its text in memory. Lines within a page are kept;
+    pages become paragraphs for the chunker.
+    """
+    import io
+
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+        pages = []
+        length = 0
+        for page in reader.pages:
+            text = _BLANK_LINES.sub("\n", page.extract_text() or "").strip()
+            if text:
+                pages.append(text)
+                length += len(text)
+                if max_chars and length >= max_chars:
+                    break
+        return "\n\n".join(pages)[:max_chars or None], len(reader.pages), ""
+    except Exception as exc:  # a broken upload must not stop the lesson from indexing
+        return "", 0, f"{type(exc).__name__}: {exc}"[:255]
+
+
+def _extract_many(sources: List, max_chars: int) -> List[Tuple[str, int, str]]:
+    workers = getattr(settings, "AI_PDF_WORKERS", 0) or os.cpu_count() or 1
+    if workers <= 1 or len(sources) <= 1:
+        return [_extract_file(source, max_chars) for source in sources]
+    with ProcessPoolExecutor(max_workers=min(workers, len(sources))) as pool:
+        return list(pool.map(_extract_file, sources, [max_chars] * len(sources)))
+
+
+def extract_texts(field_files: Iterable) -> Dict[str, str]:
+    """
+    Text for each file, keyed by file name.
+
+    Cached text is used where the file's hash is known; the rest are parsed
+    in parallel and cached. Files missing from storage are left out. Returns
+    {} when PDF indexing is disabled.
+    """
+    if not is_enabled():
+        return {}
+
+    hashes = {}
+    for field_file in field_files:
+        if field_file.name in hashes:
+            continue
+        try:
+            hashes[field_file.name] = (file_hash(field_file), field_file)
+        except FileNotFoundError:
+            _count(missing=1)
+
+    cached = dict(
+        PdfTextCacheEntry.objects.filter(file_hash__in={h for h, _ in hashes.values()}).values_list("file_hash", "text")
+    )
+    missing = {}
+    for digest, field_file in hashes.values():
+        if digest not in cached:
+            missing.setdefault(digest, field_file)
+
+    if missing:
+        max_chars = getattr(settings, "AI_PDF_MAX_CHARS", 200000)
+        results = _extract_many([_source(field_file) for field_file in missing.values()], max_chars)
+        PdfTextCacheEntry.objects.bulk_create(
+            [
+                PdfTextCacheEntry(file_hash=digest, text=text, page_count=pages, error=error)
+                for digest, (text, pages, error) in zip(missing, results)
+            ],
+            ignore_conflicts=True,
+        )
+        cached.update((digest, text) for digest, (text, _, _) in zip(missing, results))
+        _count(parsed=len(results), failed=sum(1 for _, _, error in results if error))
+    _count(cached=len(hashes) - len(missing))
+
+    return {name: cached[digest] for name, (digest, _) in hashes.items()}
+
+
+def extract_for_lessons(lessons: Iterable, batch_size: int = 100) -> int:
+    """Fill the cache for every PDF of `lessons`, a pool run per batch of files; returns the number of files."""
+    field_files = [field_file for lesson in lessons for _, field_file in lesson_documents(lesson)]
+    for start in range(0, len(field_files), batch_size):
+        extract_texts(field_files[start:start + batch_size])
+    return len(field_files)
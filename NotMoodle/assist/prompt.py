@@ -0,0 +1,152 @@
+"""
+Token-budgeted assembly of the assistant's chat prompt.
+
+build_prompt fits the system prompt (instructions, student profile and
+retrieved chunks) plus the question into settings.AI_PROMPT_TOKEN_BUDGET
+tokens, counted with the configured tokenizer (assist.tokenizers). When over
+budget it drops, in order:
+
+1. the least relevant chunks, down to settings.AI_PROMPT_MIN_CHUNKS;
+2. profile sections in settings.AI_PROMPT_TRIM_ORDER;
+3. the remaining chunks, least relevant first.
+
+The instructions, the basic USER PROFILE section and the question are always kept.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+
+from .tokenizers import count_tokens
+
+
+# Chat templates add a few tokens per message (role markers, separators)
+MESSAGE_OVERHEAD = 4
+NO_CONTEXT = "No relevant course content found."
+DEFAULT_TRIM_ORDER = ("RECENT PAST ASSIGNMENTS", "ENROLLED COURSES", "ENROLLED LESSONS", "UPCOMING ASSIGNMENTS")
+
+_SECTION_HEADER = re.compile(r"^=== (.+) ===$", re.MULTILINE)
+
+
+@dataclass
+class Prompt:
+    """Chat messages ready to send, their token count, the chunks used and what was trimmed."""
+    messages: List[Dict[str, str]]
+    tokens: int
+    chunks: List[Dict[str, str]]
+    dropped: List[str] = field(default_factory=list)
+
+
+def build_system_prompt(user_profile_context: str, context_text: str) -> str:
+    """System prompt with the student's profile and the retrieved course material."""
+    return f"""You are NotMoodle AI, a helpful and knowledgeable personal tutor for students in a Learning Management System.
+
+Your role:
+- Provide PERSONALIZED assistance to the logged-in student
+- Help students understand their enrolled courses and lessons
+- Answer questions based on both the student's personal information AND the course content provided below
+- Track and reference the student's progress, grades, and upcoming assignments
+- Explain concepts clearly with examples when helpful
+- Break down complex topics into digestible steps
+- Be encouraging, supportive, and patient
+
+Guidelines:
+- ALWAYS address the student by name when appropriate
+- Reference their specific enrollments, grades, and assignments when relevant
+- When asked about "my courses", "my lessons", "my grades", etc., use the student profile information below
+- If asked about enrolled lessons or courses, refer to the STUDENT PROFILE section first
+- Use both the student's personal data AND course materials to provide comprehensive answers
+- If the context contains the answer, provide it clearly and confidently
+- If the context is insufficient, acknowledge what information is available and what's missing
+- For conceptual questions, explain in a teaching style with examples
+- Keep responses focused and concise (2-4 paragraphs maximum)
+- Use markdown formatting for better readability (bold, lists, etc.)
+
+{user_profile_context}
+
+===================================
+
+Context from course materials:
+{context_text}
+"""
+
+
+def format_chunk(chunk: Dict[str, str]) -> str:
+    return f"[From {chunk['lesson_code']} - {chunk['lesson_title']}]\n{chunk['content']}"
+
+
+def split_profile_sections(text: str) -> List[Tuple[str, str]]:
+    """Split profile context into (section name, block) pairs; text before any header is named ""."""
+    starts = [m.start() for m in _SECTION_HEADER.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    blocks = [text[a:b].strip("\n") for a, b in zip(starts, starts[1:] + [len(text)])]
+    sections = []
+    for block in blocks:
+        match = _SECTION_HEADER.match(block)
+        sections.append((match.group(1) if match else "", block))
+    return sections
+
+
+def build_prompt(message: str, user_profile_context: str, context_chunks: List[Dict[str, str]],
+                 budget: int = None) -> Prompt:
+    """
+    Build the chat messages for a question within the token budget.
+
+    Args:
+        message: The student's question
+        user_profile_context: Profile text from get_user_profile_context
+        context_chunks: Retrieved chunks, most relevant first
+        budget: Token budget (defaults to settings.AI_PROMPT_TOKEN_BUDGET; 0 = unlimited)
+
+    Returns:
+        Prompt with the messages, their token count, the chunks that were
+        included and the names of anything dropped
+    """
+    if budget is None:
+        budget = getattr(settings, "AI_PROMPT_TOKEN_BUDGET", 3000)
+    min_chunks = getattr(settings, "AI_PROMPT_MIN_CHUNKS", 2)
+    trim_order = getattr(settings, "AI_PROMPT_TRIM_ORDER", DEFAULT_TRIM_ORDER)
+
+    sections = split_profile_sections(user_profile_context)
+    kept_sections = [True] * len(sections)
+    kept_chunks = [True] * len(context_chunks)
+
+    def assemble() -> Prompt:
+        profile_text = "\n\n".join(block for (_, block), kept in zip(sections, kept_sections) if kept)
+        chunks = [chunk for chunk, kept in zip(context_chunks, kept_chunks) if kept]
+        context_text = "\n\n".join(format_chunk(chunk) for chunk in chunks) if chunks else NO_CONTEXT
+        system_prompt = build_system_prompt(profile_text, context_text)
+        return Prompt(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": message},
+            ],
+            tokens=count_tokens(system_prompt) + count_tokens(message) + 2 * MESSAGE_OVERHEAD,
+            chunks=chunks,
+        )
+
+    prompt = assemble()
+    if not budget or prompt.tokens <= budget:
+        return prompt
+
+    # Drop plan, cheapest loss first; the prompt is recounted exactly after each drop
+    plan = [("chunk", i) for i in reversed(range(min_chunks, len(context_chunks)))]
+    for name in trim_order:
+        plan.extend(("section", i) for i, (section, _) in enumerate(sections) if section == name)
+    plan.extend(("chunk", i) for i in reversed(range(min(min_chunks, len(context_chunks)))))
+
+    dropped = []
+    for kind, index in plan:
+        if kind == "chunk":
+            kept_chunks[index] = False
+            dropped.append(f"chunk {index + 1}")
+        else:
+            kept_sections[index] = False
+            dropped.append(sections[index][0])
+        prompt = assemble()
+        if prompt.tokens <= budget:
+            break
+    prompt.dropped = dropped
+    return prompt
@@ -0,0 +1,124 @@
+"""
+Rolling-window limit on assistant questions, kept in Django's cache.
+
+Each user's questions are counted in settings.AI_RATE_LIMIT_BUCKETS buckets
+spanning settings.AI_RATE_LIMIT_WINDOW seconds (24 hourly buckets by default);
+the usage is the sum of the buckets still inside the window, so the limit
+rolls forward an hour at a time instead of resetting at midnight.
+
+Counters live in the settings.AI_RATE_LIMIT_CACHE cache alias and are bumped
+with incr, so a shared backend (Redis, Memcached, database or file cache) lets
+every worker process see the same counts; a process-local backend gives each
+worker its own counts, and the assist.W001 system check warns about it. When a
+user's counters are missing (first use, a cache flush or restart, eviction of
+the user's marker key) they are rebuilt from StudentQuestion rows, so the
+limit survives losing the cache.
+A post_save signal in assist.models records each logged question.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.utils import timezone
+
+from .models import StudentQuestion
+
+
+COUNTER_KEY = "assist:rate:{}:{}"
+SEEDED_KEY = "assist:rate:{}:seeded"
+
+
+@dataclass
+class Usage:
+    """Questions a user asked within the window and when the oldest of them stops counting."""
+    count: int
+    limit: int
+    retry_after: int  # seconds until a question drops out of the window (0 if none)
+
+    @property
+    def exceeded(self) -> bool:
+        return self.count >= self.limit
+
+
+def get_cache() -> BaseCache:
+    return caches[getattr(settings, "AI_RATE_LIMIT_CACHE", "default")]
+
+
+def _bucket_seconds() -> int:
+    window = getattr(settings, "AI_RATE_LIMIT_WINDOW", 24 * 3600)
+    return max(1, window // getattr(settings, "AI_RATE_LIMIT_BUCKETS", 24))
+
+
+def _buckets(now: float) -> List[int]:
+    """The buckets inside the window ending now, oldest first."""
+    size = _bucket_seconds()
+    current = int(now // size)
+    return list(range(current - getattr(settings, "AI_RATE_LIMIT_BUCKETS", 24) + 1, current + 1))
+
+
+def _timeout() -> int:
+    return getattr(settings, "AI_RATE_LIMIT_WINDOW", 24 * 3600) + _bucket_seconds()
+
+
+def _seed(user_id: int, buckets: List[int]) -> Dict[int, int]:
+    """Rebuild the user's counters from StudentQuestion rows."""
+    size = _bucket_seconds()
+    counts = dict.fromkeys(buckets, 0)
+    created = StudentQuestion.objects.filter(
+        user_id=user_id, created_at__gte=datetime.fromtimestamp(buckets[0] * size, tz=dt_timezone.utc),
+    ).values_list("created_at", flat=True)
+    for created_at in created:
+        bucket = int(created_at.timestamp() // size)
+        if bucket in counts:
+            counts[bucket] += 1
+
+    cache = get_cache()
+    timeout = _timeout()
+    for bucket, count in counts.items():
+        if count:
+            # add() keeps counters another process created meanwhile
+            cache.add(COUNTER_KEY.format(user_id, bucket), count, timeout)
+    cache.set(SEEDED_KEY.format(user_id), True, getattr(settings, "AI_RATE_LIMIT_WINDOW", 24 * 3600))
+    return counts
+
+
+def _counts(user_id: int, now: float) -> Dict[int, int]:
+    buckets = _buckets(now)
+    keys = {COUNTER_KEY.format(user_id, bucket): bucket for bucket in buckets}
+    found = get_cache().get_many([SEEDED_KEY.format(user_id), *keys])
+    if SEEDED_KEY.format(user_id) not in found:
+        return _seed(user_id, buckets)
+    return {bucket: found.get(key, 0) for key, bucket in keys.items()}
+
+
+def get_usage(user_id: int) -> Usage:
+    """The user's question count within the rolling window."""
+    now = timezone.now().timestamp()
+    counts = _counts(user_id, now)
+    oldest = next((bucket for bucket, count in sorted(counts.items()) if count), None)
+    retry_after = 0
+    if oldest is not None:
+        retry_after = max(1, int((oldest + len(counts)) * _bucket_seconds() - now))
+    return Usage(count=sum(counts.values()), limit=settings.AI_DAILY_QUESTION_LIMIT, retry_after=retry_after)
+
+
+def record_question(user_id: int) -> None:
+    """Count a question the user just asked (already saved as a StudentQuestion)."""
+    now = timezone.now().timestamp()
+    cache = get_cache()
+    if cache.get(SEEDED_KEY.format(user_id)) is None:
+        _seed(user_id, _buckets(now))  # the new row is counted by the rebuild
+        return
+    key = COUNTER_KEY.format(user_id, _buckets(now)[-1])
+    timeout = _timeout()
+    if not cache.add(key, 1, timeout):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr(): rebuild on the next check
+            cache.delete(SEEDED_KEY.format(user_id))
+        else:
+            # Backends without a native incr (file, database) re-set the key with the default timeout
+            cache.touch(key, timeout)
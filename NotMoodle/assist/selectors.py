@@ -0,0 +1,232 @@
+"""
+Read-side helpers for the assistant: the per-student profile context given to the model.
+
+build_user_profile_context loads everything with a fixed number of queries;
+get_user_profile_context caches its text per user in the
+settings.AI_PROFILE_CACHE alias, which every worker process shares. Signals in
+assist.models invalidate the cache when grades, submissions, enrollments,
+progress or credits change, and entries expire after
+settings.AI_PROFILE_CONTEXT_TTL seconds (or once the next upcoming assignment
+falls due).
+"""
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db.models import Count
+from django.utils import timezone
+
+from classroom_and_grading.models import AssignmentGrade
+from course_management.models import Enrollment
+from lesson_management.models import (
+    Assignment, AssignmentSubmission, LessonEnrollment, ReadingList, ReadingListProgress, VideoProgress,
+)
+from lesson_management.selectors import get_lesson_results_for_student
+from student_management.models import ManageCreditPoint, Student
+
+
+PROFILE_CONTEXT_KEY = "assist:profile-context:{}"
+
+
+def get_cache() -> BaseCache:
+    return caches[getattr(settings, "AI_PROFILE_CACHE", "default")]
+
+
+def _profile_lines(user):
+    return [
+        "=== USER PROFILE ===",
+        f"Username: {user.username}",
+        f"Full Name: {user.get_full_name() or 'Not specified'}",
+        f"Email: {user.email}",
+    ]
+
+
+def build_user_profile_context(user):
+    """
+    Generate personalized context about the logged-in user.
+
+    Includes the user and student profile, credits, enrolled courses, enrolled
+    lessons with progress and grades, and upcoming and recent assignments.
+
+    Returns:
+        (text, next_due) where next_due is the due date of the nearest upcoming
+        assignment (after which the text is out of date), or None
+    """
+    context_parts = _profile_lines(user)
+
+    student = Student.objects.filter(user=user).first()
+    if student is None:
+        context_parts.append("\nNote: No student profile found for this user.")
+        context_parts.append("User may be a teacher or administrator.")
+        return "\n".join(context_parts), None
+
+    context_parts.append(f"Student Name: {student.full_name()}")
+    context_parts.append(f"Enrollment Number: {student.enrollment_number}")
+    context_parts.append(f"Date of Birth: {student.date_of_birth}")
+    context_parts.append(f"Year of Study: {student.year_of_study or 'Not specified'}")
+    context_parts.append(f"GPA: {student.gpa or 'Not yet calculated'}")
+    context_parts.append(f"Status: {student.get_status_display()}")
+
+    credits = ManageCreditPoint.objects.filter(student=student).values_list("credits", flat=True).first()
+    context_parts.append(f"Total Credits: {credits if credits is not None else 0}")
+
+    # Enrolled courses
+    context_parts.append("\n=== ENROLLED COURSES ===")
+    enrollments = list(Enrollment.objects.filter(student=student).select_related("course"))
+    if enrollments:
+        for enrollment in enrollments:
+            course = enrollment.course
+            context_parts.append(f"- {course.code}: {course.name}")
+            context_parts.append(f"  Status: {course.get_status_display()}")
+            context_parts.append(f"  Credits Required: {course.total_credits_required}")
+            context_parts.append(f"  Enrolled on: {enrollment.enrolled_at.strftime('%Y-%m-%d')}")
+            context_parts.append(f"  Enrolled by: {enrollment.get_enrolled_by_display()}")
+    else:
+        context_parts.append("No courses enrolled yet.")
+
+    # Enrolled lessons with progress: progress and grades for all lessons at once
+    context_parts.append("\n=== ENROLLED LESSONS ===")
+    lesson_enrollments = list(
+        LessonEnrollment.objects.filter(student=student).select_related("lesson").order_by("-enrolled_at")
+    )
+    lesson_ids = [le.lesson_id for le in lesson_enrollments]
+    videos_watched = dict(
+        VideoProgress.objects.filter(student=student, lesson_id__in=lesson_ids).values_list("lesson_id", "watched")
+    )
+    reading_totals = dict(
+        ReadingList.objects.filter(lesson_id__in=lesson_ids)
+        .values("lesson_id").annotate(n=Count("id")).order_by()
+        .values_list("lesson_id", "n")
+    )
+    readings_done = dict(
+        ReadingListProgress.objects.filter(student=student, reading__lesson_id__in=lesson_ids, done=True)
+        .values("reading__lesson_id").annotate(n=Count("id")).order_by()
+        .values_list("reading__lesson_id", "n")
+    )
+    results = get_lesson_results_for_student(student.pk, lesson_ids)
+
+    if lesson_enrollments:
+        for le in lesson_enrollments:
+            lesson = le.lesson
+            context_parts.append(f"\n- {lesson.unit_code}: {lesson.title}")
+            context_parts.append(f"  Description: {lesson.description[:100]}..." if len(lesson.description) > 100 else f"  Description: {lesson.description}")
+            context_parts.append(f"  Credits: {lesson.lesson_credits}")
+            context_parts.append(f"  Estimated Effort: {lesson.estimated_effort} hours/week")
+            context_parts.append(f"  Status: {lesson.get_status_display()}")
+            context_parts.append(f"  Enrolled on: {le.enrolled_at.strftime('%Y-%m-%d')}")
+            context_parts.append(f"  Video: {'Watched ✓' if videos_watched.get(lesson.pk) else 'Not watched yet'}")
+
+            if reading_totals.get(lesson.pk):
+                context_parts.append(
+                    f"  Reading Progress: {readings_done.get(lesson.pk, 0)}/{reading_totals[lesson.pk]} completed"
+                )
+
+            passed, percentage, details = results[lesson.pk]
+            if details.get("has_grades"):
+                context_parts.append(f"  Overall Grade: {percentage:.2f}% ({'PASSED' if passed else 'NOT PASSED'})")
+                context_parts.append(f"  Graded Assignments: {details['graded_assignments']}/{details['total_assignments']}")
+    else:
+        context_parts.append("No lessons enrolled yet.")
+
+    # Upcoming (not yet due) and recently due assignments, with the student's submissions and grades
+    now = timezone.now()
+    upcoming_assignments = list(
+        Assignment.objects.filter(lesson_id__in=lesson_ids, due_date__gte=now)
+        .select_related("lesson").order_by("due_date")[:10]
+    )
+    past_assignments = list(
+        Assignment.objects.filter(lesson_id__in=lesson_ids, due_date__lt=now)
+        .select_related("lesson").order_by("-due_date")[:5]
+    )
+    assignment_ids = [a.pk for a in upcoming_assignments + past_assignments]
+    submitted_at = dict(
+        AssignmentSubmission.objects.filter(student=student, assignment_id__in=assignment_ids)
+        .values_list("assignment_id", "submitted_at")
+    )
+    grades = {
+        grade.assignment_id: grade
+        for grade in AssignmentGrade.objects.filter(student=student, assignment_id__in=assignment_ids)
+    }
+
+    context_parts.append("\n=== UPCOMING ASSIGNMENTS ===")
+    if upcoming_assignments:
+        for assignment in upcoming_assignments:
+            context_parts.append(f"\n- {assignment.title}")
+            context_parts.append(f"  Lesson: {assignment.lesson.unit_code} - {assignment.lesson.title}")
+            context_parts.append(f"  Release Date: {assignment.release_date.strftime('%Y-%m-%d %H:%M')}")
+            context_parts.append(f"  Due Date: {assignment.due_date.strftime('%Y-%m-%d %H:%M')}")
+            context_parts.append(f"  Total Marks: {assignment.marks}")
+            context_parts.append(f"  Weightage: {assignment.weightage}%")
+
+            if assignment.pk in submitted_at:
+                context_parts.append(f"  Status: Submitted on {submitted_at[assignment.pk].strftime('%Y-%m-%d %H:%M')}")
+            else:
+                context_parts.append("  Status: Not yet submitted")
+
+            grade = grades.get(assignment.pk)
+            if grade is None:
+                context_parts.append("  Grade: Not yet graded")
+            elif grade.marks_awarded is not None:
+                percentage = (grade.marks_awarded / assignment.marks * 100) if assignment.marks > 0 else 0
+                context_parts.append(f"  Grade: {grade.marks_awarded}/{assignment.marks} ({percentage:.1f}%)")
+                if grade.feedback:
+                    context_parts.append(f"  Feedback: {grade.feedback[:100]}..." if len(grade.feedback) > 100 else f"  Feedback: {grade.feedback}")
+    else:
+        context_parts.append("No upcoming assignments.")
+
+    context_parts.append("\n=== RECENT PAST ASSIGNMENTS ===")
+    for assignment in past_assignments:
+        context_parts.append(f"\n- {assignment.title}")
+        context_parts.append(f"  Lesson: {assignment.lesson.unit_code}")
+        context_parts.append(f"  Due Date: {assignment.due_date.strftime('%Y-%m-%d')}")
+
+        grade = grades.get(assignment.pk)
+        if grade is None:
+            context_parts.append("  Grade: Not yet graded")
+        elif grade.marks_awarded is not None:
+            percentage = (grade.marks_awarded / assignment.marks * 100) if assignment.marks > 0 else 0
+            context_parts.append(f"  Grade: {grade.marks_awarded}/{assignment.marks} ({percentage:.1f}%)")
+
+    next_due = upcoming_assignments[0].due_date if upcoming_assignments else None
+    return "\n".join(context_parts), next_due
+
+
+def get_user_profile_context(user) -> str:
+    """
+    Personalized context about the user for the assistant's system prompt, cached per user.
+
+    Args:
+        user: Django User object
+
+    Returns:
+        Formatted string with user profile information
+    """
+    cache = get_cache()
+    key = PROFILE_CONTEXT_KEY.format(user.pk)
+    text = cache.get(key)
+    if text is None:
+        text, next_due = build_user_profile_context(user)
+        timeout = getattr(settings, "AI_PROFILE_CONTEXT_TTL", 300)
+        if next_due is not None:
+            # The assignment moves from "upcoming" to "past" once due
+            timeout = max(1, min(timeout, int((next_due - timezone.now()).total_seconds()) + 1))
+        cache.set(key, text, timeout)
+    return text
+
+
+def invalidate_profile_context(user_ids: Iterable[Optional[int]]) -> None:
+    """Drop cached profile context for the given users."""
+    keys = [PROFILE_CONTEXT_KEY.format(user_id) for user_id in set(user_ids) if user_id is not None]
+    if keys:
+        get_cache().delete_many(keys)
+
+
+def invalidate_profile_context_for_students(student_ids: Iterable[int]) -> None:
+    invalidate_profile_context(Student.objects.filter(pk__in=set(student_ids)).values_list("user_id", flat=True))
+
+
+def invalidate_profile_context_for_lesson(lesson_id: int) -> None:
+    """Drop cached context of every student enrolled in a lesson (its assignments or readings changed)."""
+    invalidate_profile_context(
+        LessonEnrollment.objects.filter(lesson_id=lesson_id).values_list("student__user_id", flat=True)
+    )
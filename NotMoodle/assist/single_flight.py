@@ -0,0 +1,148 @@
+"""
+Single-flight coalescing of identical concurrent assistant questions.
+
+When many students send the same question at once (a lecture slide, an exam
+hint), the first request starts a Flight that does the retrieval and
+generation; identical requests arriving while it runs join it and receive the
+same sources and answer tokens instead of calling the embedder, the vector
+index and the model again.
+
+Requests are identical when their question_key() matches: the normalized
+question, the lesson, and, for personal questions, the user (so only a
+student's own duplicate submits are coalesced; non-personal answers are
+generated without a profile and can be shared).
+
+Flights live in one event loop of one process (an ASGI worker). The work
+runs as its own task, so a leader that disconnects does not cut the answer
+short for the requests waiting on it. Each request still logs its own
+StudentQuestion, with `coalesced` set on those that joined a flight; see
+get_stats() for the rate across all processes.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .embedding_cache import normalize_text
+from .models import StudentQuestion
+
+_flights: Dict[Hashable, "Flight"] = {}
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "AI_COALESCE_QUESTIONS", True)
+
+
+def question_key(question: str, lesson_id: Optional[int], user_id: Optional[int] = None) -> Tuple:
+    """Requests with equal keys share one answer; pass `user_id` for personal questions."""
+    return (normalize_text(question).casefold().rstrip("?!. "), lesson_id or None, user_id)
+
+
+class Flight:
+    """
+    One answer in progress, shared by every request with the same key.
+
+    The producer calls set_context() once (e.g. with the sources), then
+    publish() for each piece of the answer; the flight finishes when the
+    producer returns or raises. Consumers await context() and iterate
+    pieces(), which replays what was published before they joined.
+    """
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.loop = asyncio.get_running_loop()
+        self.followers = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._context = None
+        self._pieces = []
+        self._update = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def _notify(self) -> None:
+        self._update.set()
+        self._update = asyncio.Event()
+
+    def set_context(self, context) -> None:
+        self._context = context
+        self._notify()
+
+    def publish(self, piece: str) -> None:
+        self._pieces.append(piece)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def context(self):
+        """The producer's context, once set (raises the producer's error if it failed first)."""
+        while self._context is None and not self.done:
+            await self._update.wait()
+        if self._context is None:
+            raise self.error or RuntimeError("flight finished without a context")
+        return self._context
+
+    async def pieces(self):
+        """Every published piece in order, then the producer's error if it failed."""
+        sent = 0
+        while True:
+            while sent < len(self._pieces):
+                sent += 1
+                yield self._pieces[sent - 1]
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._update.wait()
+
+    async def result(self) -> str:
+        return "".join([piece async for piece in self.pieces()])
+
+
+async def _run(flight: Flight, produce: Callable[[Flight], Awaitable[None]]) -> None:
+    try:
+        await produce(flight)
+    except Exception as exc:
+        flight.finish(exc)
+    else:
+        flight.finish()
+    finally:
+        if _flights.get(flight.key) is flight:
+            del _flights[flight.key]
+
+
+def join(key: Hashable, produce: Callable[[Flight], Awaitable[None]]) -> Tuple[Flight, bool]:
+    """
+    The running flight for `key`, or a new one running `produce(flight)`.
+
+    Returns (flight, started): `started` is False when the request joined an
+    existing flight. Must be called from the event loop that consumes it.
+    """
+    loop = asyncio.get_running_loop()
+    flight = _flights.get(key) if is_enabled() else None
+    if flight is not None and flight.loop is loop and not flight.done:
+        flight.followers += 1
+        return flight, False
+
+    flight = Flight(key)
+    if is_enabled():
+        _flights[key] = flight
+    flight.task = loop.create_task(_run(flight, produce))
+    return flight, True
+
+
+def get_stats(since=None) -> Dict[str, float]:
+    """
+    How many questions were answered by joining another request's flight.
+
+    Computed from StudentQuestion rows, so it covers every worker process.
+    """
+    questions = StudentQuestion.objects.all()
+    if since is not None:
+        questions = questions.filter(created_at__gte=since)
+    counts = questions.aggregate(questions=Count("id"), coalesced=Count("id", filter=Q(coalesced=True)))
+    counts["coalesced_rate"] = counts["coalesced"] / counts["questions"] if counts["questions"] else 0.0
+    return counts
@@ -0,0 +1,18 @@
+"""Background job handlers for the AI assistant."""
+from jobs.registry import task
+from lesson_management.models import Lesson
+from .indexing import index_lesson as index_lesson_chunks
+from .models import DocumentChunk, LessonIndexState
+
+
+@task("assist.index_lesson")
+def index_lesson(job, lesson_id, force=False):
+    """Bring one lesson's RAG chunks up to date, or drop them if it is no longer published."""
+    lesson = Lesson.objects.filter(pk=lesson_id).prefetch_related("reading_list", "assignments__attachments").first()
+    if lesson is None or lesson.status != "published":
+        deleted, _ = DocumentChunk.objects.filter(lesson_id=lesson_id).delete()
+        LessonIndexState.objects.filter(lesson_id=lesson_id).delete()
+        return {"created": 0, "deleted": deleted, "kept": 0, "unchanged": 0}
+
+    job.set_progress(10, f"Indexing {lesson.unit_code}")
+    return index_lesson_chunks(lesson, force=force)
@@ -0,0 +1,198 @@
+"""
+Tests for the fair-share chat admission queue (assist.admission).
+"""
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from assist import admission
+
+
+@pytest.fixture
+def queue(settings, monkeypatch):
+    """A fresh queue with one slot."""
+    settings.AI_CHAT_CONCURRENCY = 1
+    settings.AI_CHAT_MAX_QUEUE = 32
+    settings.AI_CHAT_MAX_QUEUE_PER_USER = 3
+    settings.AI_CHAT_QUEUE_TIMEOUT = 5
+    fresh = admission.AdmissionQueue()
+    monkeypatch.setattr(admission, "_queue", fresh)
+    admission.reset_stats()
+    return fresh
+
+
+def run(coroutine_function):
+    return async_to_sync(coroutine_function)()
+
+
+@pytest.mark.unit
+class TestAdmissionQueue:
+    """Test the concurrency cap, round-robin order and load shedding."""
+
+    def test_free_slot_is_immediate(self, queue):
+        async def scenario():
+            async with admission.slot("alice") as ticket:
+                return ticket.wait_ms, queue.depth()
+
+        assert run(scenario) == (0, {"active": 1, "waiting": 0})
+        assert queue.depth() == {"active": 0, "waiting": 0}
+
+    def test_concurrency_cap(self, queue, settings):
+        settings.AI_CHAT_CONCURRENCY = 2
+        running = []
+        peak = []
+
+        async def ask(user):
+            async with admission.slot(user):
+                running.append(user)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.remove(user)
+
+        async def scenario():
+            await asyncio.gather(*(ask(f"user{i}") for i in range(6)))
+
+        run(scenario)
+        assert max(peak) == 2
+        assert admission.get_stats()["admitted"] == 6
+
+    def test_users_are_served_round_robin(self, queue):
+        """A user with many queued questions does not delay another user's single question."""
+        order = []
+
+        async def ask(user, name):
+            async with admission.slot(user):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            holder = asyncio.ensure_future(ask("carol", "c1"))
+            await asyncio.sleep(0)
+            tasks = [asyncio.ensure_future(ask("hog", f"h{i}")) for i in range(1, 4)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.ensure_future(ask("light", "l1")))
+            await asyncio.gather(holder, *tasks)
+
+        run(scenario)
+        assert order == ["c1", "h1", "l1", "h2", "h3"]
+
+    def test_full_queue_is_shed_with_retry_after(self, queue, settings, caplog):
+        settings.AI_CHAT_MAX_QUEUE = 1
+
+        async def scenario():
+            async with admission.slot("alice"):
+                waiting = asyncio.ensure_future(admission._queue.acquire("bob"))
+                await asyncio.sleep(0)
+                with pytest.raises(admission.Overloaded) as shed:
+                    admission.check("carol")
+                with pytest.raises(admission.Overloaded):
+                    await admission._queue.acquire("carol")
+            admission._queue.release(await waiting)
+            return shed.value.retry_after
+
+        assert run(scenario) >= 1
+        assert admission.get_stats()["shed"] == 2
+        assert [record.levelname for record in caplog.records if "shedding" in record.message] == ["WARNING"] * 2
+
+    def test_per_user_queue_limit(self, queue, settings):
+        settings.AI_CHAT_MAX_QUEUE_PER_USER = 1
+
+        async def scenario():
+            async with admission.slot("alice"):
+                waiting = asyncio.ensure_future(admission._queue.acquire("hog"))
+                await asyncio.sleep(0)
+                with pytest.raises(admission.Overloaded):
+                    admission.check("hog")
+                admission.check("bob")  # other users still get in line
+            admission._queue.release(await waiting)
+
+        run(scenario)
+
+    def test_wait_timeout_sheds_and_leaves_queue(self, queue, settings, caplog):
+        settings.AI_CHAT_QUEUE_TIMEOUT = 0.02
+
+        async def scenario():
+            async with admission.slot("alice"):
+                with pytest.raises(admission.Overloaded):
+                    await admission._queue.acquire("bob")
+                return queue.depth()
+
+        assert run(scenario) == {"active": 1, "waiting": 0}
+        assert admission.get_stats()["timed_out"] == 1
+        assert "timed out" in caplog.text
+        assert queue.depth() == {"active": 0, "waiting": 0}
+
+    def test_cancelled_waiter_gives_back_its_turn(self, queue):
+        """A client that disconnects while queued neither keeps a place nor leaks a slot."""
+        async def scenario():
+            async with admission.slot("alice"):
+                waiting = asyncio.ensure_future(admission._queue.acquire("bob"))
+                await asyncio.sleep(0)
+                waiting.cancel()
+                await asyncio.sleep(0)
+            async with admission.slot("carol") as ticket:
+                return ticket.wait_ms
+
+        assert run(scenario) == 0
+        assert queue.depth() == {"active": 0, "waiting": 0}
+
+    def test_queue_wait_is_reported(self, queue):
+        async def scenario():
+            async def holder():
+                async with admission.slot("alice"):
+                    await asyncio.sleep(0.05)
+
+            task = asyncio.ensure_future(holder())
+            await asyncio.sleep(0)
+            async with admission.slot("bob") as ticket:
+                await task
+                return ticket.wait_ms
+
+        assert run(scenario) >= 40
+        assert admission.get_stats()["max_wait_seconds"] >= 0.04
+
+
+@pytest.mark.django_db
+class TestAskAssistantLoadShedding:
+    """Test the view's response when the queue is full."""
+
+    def test_overloaded_returns_503_with_retry_after(self, student_client, settings, monkeypatch):
+        settings.USING_POSTGRESQL = True
+
+        def full(user_key):
+            raise admission.Overloaded(retry_after=12)
+
+        monkeypatch.setattr(admission, "check", full)
+
+        response = student_client.post(
+            reverse("assist:ask_assistant"),
+            data=json.dumps({"message": "What is recursion?"}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 503
+        assert response["Retry-After"] == "12"
+        assert json.loads(response.content)["retry_after"] == 12
+
+
+@pytest.mark.django_db
+class TestAdmissionStatsView:
+    """Test the staff endpoint exposing the queue's counters."""
+
+    def test_staff_see_counters(self, client, staff_user, queue):
+        admission._count(shed=2, timed_out=1)
+        client.force_login(staff_user)
+
+        response = client.get(reverse("assist:assistant_admission_stats"))
+
+        assert response.status_code == 200
+        data = json.loads(response.content)
+        assert (data["shed"], data["timed_out"], data["active"], data["waiting"]) == (2, 1, 0, 0)
+
+    def test_students_are_refused(self, student_client, queue):
+        response = student_client.get(reverse("assist:assistant_admission_stats"))
+
+        assert response.status_code == 403
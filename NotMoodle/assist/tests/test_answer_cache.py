@@ -0,0 +1,85 @@
+"""
+Tests for the semantic answer cache (assist.answer_cache).
+"""
+import pytest
+from datetime import timedelta
+from django.db.utils import ConnectionHandler
+from django.utils import timezone
+from model_bakery import baker
+from assist import answer_cache
+from assist.indexing import index_lesson
+from assist.models import StudentQuestion
+
+
+@pytest.mark.unit
+class TestIsCacheable:
+    """Test which questions may be shared between students."""
+
+    @pytest.mark.parametrize("question", [
+        "What is a list comprehension?",
+        "Explain recursion with an example",
+    ])
+    def test_general_lesson_questions(self, question):
+        """General questions about a lesson are cacheable."""
+        assert answer_cache.is_cacheable(question, lesson_id=1)
+
+    @pytest.mark.parametrize("question", [
+        "What is my grade?",
+        "When is the assignment due?",
+        "Can you help me with recursion?",
+        "How many credits do I have?",
+    ])
+    def test_personal_questions(self, question):
+        """Questions about the student themselves are never cached."""
+        assert not answer_cache.is_cacheable(question, lesson_id=1)
+
+    def test_requires_lesson_and_setting(self, settings):
+        """Only lesson-scoped questions, and only while the cache is enabled."""
+        assert not answer_cache.is_cacheable("What is a loop?", lesson_id=None)
+        settings.AI_ANSWER_CACHE_ENABLED = False
+        assert not answer_cache.is_cacheable("What is a loop?", lesson_id=1)
+
+
+@pytest.mark.django_db
+class TestAnswerCacheMaintenance:
+    """Test invalidation and hit-rate reporting."""
+
+    def test_reindex_invalidates_lesson_answers(self, lesson, student_user, monkeypatch):
+        """Re-indexing a lesson with new content stops its answers being served."""
+        from assist import ollama
+        monkeypatch.setattr(ollama, "embed_texts", lambda texts, model=None: [[0.1] * 768 for _ in texts])
+        cached = baker.make(StudentQuestion, user=student_user, lesson=lesson, cacheable=True)
+        other = baker.make(StudentQuestion, user=student_user, cacheable=True)
+
+        index_lesson(lesson)
+
+        cached.refresh_from_db()
+        other.refresh_from_db()
+        assert cached.cacheable is False
+        assert other.cacheable is True
+
+    def test_hit_rate(self, lesson, student_user):
+        """Hit rate counts cache-eligible questions only, optionally within a window."""
+        source = baker.make(StudentQuestion, user=student_user, lesson=lesson, question_embedding=[0.1] * 768,
+                            cacheable=True)
+        baker.make(StudentQuestion, user=student_user, lesson=lesson, question_embedding=[0.1] * 768,
+                   from_cache=True, cached_from=source, _quantity=3)
+        baker.make(StudentQuestion, user=student_user)  # personal question, not eligible
+
+        stats = answer_cache.get_stats()
+
+        assert stats == {"eligible": 4, "hits": 3, "hit_rate": 0.75}
+        assert answer_cache.get_stats(since=timezone.now() + timedelta(minutes=1))["eligible"] == 0
+
+    def test_candidates_query(self, settings):
+        """Candidates are filtered by lesson, freshness and cosine distance, nearest first."""
+        settings.AI_ANSWER_CACHE_SIMILARITY = 0.9
+        pg = ConnectionHandler({"default": {"ENGINE": "django.db.backends.postgresql", "NAME": "x"}})["default"]
+
+        queryset = answer_cache.candidates([0.1] * 768, lesson_id=1)
+        sql, params = queryset.query.get_compiler(connection=pg).as_sql()
+
+        assert "<=>" in sql
+        assert '"assist_studentquestion"."cacheable"' in sql
+        assert "ORDER BY" in sql
+        assert pytest.approx(0.1) in params
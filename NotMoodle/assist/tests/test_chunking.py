@@ -0,0 +1,96 @@
+"""
+Tests for the token-aware streaming chunker (assist.chunking).
+"""
+import pytest
+
+from assist import chunking
+from assist.tokenizers import count_tokens
+
+SENTENCES = [f"Sentence number {i} explains one idea about recursion and stacks." for i in range(60)]
+TEXT = "# Recursion\n\n" + " ".join(SENTENCES[:30]) + "\n\nStacks:\n" + " ".join(SENTENCES[30:])
+
+
+@pytest.mark.unit
+class TestChunkStream:
+    """Test chunk sizes, overlap and boundaries."""
+
+    def test_chunks_stay_within_budget(self):
+        chunks = chunking.chunk_text(TEXT, max_tokens=60, overlap_tokens=15)
+
+        assert len(chunks) > 3
+        assert all(count_tokens(chunk) <= 60 for chunk in chunks)
+
+    def test_sentences_are_kept_whole(self):
+        """Apart from word-level overlap, every sentence appears intact in some chunk."""
+        chunks = chunking.chunk_text(TEXT, max_tokens=60, overlap_tokens=15)
+
+        for sentence in SENTENCES:
+            assert any(sentence in chunk for chunk in chunks)
+
+    def test_consecutive_chunks_overlap(self):
+        """Each chunk starts with text from the end of the previous one, within the overlap budget."""
+        chunks = chunking.chunk_text(" ".join(SENTENCES), max_tokens=50, overlap_tokens=20)
+
+        for previous, chunk in zip(chunks, chunks[1:]):
+            first_sentence = chunking.split_sentences(chunk)[0]
+            assert first_sentence in previous
+            assert count_tokens(first_sentence) <= 20
+
+    def test_long_sentence_overlaps_by_words(self):
+        """When no whole sentence fits the overlap, the previous chunk's last words are repeated."""
+        words = [f"w{i}" for i in range(200)]
+        chunks = chunking.chunk_text(" ".join(words) + ".", max_tokens=40, overlap_tokens=6)
+
+        assert len(chunks) > 1
+        assert all(count_tokens(chunk) <= 40 for chunk in chunks)
+        last_word = chunks[0].split()[-1]
+        shared = chunks[1][:chunks[1].index(last_word) + len(last_word)]
+        assert shared != last_word
+        assert chunks[0].endswith(shared)
+
+    def test_headings_never_end_a_chunk(self):
+        chunks = chunking.chunk_text(TEXT, max_tokens=60, overlap_tokens=0)
+
+        for chunk in chunks:
+            assert not chunk.rstrip().endswith(("# Recursion", "Stacks:"))
+        assert any(chunk.startswith("# Recursion\n\nSentence number 0") for chunk in chunks)
+        assert any("Stacks:\nSentence number 30" in chunk for chunk in chunks)
+
+    def test_long_paragraph_boundaries_are_stable(self):
+        """Editing text before a long paragraph leaves that paragraph's chunks unchanged."""
+        body = " ".join(SENTENCES)
+        before = chunking.chunk_text(f"Intro.\n\n{body}", max_tokens=60, overlap_tokens=15)
+        after = chunking.chunk_text(f"A much longer introduction than before.\n\n{body}", max_tokens=60, overlap_tokens=15)
+
+        assert before[1:] == after[1:]
+
+    def test_stream_pieces_do_not_matter(self):
+        """Feeding the text in arbitrary pieces gives the same chunks as one string."""
+        pieces = [TEXT[i:i + 7] for i in range(0, len(TEXT), 7)]
+
+        assert list(chunking.chunk_stream(pieces, 60, 15)) == chunking.chunk_text(TEXT, 60, 15)
+
+    def test_empty_input(self):
+        assert chunking.chunk_text("  \n\n ") == []
+
+
+@pytest.mark.unit
+class TestTextSplitting:
+    """Test paragraph, sentence and heading detection."""
+
+    def test_abbreviations_do_not_end_sentences(self):
+        assert chunking.split_sentences("Use a stack, e.g. A list. Then pop.") == ["Use a stack, e.g. A list.", "Then pop."]
+
+    @pytest.mark.parametrize("line,next_line,expected", [
+        ("## Week 3", "", True),
+        ("Learning Objectives:", "Understand recursion.", True),
+        ("Introduction to Stacks", "A stack is last in first out.", True),
+        ("Recursion is when a function", "calls itself.", False),  # a wrapped PDF line
+        ("This is a full sentence.", "", False),
+        ("Unit Code: CS101", "", False),
+    ])
+    def test_headings(self, line, next_line, expected):
+        assert chunking.is_heading(line, next_line) is expected
+
+    def test_paragraph_breaks_across_pieces(self):
+        assert list(chunking.iter_paragraphs(["one\n", "\n", "two\n\n\n", "three"])) == ["one", "two", "three"]
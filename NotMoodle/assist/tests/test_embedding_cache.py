@@ -0,0 +1,100 @@
+"""
+Tests for the persistent embedding cache (assist.embedding_cache).
+"""
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from assist import embedding_cache, ollama
+from assist.models import EmbeddingCacheEntry
+
+
+@pytest.fixture
+def fake_embedder(monkeypatch):
+    """Stand in for the Ollama round trip and record which texts were sent."""
+    sent = []
+
+    def embed_uncached(texts, model):
+        sent.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    monkeypatch.setattr(ollama, "_embed_uncached", embed_uncached)
+    embedding_cache.reset_stats()
+    return sent
+
+
+@pytest.mark.django_db
+class TestEmbeddingCache:
+    """Test cache lookups, normalization and eviction."""
+
+    def test_second_call_hits_cache(self, fake_embedder):
+        """Unchanged texts are not re-embedded."""
+        first = ollama.embed_texts(["alpha", "beta"], model="m")
+        second = ollama.embed_texts(["beta", "alpha", "gamma"], model="m")
+
+        assert second == [first[1], first[0], [5.0, 1.0]]
+        assert fake_embedder == ["alpha", "beta", "gamma"]
+        stats = embedding_cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 3
+
+    def test_whitespace_changes_still_hit(self, fake_embedder):
+        """Keys are taken over normalized text."""
+        ollama.embed_texts(["Unit  overview\n"], model="m")
+        ollama.embed_texts(["Unit overview"], model="m")
+
+        assert fake_embedder == ["Unit  overview\n"]
+
+    def test_keyed_by_model(self, fake_embedder):
+        """A different embed model misses the cache."""
+        ollama.embed_texts(["alpha"], model="m1")
+        ollama.embed_texts(["alpha"], model="m2")
+
+        assert fake_embedder == ["alpha", "alpha"]
+        assert EmbeddingCacheEntry.objects.count() == 2
+
+    def test_evicts_least_recently_used(self, settings, fake_embedder):
+        """The table is trimmed to the configured size, oldest use first."""
+        settings.AI_EMBED_CACHE_MAX_ENTRIES = 2
+        settings.AI_EMBED_CACHE_TOUCH_INTERVAL = 0
+        settings.AI_EMBED_CACHE_EVICT_EVERY = 1
+        ollama.embed_texts(["one"], model="m")
+        ollama.embed_texts(["two"], model="m")
+        ollama.embed_texts(["one"], model="m")  # refresh "one"
+        ollama.embed_texts(["three"], model="m")
+
+        kept = set(EmbeddingCacheEntry.objects.values_list("text_hash", flat=True))
+        assert kept == {embedding_cache.text_hash("one"), embedding_cache.text_hash("three")}
+        assert embedding_cache.get_stats()["evictions"] == 1
+
+    def test_fresh_hits_write_nothing(self, fake_embedder, django_assert_num_queries):
+        """A hit on an entry used within the touch interval is a single read."""
+        ollama.embed_texts(["alpha"], model="m")
+
+        with django_assert_num_queries(1):
+            ollama.embed_texts(["alpha"], model="m")
+
+        assert EmbeddingCacheEntry.objects.get().hits == 0
+
+    def test_stale_hits_refresh_last_used(self, settings, fake_embedder):
+        settings.AI_EMBED_CACHE_TOUCH_INTERVAL = 3600
+        ollama.embed_texts(["alpha"], model="m")
+        EmbeddingCacheEntry.objects.update(last_used_at=timezone.now() - timedelta(hours=2))
+
+        ollama.embed_texts(["alpha"], model="m")
+
+        entry = EmbeddingCacheEntry.objects.get()
+        assert entry.hits == 1
+        assert entry.last_used_at > timezone.now() - timedelta(minutes=1)
+
+    def test_eviction_runs_every_n_puts(self, settings, fake_embedder, monkeypatch):
+        """The table is only counted and trimmed periodically, not on every insert."""
+        settings.AI_EMBED_CACHE_MAX_ENTRIES = 1
+        settings.AI_EMBED_CACHE_EVICT_EVERY = 3
+        monkeypatch.setattr(embedding_cache, "_puts_since_evict", 0)
+
+        ollama.embed_texts(["one"], model="m")
+        ollama.embed_texts(["two"], model="m")
+        assert EmbeddingCacheEntry.objects.count() == 2
+
+        ollama.embed_texts(["three"], model="m")
+        assert EmbeddingCacheEntry.objects.count() == 1
@@ -0,0 +1,186 @@
+"""
+Tests for generation budgets (assist.generation).
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from assist import admission, generation
+from assist.models import StudentQuestion
+from assist.ollama import achat, achat_stream
+
+
+@pytest.fixture
+def budgets(settings):
+    settings.AI_GENERATION_BUDGETS = {"default": 512, "brief": 256, "factual": 160}
+    settings.AI_BRIEF_QUEUE_DEPTH = 4
+    settings.AI_CHAT_STOP = []
+    return settings
+
+
+@pytest.mark.unit
+class TestSelectBudget:
+    """Test which budget a question gets."""
+
+    @pytest.mark.parametrize("question,expected", [
+        ("When is assignment 2 due?", True),
+        ("Which week covers recursion?", True),
+        ("How many credits is CS101?", True),
+        ("Is the quiz open book?", True),
+        ("What is recursion?", False),
+        ("Why does recursion need a base case?", False),
+        ("How do I reverse a linked list?", False),
+        ("Is recursion faster than iteration? Explain with examples", False),
+        ("When should I use a stack rather than a queue for a breadth first traversal of a big graph?", False),
+    ])
+    def test_is_factual(self, budgets, question, expected):
+        assert generation.is_factual(question) is expected
+
+    def test_budget_by_kind_and_queue_depth(self, budgets, monkeypatch):
+        depth = {"active": 4, "waiting": 0}
+        monkeypatch.setattr(admission, "depth", lambda: depth)
+
+        assert generation.select_budget("Explain recursion").name == "default"
+        assert generation.select_budget("When is the exam?").max_tokens == 160
+
+        depth["waiting"] = 4
+        assert generation.select_budget("Explain recursion").name == "brief"
+        assert generation.select_budget("When is the exam?").name == "factual"
+
+    def test_prompt_leaves_room_for_the_answer(self, budgets):
+        budgets.AI_PROMPT_TOKEN_BUDGET = 3000
+        budgets.AI_CHAT_NUM_CTX = 2048
+        budget = generation.get_budget("default")
+
+        assert budget.prompt_budget() < 2048 - 512
+        budgets.AI_CHAT_NUM_CTX = 0
+        assert budget.prompt_budget() == 3000
+
+    def test_apply_adds_length_instruction(self, budgets):
+        messages = [{"role": "system", "content": "You are a tutor."}, {"role": "user", "content": "When is it due?"}]
+
+        applied = generation.get_budget("factual").apply(messages)
+
+        assert "one to three sentences" in applied[0]["content"]
+        assert "about 120 words" in applied[0]["content"]
+        assert applied[1] == messages[1]
+        assert messages[0]["content"] == "You are a tutor."
+
+
+@pytest.mark.unit
+class TestChatLimits:
+    """Test that budgets reach the chat request and truncation is reported."""
+
+    @pytest.fixture
+    def server(self, monkeypatch):
+        from assist import http_client
+        seen = []
+
+        def install(respond):
+            def handler(request):
+                seen.append(json.loads(request.content))
+                return respond(request)
+            transport = httpx.MockTransport(handler)
+            monkeypatch.setattr(http_client, "_new_async_client", lambda: httpx.AsyncClient(transport=transport))
+            return seen
+
+        return install
+
+    def test_achat_sends_max_tokens_and_stop(self, server):
+        seen = server(lambda request: httpx.Response(200, json={
+            "choices": [{"message": {"content": "Friday."}, "finish_reason": "length"}],
+        }))
+        usage = {}
+
+        asyncio.run(achat([{"role": "user", "content": "Hi"}], usage=usage, max_tokens=64, stop=["\n\n\n"]))
+
+        assert (seen[0]["max_tokens"], seen[0]["stop"]) == (64, ["\n\n\n"])
+        assert usage["finish_reason"] == "length"
+
+    def test_no_limits_by_default(self, server):
+        seen = server(lambda request: httpx.Response(200, json={"choices": [{"message": {"content": "Hi"}}]}))
+
+        asyncio.run(achat([{"role": "user", "content": "Hi"}]))
+
+        assert "max_tokens" not in seen[0] and "stop" not in seen[0]
+
+    def test_stream_reports_finish_reason(self, server):
+        chunks = [
+            {"choices": [{"delta": {"content": "Fri"}}]},
+            {"choices": [{"delta": {}, "finish_reason": "stop"}]},
+        ]
+        body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+        seen = server(lambda request: httpx.Response(200, text=body))
+        usage = {}
+
+        async def collect():
+            return [piece async for piece in achat_stream([{"role": "user", "content": "Hi"}], usage=usage, max_tokens=32)]
+
+        assert asyncio.run(collect()) == ["Fri"]
+        assert seen[0]["max_tokens"] == 32
+        assert usage["finish_reason"] == "stop"
+
+
+@pytest.mark.django_db
+class TestAskAssistantBudgets:
+    """Test budgets and generation stats in ask_assistant."""
+
+    @pytest.fixture
+    def chat_calls(self, budgets, monkeypatch):
+        from assist import views
+        budgets.USING_POSTGRESQL = True
+        calls = []
+
+        async def fake_embed(texts):
+            return [[0.1] * 768 for _ in texts]
+
+        async def fake_chat(messages, usage=None, **kwargs):
+            calls.append(kwargs)
+            usage.update(prompt_tokens=300, completion_tokens=kwargs["max_tokens"], finish_reason="length")
+            return "Cut short"
+
+        monkeypatch.setattr(views, "aembed_texts", fake_embed)
+        monkeypatch.setattr(views, "search_chunks", lambda *args, **kwargs: [])
+        monkeypatch.setattr(views, "achat", fake_chat)
+        monkeypatch.setattr(views.answer_cache, "lookup", lambda embedding, lesson_id: None)
+        return calls
+
+    def ask(self, client, message, lesson):
+        return client.post(
+            reverse("assist:ask_assistant"),
+            data=json.dumps({"message": message, "lesson_id": lesson.id}),
+            content_type="application/json",
+        )
+
+    def test_factual_question_gets_strict_budget_and_stats(self, student_client, student_user, lesson, chat_calls):
+        self.ask(student_client, "When is assignment 2 due?", lesson)
+
+        assert chat_calls[0]["max_tokens"] == 160
+        logged = StudentQuestion.objects.get(user=student_user)
+        assert (logged.budget, logged.max_tokens, logged.tokens_out, logged.truncated) == ("factual", 160, 160, True)
+        assert logged.first_token_ms is not None and logged.generation_ms is not None
+        assert logged.queue_wait_ms == 0
+
+    def test_brief_answers_are_not_cached(self, student_client, student_user, lesson, chat_calls, monkeypatch):
+        monkeypatch.setattr(admission, "depth", lambda: {"active": 4, "waiting": 10})
+
+        self.ask(student_client, "Explain recursion in this lesson", lesson)
+
+        assert chat_calls[0]["max_tokens"] == 256
+        logged = StudentQuestion.objects.get(user=student_user)
+        assert logged.budget == "brief"
+        assert logged.cacheable is False
+
+    def test_stats_command(self, student_client, lesson, chat_calls, capsys):
+        self.ask(student_client, "When is assignment 2 due?", lesson)
+
+        call_command("assistant_queue_stats")
+
+        out = capsys.readouterr().out
+        assert "1 model calls" in out
+        assert "factual budget: 1 answers" in out
+        assert "100.0% truncated" in out
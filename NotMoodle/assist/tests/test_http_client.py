@@ -0,0 +1,63 @@
+"""
+Tests for the pooled Ollama HTTP clients (assist.http_client).
+"""
+import asyncio
+import pytest
+from assist import http_client
+
+
+@pytest.fixture
+def fresh_clients():
+    http_client.close_client()
+    yield
+    http_client.close_client()
+
+
+@pytest.mark.unit
+class TestPooledClients:
+    """Test client reuse, settings-driven limits and fork safety."""
+
+    def test_sync_client_is_shared(self, fresh_clients):
+        """Every caller gets the same keep-alive client until it is closed."""
+        client = http_client.get_client()
+
+        assert http_client.get_client() is client
+        http_client.close_client()
+        assert http_client.get_client() is not client
+
+    def test_limits_and_timeouts_from_settings(self, settings, fresh_clients):
+        """Pool limits and per-operation timeouts follow settings."""
+        settings.OLLAMA_HTTP_MAX_CONNECTIONS = 7
+        settings.OLLAMA_HTTP_MAX_KEEPALIVE = 3
+        settings.OLLAMA_HTTP_CONNECT_TIMEOUT = 2.0
+        settings.OLLAMA_HTTP_TIMEOUTS = {"embed": 15.0}
+
+        limits = http_client.pool_limits()
+        assert (limits.max_connections, limits.max_keepalive_connections) == (7, 3)
+        assert http_client.timeout("embed").read == 15.0
+        assert http_client.timeout("embed").connect == 2.0
+        # Unconfigured operations keep their defaults
+        assert http_client.timeout("chat").read == http_client.DEFAULT_TIMEOUTS["chat"]
+
+    def test_async_client_per_event_loop(self):
+        """Within a loop the AsyncClient is reused; a new loop gets its own."""
+        async def get_twice():
+            first, second = http_client.get_async_client(), http_client.get_async_client()
+            await http_client.aclose_client()
+            return first, second
+
+        first, second = asyncio.run(get_twice())
+        other, _ = asyncio.run(get_twice())
+
+        assert first is second
+        assert other is not first
+
+    def test_reset_after_fork_drops_clients(self, fresh_clients):
+        """A forked child starts without the parent's pooled connections."""
+        parent = http_client.get_client()
+
+        http_client._reset_after_fork()
+
+        assert not parent.is_closed
+        assert http_client.get_client() is not parent
+        parent.close()
@@ -0,0 +1,145 @@
+"""
+Tests for full-text retrieval and rank fusion (assist.hybrid_search).
+"""
+import json
+
+import pytest
+from django.db.utils import ConnectionHandler
+from django.urls import reverse
+
+from assist import hybrid_search
+from assist.models import DocumentChunk, StudentQuestion
+
+
+def chunk(code, content):
+    return {"content": content, "lesson_title": f"{code} title", "lesson_code": code}
+
+
+@pytest.mark.unit
+class TestCodeLikeQuestions:
+    """Test which questions take the lexical fast path."""
+
+    @pytest.mark.parametrize("question", ["CS101", "FIT1045 week 3", "what is COMP2123a?"])
+    def test_short_questions_naming_a_code(self, question):
+        assert hybrid_search.is_code_like(question)
+
+    @pytest.mark.parametrize("question", [
+        "What is recursion?",
+        "How is CS101 different from the advanced unit?",  # too long to trust keywords alone
+        "week 3",
+        "",
+    ])
+    def test_other_questions(self, question):
+        assert not hybrid_search.is_code_like(question)
+
+
+@pytest.mark.unit
+class TestReciprocalRankFusion:
+    """Test merging ranked chunk lists."""
+
+    def test_chunks_in_both_rankings_rise(self):
+        """A chunk ranked by both retrievers beats chunks ranked first by only one."""
+        a, b, c = chunk("X1", "a"), chunk("X1", "b"), chunk("X2", "c")
+
+        fused = hybrid_search.reciprocal_rank_fusion([[a, b], [c, b]], k=60)
+
+        assert fused == [b, a, c]
+
+    def test_duplicates_are_merged(self):
+        """The same chunk from both rankings appears once."""
+        a = chunk("X1", "a")
+
+        assert hybrid_search.reciprocal_rank_fusion([[a], [dict(a)]]) == [a]
+
+
+@pytest.mark.django_db
+class TestLexicalSearch:
+    """Test the full-text query."""
+
+    def test_no_results_without_postgresql(self):
+        """SQLite has no full-text search: lexical search returns nothing."""
+        assert hybrid_search.lexical_search("CS101") == []
+
+    def test_query_sql(self, monkeypatch):
+        """On PostgreSQL the question's terms are OR-ed into a ranked tsquery."""
+        pg = ConnectionHandler({"default": {"ENGINE": "django.db.backends.postgresql", "NAME": "x"}})["default"]
+        query = hybrid_search._query("CS101 recursion")
+        queryset = DocumentChunk.objects.filter(search_vector=query)
+
+        sql, params = queryset.query.get_compiler(connection=pg).as_sql()
+
+        assert "@@" in sql
+        assert "||" in sql
+        assert {"CS101", "recursion"} <= set(params)
+
+    def test_chunk_vector_weights_lesson_code(self, lesson):
+        """The lesson's code and title are weighted above the content."""
+        pg = ConnectionHandler({"default": {"ENGINE": "django.db.backends.postgresql", "NAME": "x"}})["default"]
+        queryset = DocumentChunk.objects.annotate(v=hybrid_search.chunk_search_vector(lesson)).values("v")
+
+        sql, params = queryset.query.get_compiler(connection=pg).as_sql()
+
+        assert "setweight" in sql
+        assert f"{lesson.unit_code} {lesson.title}" in params
+        assert "A" in params and "B" in params
+
+
+@pytest.mark.django_db
+class TestHybridSearch:
+    """Test fusion in views.hybrid_search and the fast path in ask_assistant."""
+
+    def test_vector_only_without_full_text(self, monkeypatch):
+        """Without full-text search the vector ranking is returned unchanged."""
+        from assist import views
+        rows = [chunk("X1", "a"), chunk("X1", "b")]
+        monkeypatch.setattr(views, "search_chunks", lambda *args, **kwargs: rows)
+
+        assert views.hybrid_search("question", [0.1] * 768, top_k=5) == rows
+
+    def test_fuses_vector_and_lexical(self, monkeypatch, settings):
+        """A chunk matching the exact code is pulled up by the lexical ranking."""
+        from assist import views
+        settings.AI_HYBRID_CANDIDATES = 3
+        exact = chunk("CS101", "CS101 covers recursion")
+        vector_rows = [chunk("X1", "a"), chunk("X1", "b"), exact]
+        seen = {}
+
+        def fake_lexical(question, lesson_id=None, limit=5):
+            seen["limit"] = limit
+            return [exact]
+
+        monkeypatch.setattr(views, "search_chunks", lambda *args, **kwargs: vector_rows)
+        monkeypatch.setattr(views.lexical, "is_available", lambda: True)
+        monkeypatch.setattr(views.lexical, "lexical_search", fake_lexical)
+
+        results = views.hybrid_search("CS101 recursion", [0.1] * 768, top_k=2)
+
+        assert results == [exact, vector_rows[0]]
+        assert seen["limit"] == 3
+
+    def test_code_like_question_skips_embedding(self, student_client, student_user, settings, monkeypatch):
+        """A code-like question with full-text matches is answered without an embedding call."""
+        from assist import views
+        settings.USING_POSTGRESQL = True
+
+        async def no_embed(texts):
+            raise AssertionError("embedding should be skipped")
+
+        async def fake_chat(messages, **kwargs):
+            return "CS101 is the intro unit."
+
+        monkeypatch.setattr(views, "aembed_texts", no_embed)
+        monkeypatch.setattr(views.lexical, "lexical_search", lambda question, lesson_id=None, limit=5: [
+            chunk("CS101", "CS101 introduces Python."),
+        ])
+        monkeypatch.setattr(views, "achat", fake_chat)
+
+        response = student_client.post(
+            reverse("assist:ask_assistant"),
+            data=json.dumps({"message": "CS101 week 1"}),
+            content_type="application/json",
+        )
+
+        data = json.loads(response.content)
+        assert data["sources"] == [{"lesson": "CS101 - CS101 title", "excerpt": "CS101 introduces Python."}]
+        assert StudentQuestion.objects.get(user=student_user).question_embedding is None
@@ -0,0 +1,98 @@
+"""
+Tests for incremental RAG indexing (assist.indexing).
+"""
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from model_bakery import baker
+from assist.indexing import index_lesson, lessons_needing_index
+from assist.models import DocumentChunk, LessonIndexState
+from lesson_management.models import ReadingList
+
+
+@pytest.fixture
+def embedded(monkeypatch):
+    """Record the texts sent for embedding."""
+    from assist import ollama
+    sent = []
+
+    def fake_embed(texts, model=None):
+        sent.extend(texts)
+        return [[0.1] * 768 for _ in texts]
+
+    monkeypatch.setattr(ollama, "embed_texts", fake_embed)
+    return sent
+
+
+@pytest.mark.django_db
+class TestIndexLesson:
+    """Test index_lesson fingerprints and chunk diffs."""
+
+    def test_first_index_embeds_all_chunks(self, lesson, embedded):
+        """An unindexed lesson gets every chunk embedded and a clean state."""
+        stats = index_lesson(lesson)
+
+        assert stats["created"] == DocumentChunk.objects.filter(lesson=lesson).count() == len(embedded)
+        state = LessonIndexState.objects.get(lesson=lesson)
+        assert state.dirty is False
+        assert state.fingerprint
+
+    def test_unchanged_lesson_is_skipped(self, lesson, embedded):
+        """A matching fingerprint means no embedding and no writes."""
+        index_lesson(lesson)
+        embedded.clear()
+
+        stats = index_lesson(lesson)
+
+        assert stats["unchanged"] == 1
+        assert embedded == []
+
+    def test_edit_only_embeds_changed_chunks(self, lesson, embedded):
+        """Unchanged chunks keep their rows; only new text is embedded."""
+        lesson.objectives = " ".join(f"Objective {i} covers loops and functions." for i in range(80))
+        lesson.save()
+        index_lesson(lesson)
+        before = set(DocumentChunk.objects.filter(lesson=lesson).values_list("id", flat=True))
+        embedded.clear()
+
+        lesson.description = "Learn Python basics and a bit of testing"
+        lesson.save()
+        stats = index_lesson(lesson)
+
+        after = set(DocumentChunk.objects.filter(lesson=lesson).values_list("id", flat=True))
+        assert stats["kept"] >= 1
+        assert stats["created"] == len(embedded) >= 1
+        assert before & after
+        assert all("testing" in text for text in embedded)
+
+
+@pytest.mark.django_db
+class TestChangeTracking:
+    """Test that edits flag lessons for re-indexing."""
+
+    def test_reading_list_change_marks_dirty(self, lesson, embedded):
+        """Adding a reading list item flags the lesson."""
+        index_lesson(lesson)
+        assert not lessons_needing_index().filter(pk=lesson.pk).exists()
+
+        baker.make(ReadingList, lesson=lesson, title="Fluent Python", description="Chapter 1")
+
+        assert LessonIndexState.objects.get(lesson=lesson).dirty is True
+        assert lessons_needing_index().filter(pk=lesson.pk).exists()
+
+    def test_command_processes_only_changed_lessons(self, lesson, teacher, embedded):
+        """The command re-indexes flagged lessons and drops unpublished ones."""
+        other = baker.make("lesson_management.Lesson", unit_code="UNIT002", lesson_designer=teacher, status="published")
+        call_command("index_lessons_for_rag", stdout=StringIO())
+        embedded.clear()
+
+        lesson.title = "Advanced Python"
+        lesson.save()
+        other.status = "draft"
+        other.save()
+        out = StringIO()
+        call_command("index_lessons_for_rag", stdout=out)
+
+        assert "UNIT001" in out.getvalue()
+        assert any("Advanced Python" in text for text in embedded)
+        assert not DocumentChunk.objects.filter(lesson=other).exists()
@@ -1,10 +1,12 @@
 """
 Tests for Ollama client (assist.ollama).
 """
+import asyncio
+import json
 import pytest
 import httpx
 import responses
-from assist.ollama import embed_texts, chat, estimate_tokens
+from assist.ollama import embed_texts, chat, estimate_tokens, aembed_texts, achat, achat_stream
 
 
 @pytest.mark.unit
@@ -107,6 +109,189 @@ class TestEmbedTexts:
         assert len(result[0]) == 384
 
 
+@pytest.fixture
+def embed_server(monkeypatch, settings):
+    """Route the pooled sync client through an httpx.MockTransport handler."""
+    from assist import http_client, ollama
+    settings.AI_EMBED_CACHE_MAX_ENTRIES = 0
+
+    def install(handler):
+        monkeypatch.setattr(http_client, "_client", httpx.Client(transport=httpx.MockTransport(handler)))
+        monkeypatch.setattr(ollama, "_legacy_embed_endpoint", False)
+
+    return install
+
+
+@pytest.mark.unit
+class TestBatchedEmbedTexts:
+    """Test batching, ordering, retry and fallback in embed_texts."""
+
+    def test_batches_keep_input_order(self, settings, embed_server):
+        """Concurrent batches are reassembled in the original order."""
+        settings.AI_EMBED_BATCH_SIZE = 2
+        settings.AI_EMBED_CONCURRENCY = 3
+        seen = []
+
+        def handler(request):
+            inputs = json.loads(request.content)["input"]
+            seen.append(len(inputs))
+            return httpx.Response(200, json={"embeddings": [[float(t.split()[-1])] for t in inputs]})
+
+        embed_server(handler)
+        result = embed_texts([f"text {i}" for i in range(7)])
+
+        assert result == [[float(i)] for i in range(7)]
+        assert sorted(seen) == [1, 2, 2, 2]
+
+    def test_retries_unavailable_server(self, embed_server):
+        """503 responses are retried before succeeding."""
+        attempts = []
+
+        def handler(request):
+            attempts.append(request)
+            if len(attempts) < 3:
+                return httpx.Response(503)
+            return httpx.Response(200, json={"embeddings": [[0.1]]})
+
+        embed_server(handler)
+
+        assert embed_texts(["retry me"]) == [[0.1]]
+        assert len(attempts) == 3
+
+    def test_gives_up_after_max_retries(self, settings, embed_server):
+        """Persistent failures raise once retries are exhausted."""
+        settings.AI_EMBED_MAX_RETRIES = 1
+        embed_server(lambda request: httpx.Response(503))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            embed_texts(["never works"])
+
+    def test_falls_back_to_legacy_endpoint(self, embed_server):
+        """Servers without /api/embed are sent one prompt per request."""
+        def handler(request):
+            if request.url.path == "/api/embed":
+                return httpx.Response(404)
+            prompt = json.loads(request.content)["prompt"]
+            return httpx.Response(200, json={"embedding": [float(len(prompt))]})
+
+        embed_server(handler)
+
+        assert embed_texts(["a", "bbb"]) == [[1.0], [3.0]]
+
+
+@pytest.fixture
+def async_server(monkeypatch, settings):
+    """Route the pooled AsyncClients through an httpx.MockTransport handler."""
+    from assist import http_client, ollama
+    settings.AI_EMBED_CACHE_MAX_ENTRIES = 0
+
+    def install(handler):
+        transport = httpx.MockTransport(handler)
+        monkeypatch.setattr(http_client, "_new_async_client", lambda: httpx.AsyncClient(transport=transport))
+        monkeypatch.setattr(ollama, "_legacy_embed_endpoint", False)
+
+    return install
+
+
+@pytest.mark.unit
+class TestAsyncOllama:
+    """Test the async twins of embed_texts, chat and chat_stream."""
+
+    def test_aembed_texts_batches_in_order(self, settings, async_server):
+        """Batches run concurrently and come back in input order, retrying 503s."""
+        settings.AI_EMBED_BATCH_SIZE = 2
+        failed = []
+
+        def handler(request):
+            inputs = json.loads(request.content)["input"]
+            if inputs == ["text 2", "text 3"] and not failed:
+                failed.append(True)
+                return httpx.Response(503)
+            return httpx.Response(200, json={"embeddings": [[float(t.split()[-1])] for t in inputs]})
+
+        async_server(handler)
+        result = asyncio.run(aembed_texts([f"text {i}" for i in range(5)]))
+
+        assert result == [[float(i)] for i in range(5)]
+        assert failed == [True]
+
+    def test_legacy_endpoint_requests_are_bounded(self, settings, async_server):
+        """Falling back to one request per text still keeps AI_EMBED_CONCURRENCY requests in flight at most."""
+        settings.AI_EMBED_BATCH_SIZE = 16
+        settings.AI_EMBED_CONCURRENCY = 3
+        in_flight = []
+        peak = []
+
+        async def handler(request):
+            if request.url.path == "/api/embed":
+                return httpx.Response(404)
+            in_flight.append(request)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.001)
+            in_flight.remove(request)
+            return httpx.Response(200, json={"embedding": [float(json.loads(request.content)["prompt"])]})
+
+        async_server(handler)
+        result = asyncio.run(aembed_texts([str(i) for i in range(40)]))
+
+        assert result == [[float(i)] for i in range(40)]
+        assert max(peak) == 3
+
+    def test_achat(self, async_server):
+        """achat returns the first choice's content."""
+        async_server(lambda request: httpx.Response(
+            200, json={"choices": [{"message": {"content": "Hello!"}}]}
+        ))
+
+        assert asyncio.run(achat([{"role": "user", "content": "Hi"}])) == "Hello!"
+
+    def test_achat_stream(self, async_server):
+        """achat_stream yields delta content until [DONE]."""
+        chunks = [{"choices": [{"delta": {"content": piece}}]} for piece in ("Hel", "lo")]
+        body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+        async_server(lambda request: httpx.Response(200, text=body))
+
+        async def collect():
+            return [piece async for piece in achat_stream([{"role": "user", "content": "Hi"}])]
+
+        assert asyncio.run(collect()) == ["Hel", "lo"]
+
+    def test_achat_stream_reports_usage(self, async_server):
+        """Server-reported token usage from the final chunk is recorded."""
+        requests_seen = []
+        chunks = [
+            {"choices": [{"delta": {"content": "Hi"}}]},
+            {"choices": [], "usage": {"prompt_tokens": 42, "completion_tokens": 1, "total_tokens": 43}},
+        ]
+        body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+
+        def handler(request):
+            requests_seen.append(json.loads(request.content))
+            return httpx.Response(200, text=body)
+
+        async_server(handler)
+        usage = {}
+
+        async def collect():
+            return [piece async for piece in achat_stream([{"role": "user", "content": "Hi"}], usage=usage)]
+
+        assert asyncio.run(collect()) == ["Hi"]
+        assert (usage["prompt_tokens"], usage["completion_tokens"]) == (42, 1)
+        assert requests_seen[0]["stream_options"] == {"include_usage": True}
+
+    def test_achat_reports_usage(self, async_server):
+        """achat fills the usage dict from the response."""
+        async_server(lambda request: httpx.Response(200, json={
+            "choices": [{"message": {"content": "Hello!"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 3},
+        }))
+        usage = {}
+
+        asyncio.run(achat([{"role": "user", "content": "Hi"}], usage=usage))
+
+        assert usage == {"prompt_tokens": 10, "completion_tokens": 3}
+
+
 @pytest.mark.unit
 class TestChat:
     """Test chat function."""
@@ -213,22 +398,25 @@ class TestEstimateTokens:
         assert result == 0
     
     def test_estimate_tokens_short_text(self):
-        """Test with short text."""
-        text = "Hello"
-        result = estimate_tokens(text)
-        assert result == len(text) // 4
+        """A short word is a single token."""
+        assert estimate_tokens("Hello") == 1
     
     def test_estimate_tokens_long_text(self):
-        """Test with longer text."""
+        """Common words cost about one token each."""
         text = "This is a longer piece of text that should be tokenized."
         result = estimate_tokens(text)
-        assert result == len(text) // 4
+        assert 10 <= result <= 16
     
     def test_estimate_tokens_very_long_text(self):
-        """Test with very long text."""
+        """Runs of letters are split into several tokens."""
         text = "A" * 10000
         result = estimate_tokens(text)
-        assert result == 2500  # 10000 / 4
+        assert result == 1667  # ceil(10000 / 6)
+    
+    def test_estimate_tokens_uses_configured_tokenizer(self, settings):
+        """estimate_tokens follows settings.AI_TOKENIZER."""
+        settings.AI_TOKENIZER_OPTIONS = {"chars_per_token": 2.0}
+        assert estimate_tokens("A" * 10) == 5
     
     def test_estimate_tokens_with_unicode(self):
         """Test with unicode characters."""
@@ -0,0 +1,138 @@
+"""
+Tests for assignment PDF text extraction (assist.pdf_text).
+"""
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from model_bakery import baker
+
+from assist import pdf_text
+from assist.indexing import index_lesson, prepare_lesson_content
+from assist.models import DocumentChunk, LessonIndexState, PdfTextCacheEntry
+from lesson_management.models import AssignmentAttachment
+
+
+def upload(name, content=b"%PDF-1.4 fake"):
+    return SimpleUploadedFile(name, content, content_type="application/pdf")
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Fake the pypdf parse and record which sources were parsed."""
+    sources = []
+
+    def fake_extract(source, max_chars):
+        sources.append(source)
+        return f"Text of {str(source).rsplit('/', 1)[-1]}", 1, ""
+
+    monkeypatch.setattr(pdf_text, "is_enabled", lambda: True)
+    monkeypatch.setattr(pdf_text, "_extract_file", fake_extract)
+    return sources
+
+
+@pytest.mark.django_db
+class TestExtractTexts:
+    """Test the file-hash cache around extraction."""
+
+    def test_disabled_returns_nothing(self, assignment, settings):
+        settings.AI_INDEX_PDFS = False
+        assignment.pdf = upload("brief.pdf")
+        assignment.save()
+
+        assert pdf_text.extract_texts([assignment.pdf]) == {}
+
+    def test_unchanged_files_are_parsed_once(self, assignment, parsed):
+        assignment.pdf = upload("brief.pdf")
+        assignment.save()
+
+        first = pdf_text.extract_texts([assignment.pdf])
+        second = pdf_text.extract_texts([assignment.pdf])
+
+        assert first == second == {assignment.pdf.name: "Text of brief.pdf"}
+        assert len(parsed) == 1
+        assert PdfTextCacheEntry.objects.get().file_hash == pdf_text.file_hash(assignment.pdf)
+
+    def test_identical_bytes_share_a_parse(self, assignment, parsed):
+        assignment.pdf = upload("brief.pdf", b"%PDF same bytes")
+        assignment.save()
+        attachment = baker.make(AssignmentAttachment, assignment=assignment, file=upload("copy.pdf", b"%PDF same bytes"))
+
+        texts = pdf_text.extract_texts([assignment.pdf, attachment.file])
+
+        assert len(parsed) == 1
+        assert texts[assignment.pdf.name] == texts[attachment.file.name]
+
+    def test_missing_files_are_skipped(self, assignment, parsed):
+        assignment.pdf = upload("brief.pdf")
+        assignment.save()
+        assignment.pdf.storage.delete(assignment.pdf.name)
+        pdf_text.reset_stats()
+
+        assert pdf_text.extract_texts([assignment.pdf]) == {}
+        assert pdf_text.get_stats()["missing"] == 1
+
+    def test_extract_for_lessons_warms_the_cache(self, lesson, assignment, parsed):
+        assignment.pdf = upload("brief.pdf")
+        assignment.save()
+        baker.make(AssignmentAttachment, assignment=assignment, file=upload("notes.pdf", b"%PDF other"))
+
+        assert pdf_text.extract_for_lessons([lesson]) == 2
+        prepare_lesson_content(lesson)
+
+        assert len(parsed) == 2
+
+
+@pytest.mark.django_db
+class TestIndexingPdfs:
+    """Test that PDF text reaches the lesson's chunks."""
+
+    def test_pdf_text_is_chunked_and_embedded(self, lesson, assignment, parsed, monkeypatch):
+        from assist import ollama
+        monkeypatch.setattr(ollama, "embed_texts", lambda texts, model=None: [[0.1] * 768 for _ in texts])
+        assignment.pdf = upload("brief.pdf")
+        assignment.save()
+
+        index_lesson(lesson)
+
+        content = "\n".join(DocumentChunk.objects.filter(lesson=lesson).values_list("content", flat=True))
+        assert "Assignment Assignment 1:" in content
+        assert "Text of brief.pdf" in content
+
+    def test_attachment_upload_marks_lesson_dirty(self, lesson, assignment, monkeypatch):
+        from assist import ollama
+        monkeypatch.setattr(ollama, "embed_texts", lambda texts, model=None: [[0.1] * 768 for _ in texts])
+        index_lesson(lesson)
+
+        baker.make(AssignmentAttachment, assignment=assignment, file=upload("notes.pdf"))
+
+        assert LessonIndexState.objects.get(lesson=lesson).dirty is True
+
+
+@pytest.mark.django_db
+class TestPypdfExtraction:
+    """Test extraction of a real PDF (needs pypdf)."""
+
+    def test_pages_become_paragraphs(self):
+        pytest.importorskip("pypdf")
+        from reportlab.pdfgen import canvas
+
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer)
+        pdf.drawString(72, 720, "Recursion needs a base case")
+        pdf.showPage()
+        pdf.drawString(72, 720, "Stacks are last in first out")
+        pdf.save()
+
+        text, pages, error = pdf_text._extract_file(buffer.getvalue(), max_chars=0)
+
+        assert (pages, error) == (2, "")
+        assert text == "Recursion needs a base case\n\nStacks are last in first out"
+
+    def test_broken_file_is_reported_not_raised(self):
+        pytest.importorskip("pypdf")
+
+        text, pages, error = pdf_text._extract_file(b"not a pdf", max_chars=0)
+
+        assert (text, pages) == ("", 0)
+        assert error
@@ -0,0 +1,110 @@
+"""
+Tests for token-budgeted prompt assembly (assist.prompt).
+"""
+import pytest
+
+from assist.prompt import NO_CONTEXT, build_prompt, build_system_prompt, split_profile_sections
+from assist.tokenizers import count_tokens
+
+
+PROFILE = "\n".join([
+    "=== USER PROFILE ===",
+    "Username: student1",
+    "",
+    "=== ENROLLED COURSES ===",
+    "- BIT: Bachelor of IT " + "details " * 40,
+    "",
+    "=== ENROLLED LESSONS ===",
+    "- FIT1045: Algorithms " + "progress " * 40,
+    "",
+    "=== UPCOMING ASSIGNMENTS ===",
+    "- Assignment 1 " + "due soon " * 40,
+    "",
+    "=== RECENT PAST ASSIGNMENTS ===",
+    "- Quiz 0 " + "graded " * 40,
+])
+
+
+def make_chunks(n, words=60):
+    return [
+        {"content": f"chunk {i} " + "content " * words, "lesson_title": "Algorithms", "lesson_code": "FIT1045"}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.unit
+class TestSplitProfileSections:
+    """Test splitting the profile context on its section headers."""
+
+    def test_sections_in_order(self):
+        """Each === NAME === header starts a section."""
+        names = [name for name, _ in split_profile_sections(PROFILE)]
+
+        assert names == [
+            "USER PROFILE", "ENROLLED COURSES", "ENROLLED LESSONS", "UPCOMING ASSIGNMENTS", "RECENT PAST ASSIGNMENTS",
+        ]
+
+
+@pytest.mark.unit
+class TestBuildPrompt:
+    """Test budget enforcement and trimming order."""
+
+    def test_under_budget_keeps_everything(self):
+        """Without trimming the system prompt matches the untrimmed template."""
+        chunks = make_chunks(3)
+
+        prompt = build_prompt("What is a heap?", PROFILE, chunks, budget=100000)
+
+        context_text = "\n\n".join(
+            f"[From {c['lesson_code']} - {c['lesson_title']}]\n{c['content']}" for c in chunks
+        )
+        assert prompt.messages[0]["content"] == build_system_prompt(PROFILE, context_text)
+        assert prompt.messages[1] == {"role": "user", "content": "What is a heap?"}
+        assert prompt.chunks == chunks
+        assert prompt.dropped == []
+
+    def test_drops_low_ranked_chunks_first(self):
+        """Chunks beyond AI_PROMPT_MIN_CHUNKS go before any profile section."""
+        chunks = make_chunks(5)
+        full = build_prompt("Q", PROFILE, chunks, budget=0)
+        chunk_tokens = count_tokens(chunks[0]["content"])
+
+        prompt = build_prompt("Q", PROFILE, chunks, budget=full.tokens - 2 * chunk_tokens)
+
+        assert prompt.chunks == chunks[:3]
+        assert prompt.dropped == ["chunk 5", "chunk 4"]
+        assert "RECENT PAST ASSIGNMENTS" in prompt.messages[0]["content"]
+
+    def test_then_profile_sections_in_trim_order(self, settings):
+        """Once down to the minimum chunks, profile sections are dropped in AI_PROMPT_TRIM_ORDER."""
+        settings.AI_PROMPT_MIN_CHUNKS = 2
+        chunks = make_chunks(4)
+        base = build_prompt("Q", PROFILE, chunks[:2], budget=0)
+        section_tokens = count_tokens("- Quiz 0 " + "graded " * 40)
+
+        prompt = build_prompt("Q", PROFILE, chunks, budget=base.tokens - section_tokens)
+
+        assert prompt.dropped[:2] == ["chunk 4", "chunk 3"]
+        assert "RECENT PAST ASSIGNMENTS" in prompt.dropped
+        assert "USER PROFILE" not in prompt.dropped
+        assert "=== RECENT PAST ASSIGNMENTS ===" not in prompt.messages[0]["content"]
+        assert prompt.chunks == chunks[:2]
+        assert prompt.tokens <= base.tokens - section_tokens
+
+    def test_tiny_budget_keeps_question_and_user_profile(self):
+        """Even an unmeetable budget keeps the instructions, user profile and question."""
+        prompt = build_prompt("What is a heap?", PROFILE, make_chunks(3), budget=10)
+
+        system = prompt.messages[0]["content"]
+        assert prompt.chunks == []
+        assert NO_CONTEXT in system
+        assert "Username: student1" in system
+        assert "=== ENROLLED COURSES ===" not in system
+        assert prompt.messages[1]["content"] == "What is a heap?"
+
+    def test_budget_from_settings(self, settings):
+        """The default budget is settings.AI_PROMPT_TOKEN_BUDGET."""
+        chunks = make_chunks(5)
+        settings.AI_PROMPT_TOKEN_BUDGET = build_prompt("Q", PROFILE, chunks[:4], budget=0).tokens
+
+        assert len(build_prompt("Q", PROFILE, chunks).chunks) == 4
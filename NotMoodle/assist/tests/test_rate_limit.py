@@ -0,0 +1,122 @@
+"""
+Tests for the cache-backed rolling-window question limiter (assist.rate_limit).
+"""
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
+from model_bakery import baker
+
+from assist import rate_limit
+from assist.checks import check_shared_caches
+from assist.models import StudentQuestion
+
+
+@pytest.fixture(params=["locmem", "file", "db"])
+def shared_cache(request, settings, tmp_path):
+    """The limiter works with the local-memory cache and with the cross-process file and database caches."""
+    backends = {
+        "locmem": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "file": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)},
+        "db": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "test_rate_limit_cache"},
+    }
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "rate_limit": backends[request.param],
+    }
+    if request.param == "db":
+        call_command("createcachetable", verbosity=0)
+    cache = rate_limit.get_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+def ask(user, n=1):
+    for i in range(n):
+        baker.make(StudentQuestion, user=user, question=f"Question {i}", answer="Answer")
+
+
+@pytest.mark.django_db
+class TestRollingWindow:
+    """Test counting, the rolling window and recovery after a cache loss."""
+
+    def test_counts_without_querying_questions(self, student_user, shared_cache):
+        """Once seeded, usage comes from the cache and each new question bumps it."""
+        with freeze_time("2025-01-15 10:00:00"):
+            ask(student_user, 2)
+            assert rate_limit.get_usage(student_user.pk).count == 2
+            ask(student_user)
+
+            with CaptureQueriesContext(connection) as queries:
+                assert rate_limit.get_usage(student_user.pk).count == 3
+            assert not [query for query in queries if "assist_studentquestion" in query["sql"]]
+
+    def test_questions_leave_the_window(self, student_user, shared_cache, settings):
+        """Questions stop counting a day later (to the hour), not at midnight."""
+        settings.AI_DAILY_QUESTION_LIMIT = 2
+        with freeze_time("2025-01-15 22:30:00"):
+            ask(student_user, 2)
+            assert rate_limit.get_usage(student_user.pk).exceeded
+
+        with freeze_time("2025-01-16 01:00:00"):
+            usage = rate_limit.get_usage(student_user.pk)
+            assert usage.exceeded
+            assert usage.retry_after == 21 * 3600  # their hourly bucket leaves the window at 22:00
+
+        with freeze_time("2025-01-16 22:00:00"):
+            assert rate_limit.get_usage(student_user.pk).count == 0
+
+    def test_rebuilds_from_database_after_cache_loss(self, student_user, shared_cache):
+        """Clearing the cache loses no questions."""
+        with freeze_time("2025-01-15 10:00:00"):
+            ask(student_user, 3)
+            assert rate_limit.get_usage(student_user.pk).count == 3
+
+            shared_cache.clear()
+            ask(student_user)
+
+            assert rate_limit.get_usage(student_user.pk).count == 4
+
+    def test_without_cache_uses_database(self, student_user):
+        """With the dummy cache every check falls back to StudentQuestion."""
+        with freeze_time("2025-01-15 10:00:00"):
+            ask(student_user, 2)
+
+            assert rate_limit.get_usage(student_user.pk).count == 2
+
+    def test_users_are_counted_separately(self, student_user, shared_cache):
+        """One user's questions don't use up another's allowance."""
+        other = baker.make("auth.User")
+        with freeze_time("2025-01-15 10:00:00"):
+            ask(student_user, 2)
+            ask(other)
+
+            assert rate_limit.get_usage(student_user.pk).count == 2
+            assert rate_limit.get_usage(other.pk).count == 1
+
+
+class TestSharedCacheCheck:
+    """Test the system check for process-local limiter and profile caches."""
+
+    def test_warns_for_process_local_cache(self, settings):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            "rate_limit": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "profile_context": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        }
+
+        warnings = check_shared_caches(None)
+
+        assert [warning.id for warning in warnings] == ["assist.W001"] * 2
+        assert "AI_PROFILE_CACHE" in warnings[1].msg
+
+    def test_shared_cache_passes(self, settings, tmp_path):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            "rate_limit": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)},
+            "profile_context": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "profile_cache"},
+        }
+
+        assert check_shared_caches(None) == []
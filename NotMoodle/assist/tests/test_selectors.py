@@ -0,0 +1,139 @@
+"""
+Tests for assist selectors (bulk-loaded, cached profile context).
+"""
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from assist import selectors
+from assist.selectors import build_user_profile_context, get_user_profile_context
+from classroom_and_grading.models import AssignmentGrade
+from lesson_management.models import (
+    Assignment, Lesson, LessonEnrollment, ReadingList, ReadingListProgress, VideoProgress,
+)
+
+
+def add_lesson(student, teacher, code, due_in_days):
+    lesson = baker.make(Lesson, unit_code=code, lesson_designer=teacher, description="About " + code)
+    LessonEnrollment.objects.create(student=student, lesson=lesson)
+    reading = baker.make(ReadingList, lesson=lesson)
+    ReadingListProgress.objects.create(student=student, reading=reading, done=True)
+    VideoProgress.objects.create(student=student, lesson=lesson, watched=True)
+    assignment = baker.make(
+        Assignment,
+        lesson=lesson,
+        title=f"{code} assignment",
+        release_date=timezone.now() - timedelta(days=30),
+        due_date=timezone.now() + timedelta(days=due_in_days),
+        marks=Decimal("100"),
+        weightage=Decimal("100"),
+    )
+    AssignmentGrade.objects.create(assignment=assignment, student=student, marks_awarded=Decimal("70"))
+    return lesson
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "profile_context": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    selectors.get_cache().clear()
+    yield
+    selectors.get_cache().clear()
+
+
+@pytest.mark.django_db
+class TestBuildUserProfileContext:
+    """Test the bulk-loading profile context builder."""
+
+    def test_lesson_progress_and_grades(self, student_user, student, teacher):
+        """Each lesson shows video, reading and grade progress."""
+        add_lesson(student, teacher, "BULK1", due_in_days=-2)
+
+        text, next_due = build_user_profile_context(student_user)
+
+        assert "- BULK1: " in text
+        assert "Video: Watched ✓" in text
+        assert "Reading Progress: 1/1 completed" in text
+        assert "Overall Grade: 70.00% (PASSED)" in text
+        assert "Grade: 70.00/100.00 (70.0%)" in text
+        assert next_due is None
+
+    def test_query_count_flat_in_lessons(self, student_user, student, teacher):
+        """More lessons and assignments do not add queries."""
+        add_lesson(student, teacher, "FLAT0", due_in_days=3)
+        with CaptureQueriesContext(connection) as few:
+            build_user_profile_context(student_user)
+
+        for i in range(1, 6):
+            add_lesson(student, teacher, f"FLAT{i}", due_in_days=i - 3)
+        with CaptureQueriesContext(connection) as many:
+            text, next_due = build_user_profile_context(student_user)
+
+        assert len(many) == len(few)
+        assert text.count("Overall Grade") == 6
+        assert next_due is not None
+
+
+@pytest.mark.django_db
+class TestProfileContextCache:
+    """Test per-user caching and signal invalidation."""
+
+    def test_cached_until_grade_changes(self, student_user, student, teacher, locmem_cache, django_assert_num_queries):
+        """A second call is served from cache; saving a grade invalidates it."""
+        lesson = add_lesson(student, teacher, "CACHE1", due_in_days=5)
+        first = get_user_profile_context(student_user)
+
+        with django_assert_num_queries(0):
+            assert get_user_profile_context(student_user) == first
+
+        AssignmentGrade.objects.filter(student=student, assignment__lesson=lesson).update(marks_awarded=Decimal("30"))
+        grade = AssignmentGrade.objects.get(student=student, assignment__lesson=lesson)
+        grade.save()
+
+        assert "Overall Grade: 30.00% (NOT PASSED)" in get_user_profile_context(student_user)
+
+    def test_new_assignment_invalidates_enrolled_students(self, student_user, student, teacher, locmem_cache):
+        """Adding an assignment to a lesson refreshes its students' context."""
+        lesson = add_lesson(student, teacher, "CACHE2", due_in_days=5)
+        get_user_profile_context(student_user)
+
+        baker.make(
+            Assignment,
+            lesson=lesson,
+            title="Surprise quiz",
+            release_date=timezone.now(),
+            due_date=timezone.now() + timedelta(days=1),
+            marks=Decimal("10"),
+            weightage=Decimal("0"),
+        )
+
+        assert "Surprise quiz" in get_user_profile_context(student_user)
+
+    def test_invalidation_reaches_other_processes(self, student_user, student, teacher, settings, monkeypatch):
+        """A grade saved in one worker drops the context another worker cached, via the shared cache."""
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            "profile_context": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "profile_cache"},
+        }
+        call_command("createcachetable", verbosity=0)
+        # Each "process" has its own cache connection to the same table
+        reader, writer = DatabaseCache("profile_cache", {}), DatabaseCache("profile_cache", {})
+        lesson = add_lesson(student, teacher, "SHARED1", due_in_days=5)
+        monkeypatch.setattr(selectors, "get_cache", lambda: reader)
+        assert "(PASSED)" in get_user_profile_context(student_user)
+
+        monkeypatch.setattr(selectors, "get_cache", lambda: writer)
+        grade = AssignmentGrade.objects.get(student=student, assignment__lesson=lesson)
+        grade.marks_awarded = Decimal("30")
+        grade.save()
+
+        assert reader.get(selectors.PROFILE_CONTEXT_KEY.format(student_user.pk)) is None
+        monkeypatch.setattr(selectors, "get_cache", lambda: reader)
+        assert "Overall Grade: 30.00% (NOT PASSED)" in get_user_profile_context(student_user)
@@ -0,0 +1,168 @@
+"""
+Tests for coalescing identical concurrent questions (assist.single_flight).
+"""
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+from model_bakery import baker
+
+from assist import single_flight
+from assist.models import StudentQuestion
+
+
+def run(coroutine_function):
+    return async_to_sync(coroutine_function)()
+
+
+def producer(pieces, calls, error=None):
+    async def produce(flight):
+        calls.append(flight.key)
+        flight.set_context({"sources": ["CS101"]})
+        for piece in pieces:
+            await asyncio.sleep(0.01)
+            flight.publish(piece)
+        if error is not None:
+            raise error
+    return produce
+
+
+@pytest.mark.unit
+class TestJoin:
+    """Test sharing one flight between identical requests."""
+
+    def test_question_key_normalizes(self):
+        assert single_flight.question_key("What is  recursion?", 3) == single_flight.question_key("what is recursion", 3)
+        assert single_flight.question_key("What is recursion?", 3) != single_flight.question_key("What is recursion?", 4)
+        assert single_flight.question_key("My grade?", 3, 1) != single_flight.question_key("My grade?", 3, 2)
+
+    def test_followers_share_context_and_pieces(self):
+        calls = []
+
+        async def scenario():
+            first, started = single_flight.join("key", producer(["a", "b", "c"], calls))
+            await asyncio.sleep(0.015)  # join mid-answer: earlier pieces are replayed
+            second, joined_started = single_flight.join("key", producer(["x"], calls))
+            assert second is first
+            assert (started, joined_started) == (True, False)
+            return await asyncio.gather(first.result(), second.result(), second.context())
+
+        assert run(scenario) == ["abc", "abc", {"sources": ["CS101"]}]
+        assert calls == ["key"]
+        assert single_flight._flights == {}
+
+    def test_error_reaches_every_request(self):
+        async def scenario():
+            first, _ = single_flight.join("key", producer(["a"], [], error=RuntimeError("model crashed")))
+            second, _ = single_flight.join("key", producer([], []))
+            results = await asyncio.gather(first.result(), second.result(), return_exceptions=True)
+            return [str(result) for result in results]
+
+        assert run(scenario) == ["model crashed", "model crashed"]
+
+    def test_different_keys_and_finished_flights_do_not_coalesce(self):
+        calls = []
+
+        async def scenario():
+            first, _ = single_flight.join("one", producer(["a"], calls))
+            second, _ = single_flight.join("two", producer(["b"], calls))
+            await asyncio.gather(first.result(), second.result())
+            third, started = single_flight.join("one", producer(["c"], calls))
+            return await third.result(), started
+
+        assert run(scenario) == ("c", True)
+        assert calls == ["one", "two", "one"]
+
+    def test_disabled(self, settings):
+        settings.AI_COALESCE_QUESTIONS = False
+        calls = []
+
+        async def scenario():
+            first, _ = single_flight.join("key", producer(["a"], calls))
+            second, started = single_flight.join("key", producer(["b"], calls))
+            return await asyncio.gather(first.result(), second.result()), started
+
+        assert run(scenario) == (["a", "b"], True)
+        assert len(calls) == 2
+
+
+@pytest.mark.django_db
+class TestAskAssistantCoalescing:
+    """Test that concurrent identical questions reach the model once."""
+
+    @pytest.fixture
+    def chat_calls(self, settings, monkeypatch):
+        from assist import views
+        settings.USING_POSTGRESQL = True
+        calls = []
+
+        async def fake_embed(texts):
+            return [[0.1] * 768 for _ in texts]
+
+        async def fake_chat(messages, usage=None, **kwargs):
+            calls.append(messages)
+            await asyncio.sleep(0.2)
+            usage.update(prompt_tokens=120, completion_tokens=8)
+            return "Recursion is a function calling itself."
+
+        monkeypatch.setattr(views, "aembed_texts", fake_embed)
+        monkeypatch.setattr(views, "search_chunks", lambda *args, **kwargs: [])
+        monkeypatch.setattr(views, "achat", fake_chat)
+        monkeypatch.setattr(views, "get_user_profile_context", lambda user: "=== USER PROFILE ===")
+        monkeypatch.setattr(views.answer_cache, "lookup", lambda embedding, lesson_id: None)
+        monkeypatch.setattr(views, "get_user", lambda request: request.user)
+        return calls
+
+    def ask_together(self, lesson, questions):
+        """Send (user, message) pairs about `lesson` (or none) to ask_assistant concurrently in one event loop."""
+        from assist import views
+        factory = RequestFactory()
+
+        def request(user, message):
+            body = json.dumps({"message": message, "lesson_id": lesson and lesson.id})
+            request = factory.post("/api/notmoodle/ask/", data=body, content_type="application/json")
+            request.user = user
+            return request
+
+        async def scenario():
+            return await asyncio.gather(*(views.ask_assistant(request(user, message)) for user, message in questions))
+
+        return [json.loads(response.content) for response in async_to_sync(scenario)()]
+
+    def test_identical_questions_share_one_completion(self, chat_calls, student_user, lesson):
+        other = baker.make(User)
+
+        replies = self.ask_together(lesson, [(student_user, "What is recursion?"), (other, "what is recursion")])
+
+        assert len(chat_calls) == 1
+        assert replies[0]["reply"] == replies[1]["reply"] == "Recursion is a function calling itself."
+        leader, follower = StudentQuestion.objects.order_by("coalesced")
+        assert (leader.coalesced, leader.tokens_out) == (False, 8)
+        assert (follower.coalesced, follower.tokens_out) == (True, 0)
+
+    def test_questions_without_a_lesson_are_shared(self, chat_calls, student_user):
+        """The widget outside lesson pages sends no lesson; general questions still coalesce."""
+        other = baker.make(User)
+
+        replies = self.ask_together(None, [(student_user, "What is recursion?"), (other, "What is recursion?")])
+
+        assert len(chat_calls) == 1
+        assert "Not included" in chat_calls[0][0]["content"]
+        assert replies[0]["reply"] == replies[1]["reply"]
+        assert StudentQuestion.objects.filter(coalesced=True, lesson__isnull=True).count() == 1
+
+    def test_personal_questions_are_not_shared_between_students(self, chat_calls, student_user, lesson):
+        other = baker.make(User)
+
+        self.ask_together(lesson, [(student_user, "What is my grade?"), (other, "What is my grade?")])
+
+        assert len(chat_calls) == 2
+        assert not StudentQuestion.objects.filter(coalesced=True).exists()
+
+    def test_stats(self, chat_calls, student_user, lesson):
+        self.ask_together(lesson, [(student_user, "What is recursion?")] * 3)
+
+        assert single_flight.get_stats() == {"questions": 3, "coalesced": 2, "coalesced_rate": pytest.approx(2 / 3)}
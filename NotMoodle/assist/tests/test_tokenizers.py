@@ -0,0 +1,65 @@
+"""
+Tests for pluggable token counting (assist.tokenizers).
+"""
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from assist.tokenizers import HeuristicTokenizer, count_tokens, get_tokenizer
+
+
+class _WordTokenizer:
+    def __init__(self, scale=1):
+        self.scale = scale
+
+    def count(self, text):
+        return len(text.split()) * self.scale
+
+
+@pytest.mark.unit
+class TestHeuristicTokenizer:
+    """Test the dependency-free default tokenizer."""
+
+    def test_common_words_are_one_token(self):
+        """Short words (with their leading space) cost one token each."""
+        assert HeuristicTokenizer().count("the cat sat on the mat") == 6
+
+    def test_long_words_and_numbers_cost_more(self):
+        """Long words are split and numbers go in groups of three digits."""
+        tokenizer = HeuristicTokenizer()
+
+        assert tokenizer.count("internationalization") == 4  # 20 chars / 6
+        assert tokenizer.count("1234567") == 3
+
+    def test_punctuation_and_empty_text(self):
+        """Punctuation runs are counted; empty text is free."""
+        assert HeuristicTokenizer().count("Hi!") == 2
+        assert count_tokens("") == 0
+
+
+@pytest.mark.unit
+class TestConfiguredTokenizer:
+    """Test selecting the tokenizer through settings."""
+
+    def test_default_is_heuristic(self):
+        """Without configuration the heuristic tokenizer is used."""
+        assert isinstance(get_tokenizer(), HeuristicTokenizer)
+
+    def test_custom_tokenizer_and_options(self, settings):
+        """AI_TOKENIZER and AI_TOKENIZER_OPTIONS pick the class and its arguments."""
+        settings.AI_TOKENIZER = "assist.tests.test_tokenizers._WordTokenizer"
+        settings.AI_TOKENIZER_OPTIONS = {"scale": 3}
+
+        assert count_tokens("one two") == 6
+
+    def test_missing_optional_package(self, settings):
+        """Tokenizers needing an uninstalled package say so clearly."""
+        try:
+            import tiktoken  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            pytest.skip("tiktoken is installed")
+        settings.AI_TOKENIZER = "assist.tokenizers.TiktokenTokenizer"
+
+        with pytest.raises(ImproperlyConfigured):
+            count_tokens("hello")
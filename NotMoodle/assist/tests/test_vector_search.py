@@ -0,0 +1,89 @@
+"""
+Tests for ANN search tuning (assist.vector_search).
+"""
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db.utils import ConnectionHandler
+from assist.models import DocumentChunk
+from assist.vector_search import ann_session, ann_settings, quantization, rerank_candidates
+
+
+@pytest.mark.unit
+class TestAnnSettings:
+    """Test the per-query search parameters."""
+
+    def test_defaults_come_from_settings(self, settings):
+        """ef_search and probes default to the configured values."""
+        settings.AI_HNSW_EF_SEARCH = 64
+        settings.AI_IVFFLAT_PROBES = 7
+        settings.AI_VECTOR_ITERATIVE_SCAN = ""
+
+        assert ann_settings() == {"hnsw.ef_search": 64, "ivfflat.probes": 7}
+
+    def test_overrides_and_iterative_scan(self, settings):
+        """Explicit values win; iterative scan is only set when configured."""
+        settings.AI_VECTOR_ITERATIVE_SCAN = "relaxed_order"
+
+        values = ann_settings(ef_search=200, probes=3)
+
+        assert values["hnsw.ef_search"] == 200
+        assert values["ivfflat.probes"] == 3
+        assert values["hnsw.iterative_scan"] == "relaxed_order"
+
+    def test_quantized_search_widens_ef_search(self, settings):
+        """HNSW must return every re-rank candidate, so ef_search is raised to match."""
+        settings.AI_HNSW_EF_SEARCH = 40
+        settings.AI_VECTOR_QUANTIZATION = "binary"
+        settings.AI_VECTOR_RERANK_CANDIDATES = 100
+
+        assert ann_settings()["hnsw.ef_search"] == 100
+        assert ann_settings(ef_search=20)["hnsw.ef_search"] == 20
+
+    @pytest.mark.django_db
+    def test_session_is_noop_without_postgres(self, django_assert_num_queries):
+        """On SQLite no SET statements are issued."""
+        with django_assert_num_queries(0):
+            with ann_session(ef_search=100):
+                pass
+
+
+def pg_sql(queryset):
+    pg = ConnectionHandler({"default": {"ENGINE": "django.db.backends.postgresql", "NAME": "x"}})["default"]
+    return queryset.query.get_compiler(connection=pg).as_sql()[0]
+
+
+@pytest.mark.django_db
+class TestQuantizedSearch:
+    """Test candidate search on a quantized index with full-precision re-rank."""
+
+    def test_unknown_quantization(self, settings):
+        settings.AI_VECTOR_QUANTIZATION = "int4"
+
+        with pytest.raises(ImproperlyConfigured):
+            quantization()
+
+    def test_full_precision_is_unchanged(self, settings):
+        settings.AI_VECTOR_QUANTIZATION = "none"
+        queryset = DocumentChunk.objects.all()
+
+        assert rerank_candidates(queryset, [0.1] * 768, 5) is queryset
+
+    def test_halfvec_candidates(self, settings):
+        """Candidates are ordered by the halfvec expression the index was built on."""
+        settings.AI_VECTOR_QUANTIZATION = "halfvec"
+        settings.AI_VECTOR_RERANK_CANDIDATES = 40
+
+        sql = pg_sql(rerank_candidates(DocumentChunk.objects.filter(lesson_id=1), [0.1] * 768, 5))
+
+        assert '(U0."embedding")::halfvec(768) <=>' in sql
+        assert "LIMIT 40" in sql
+
+    def test_binary_candidates(self, settings):
+        """Binary candidates use Hamming distance; the limit never drops below the caller's."""
+        settings.AI_VECTOR_QUANTIZATION = "binary"
+        settings.AI_VECTOR_RERANK_CANDIDATES = 10
+
+        sql = pg_sql(rerank_candidates(DocumentChunk.objects.all(), [0.1] * 768, 25))
+
+        assert 'binary_quantize((U0."embedding")::vector)::bit(768) <~>' in sql
+        assert "LIMIT 25" in sql
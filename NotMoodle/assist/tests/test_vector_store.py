@@ -0,0 +1,218 @@
+"""
+Tests for pluggable vector stores (assist.vector_store).
+"""
+import json
+
+import pytest
+from django.urls import reverse
+from model_bakery import baker
+
+from assist import vector_store
+from assist.indexing import index_lesson, remove_unpublished_chunks
+from assist.models import DocumentChunk
+
+
+class RecordingStore(vector_store.VectorStore):
+    """A file-backed store stand-in that records calls."""
+
+    available = True
+
+    def __init__(self, hits=()):
+        self.hits = list(hits)
+        self.calls = []
+
+    def is_available(self):
+        return self.available
+
+    def search(self, embedding, top_k, lesson_id=None, exclude_lesson_id=None):
+        self.calls.append(("search", top_k, lesson_id, exclude_lesson_id))
+        return self.hits[:top_k]
+
+    def add(self, items):
+        self.calls.append(("add", [chunk_id for chunk_id, _, _ in items]))
+
+    def delete(self, chunk_ids):
+        self.calls.append(("delete", list(chunk_ids)))
+
+
+@pytest.fixture
+def recording_store(settings):
+    settings.AI_VECTOR_STORE = "assist.tests.test_vector_store.RecordingStore"
+    return vector_store.get_store()
+
+
+@pytest.fixture
+def embedded(monkeypatch):
+    from assist import ollama
+    monkeypatch.setattr(ollama, "embed_texts", lambda texts, model=None: [[0.1] * 768 for _ in texts])
+
+
+def unit(*values):
+    """A 768-d embedding starting with `values`."""
+    return list(values) + [0.0] * (768 - len(values))
+
+
+@pytest.mark.unit
+class TestGetStore:
+    """Test store selection."""
+
+    def test_configured_class_and_options(self, settings, tmp_path):
+        settings.AI_VECTOR_STORE = "assist.vector_store.NumpyVectorStore"
+        settings.AI_VECTOR_STORE_OPTIONS = {"path": str(tmp_path), "dimensions": 3}
+
+        store = vector_store.get_store()
+
+        assert isinstance(store, vector_store.NumpyVectorStore)
+        assert store.path == tmp_path
+        assert store.dimensions == 3
+        assert vector_store.get_store() is store
+
+    def test_pgvector_needs_postgresql(self, settings):
+        settings.USING_POSTGRESQL = False
+        assert not vector_store.PgVectorStore().is_available()
+
+        settings.USING_POSTGRESQL = True
+        assert vector_store.PgVectorStore().is_available()
+
+
+@pytest.mark.django_db
+class TestIndexSync:
+    """Test that indexing mirrors chunk changes into a file-backed store."""
+
+    def test_index_lesson_adds_new_chunks(self, lesson, embedded, recording_store, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            index_lesson(lesson)
+
+        ids = sorted(DocumentChunk.objects.filter(lesson=lesson).values_list("id", flat=True))
+        assert [sorted(args) for name, args in recording_store.calls if name == "add"] == [ids]
+
+    def test_reindex_deletes_stale_chunks(self, lesson, embedded, recording_store, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            index_lesson(lesson)
+        old_ids = set(DocumentChunk.objects.filter(lesson=lesson).values_list("id", flat=True))
+        recording_store.calls.clear()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            index_lesson(lesson, force=True)
+
+        deleted = [args for name, args in recording_store.calls if name == "delete"]
+        assert set(deleted[0]) == old_ids
+
+    def test_unpublished_chunks_are_deleted(self, lesson, recording_store, django_capture_on_commit_callbacks):
+        chunk = baker.make(DocumentChunk, lesson=lesson, content="x", embedding=[0.1] * 768)
+        lesson.status = "draft"
+        lesson.save()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            remove_unpublished_chunks()
+
+        assert ("delete", [chunk.pk]) in recording_store.calls
+
+    def test_nothing_scheduled_for_pgvector(self, lesson, embedded, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            vector_store.sync_on_commit([1], [(2, lesson.pk, [0.1] * 768)])
+
+        assert callbacks == []
+
+
+@pytest.mark.django_db
+class TestViewsWithFileStore:
+    """Test views.search_chunks and the availability check against a file-backed store."""
+
+    def test_search_chunks_reads_rows_for_store_hits(self, lesson, recording_store):
+        from assist import views
+        near = baker.make(DocumentChunk, lesson=lesson, content="near", embedding=[0.1] * 768)
+        far = baker.make(DocumentChunk, lesson=lesson, content="far", embedding=[0.1] * 768)
+        recording_store.hits = [(near.pk, 0.1), (far.pk, 0.4)]
+
+        results = views.search_chunks([0.1] * 768, top_k=2)
+
+        assert [r["content"] for r in results] == ["near", "far"]
+        assert results[0]["lesson_code"] == lesson.unit_code
+
+    def test_stale_hits_are_dropped(self, lesson, recording_store):
+        from assist import views
+        kept = baker.make(DocumentChunk, lesson=lesson, content="kept", embedding=[0.1] * 768)
+        recording_store.hits = [(999999, 0.1), (kept.pk, 0.2)]
+
+        results = views.search_chunks([0.1] * 768, top_k=5)
+
+        assert [r["content"] for r in results] == ["kept"]
+        assert ("delete", [999999]) in recording_store.calls
+
+    def test_lesson_bias_filters_in_store(self, lesson, recording_store):
+        from assist import views
+
+        views.search_chunks([0.1] * 768, lesson_id=lesson.pk, top_k=4)
+
+        searches = [call for call in recording_store.calls if call[0] == "search"]
+        assert searches == [("search", 3, lesson.pk, None), ("search", 4, None, lesson.pk)]
+
+    def test_unavailable_store_returns_503(self, student_client, recording_store, monkeypatch):
+        monkeypatch.setattr(RecordingStore, "available", False)
+
+        response = student_client.post(
+            reverse("assist:ask_assistant"),
+            data=json.dumps({"message": "What is Python?"}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 503
+        assert "numpy" in json.loads(response.content)["error"]
+
+
+@pytest.mark.django_db
+class TestNumpyVectorStore:
+    """Test the memory-mapped NumPy store."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        pytest.importorskip("numpy")
+        return vector_store.NumpyVectorStore(path=tmp_path, dimensions=768, initial_capacity=4)
+
+    def test_search_orders_by_cosine_distance(self, store):
+        store.add([(1, 10, unit(1, 0)), (2, 10, unit(0, 1)), (3, 20, unit(1, 1))])
+
+        hits = store.search(unit(1, 0.1), top_k=2)
+
+        assert [chunk_id for chunk_id, _ in hits] == [1, 3]
+        assert hits[0][1] == pytest.approx(1 - 1 / (1.01 ** 0.5), abs=1e-5)
+
+    def test_lesson_filters(self, store):
+        store.add([(1, 10, unit(1, 0)), (2, 20, unit(1, 0))])
+
+        assert [i for i, _ in store.search(unit(1, 0), 5, lesson_id=20)] == [2]
+        assert [i for i, _ in store.search(unit(1, 0), 5, exclude_lesson_id=20)] == [1]
+
+    def test_add_replaces_existing_ids(self, store):
+        store.add([(1, 10, unit(1, 0))])
+        store.add([(1, 10, unit(0, 1))])
+
+        assert store.search(unit(0, 1), 5) == [(1, pytest.approx(0.0, abs=1e-6))]
+
+    def test_grows_past_capacity(self, store):
+        store.add([(i, 10, unit(1, i)) for i in range(1, 10)])
+
+        assert len(store.search(unit(1, 0), 20)) == 9
+
+    def test_delete_and_compaction(self, store):
+        store.add([(i, 10, unit(1, i)) for i in range(1, 5)])
+
+        store.delete([1, 2, 3])
+
+        assert [i for i, _ in store.search(unit(1, 0), 5)] == [4]
+        assert json.loads((store.path / "meta.json").read_text())["deleted"] == 0  # compacted
+
+    def test_other_instances_see_writes(self, store, tmp_path):
+        store.add([(1, 10, unit(1, 0))])
+        reader = vector_store.NumpyVectorStore(path=tmp_path, dimensions=768)
+        assert [i for i, _ in reader.search(unit(1, 0), 5)] == [1]
+
+        store.add([(2, 10, unit(1, 0.5))])
+
+        assert [i for i, _ in reader.search(unit(1, 0), 5)] == [1, 2]
+
+    def test_missing_files_are_rebuilt_from_chunks(self, store, lesson):
+        chunk = baker.make(DocumentChunk, lesson=lesson, content="x", embedding=unit(1, 0))
+
+        assert [i for i, _ in store.search(unit(1, 0), 5)] == [chunk.pk]
@@ -1,8 +1,10 @@
 """
 Tests for assist app views (AI Assistant API).
 """
+import asyncio
 import pytest
 import json
+from asgiref.sync import async_to_sync
 from django.urls import reverse
 from django.contrib.auth.models import User
 from freezegun import freeze_time
@@ -100,6 +102,8 @@ class TestAskAssistant:
         data = json.loads(response.content)
         assert "error" in data
         assert "limit" in data["error"].lower()
+        # The 10:00 questions leave the rolling window at 10:00 tomorrow
+        assert response["Retry-After"] == str(22 * 3600)
     
     def test_ask_assistant_success(self, student_user, student_client, settings, mock_ollama, teacher):
         """Test successful question and answer."""
@@ -175,6 +179,217 @@ class TestAskAssistant:
         assert len(data["sources"]) == 0
 
 
+def parse_sse(response):
+    """Decode a streamed text/event-stream response into (event, data) pairs."""
+    async def collect():
+        return [chunk async for chunk in response.streaming_content]
+    
+    body = b"".join(async_to_sync(collect)()).decode()
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.django_db
+class TestAskAssistantStreaming:
+    """Test the Server-Sent Events mode of ask_assistant."""
+    
+    @pytest.fixture
+    def stream_setup(self, settings, monkeypatch):
+        from assist import views
+        settings.USING_POSTGRESQL = True
+        
+        async def fake_embed(texts):
+            return [[0.1] * 768 for _ in texts]
+        
+        monkeypatch.setattr(views, "aembed_texts", fake_embed)
+        monkeypatch.setattr(views, "search_chunks", lambda *args, **kwargs: [
+            {"content": "Python is a language.", "lesson_title": "Python Basics", "lesson_code": "CS101"},
+        ])
+        return views
+    
+    def test_streams_sources_tokens_and_done(self, student_client, student_user, stream_setup, monkeypatch):
+        """Sources come first, then tokens, then usage; the question is logged at the end."""
+        async def fake_stream(messages, **kwargs):
+            for piece in ["Python ", "is ", "great."]:
+                yield piece
+        
+        monkeypatch.setattr(stream_setup, "achat_stream", fake_stream)
+        
+        response = student_client.post(
+            reverse("assist:ask_assistant"),
+            data=json.dumps({"message": "What is Python?", "stream": True}),
+            content_type="application/json",
+        )
+        
+        assert response["Content-Type"] == "text/event-stream"
+        events = parse_sse(response)
+        assert events[0] == ("sources", {"sources": [{"lesson": "CS101 - Python Basics", "excerpt": "Python is a language."}]})
+        assert [data["text"] for event, data in events if event == "token"] == ["Python ", "is ", "great."]
+        assert events[-1] == ("done", {"usage_today": 1, "cached": False, "queue_wait_ms": 0})
+        logged = StudentQuestion.objects.get(user=student_user)
+        assert logged.answer == "Python is great."
+    
+    def test_first_token_is_sent_before_the_model_finishes(self, student_client, stream_setup, monkeypatch):
+        """Events reach the client as they are produced, not once the whole answer is ready."""
+        release = asyncio.Event()
+        finished = []
+        
+        async def slow_stream(messages, **kwargs):
+            yield "First"
+            await release.wait()  # the rest of the answer only comes once the client saw the first token
+            yield " second"
+            finished.append(True)
+        
+        monkeypatch.setattr(stream_setup, "achat_stream", slow_stream)
+        response = student_client.post(
+            reverse("assist:ask_assistant"),
+            data=json.dumps({"message": "What is Python?", "stream": True}),
+            content_type="application/json",
+        )
+        
+        async def consume():
+            chunks = response.streaming_content.__aiter__()
+            first = [await asyncio.wait_for(chunks.__anext__(), 5) for _ in range(2)]
+            model_done_before_first_token = bool(finished)
+            release.set()
+            rest = [chunk async for chunk in chunks]
+            return first, model_done_before_first_token, rest
+        
+        first, model_done_before_first_token, rest = async_to_sync(consume)()
+        
+        assert first[1].startswith(b"event: token") and b"First" in first[1]
+        assert not model_done_before_first_token
+        assert rest[-1].startswith(b"event: done")
+    
+    def test_stream_error_keeps_partial_answer(self, student_client, student_user, stream_setup, monkeypatch):
+        """A failure mid-stream sends an error event and still logs what was generated."""
+        async def failing_stream(messages, **kwargs):
+            yield "Partial"
+            raise RuntimeError("model crashed")
+        
+        monkeypatch.setattr(stream_setup, "achat_stream", failing_stream)
+        
+        response = student_client.post(
+            reverse("assist:ask_assistant"),
+            data=json.dumps({"message": "What is Python?"}),
+            content_type="application/json",
+            HTTP_ACCEPT="text/event-stream",
+        )
+        
+        events = parse_sse(response)
+        assert events[-1][0] == "error"
+        assert StudentQuestion.objects.get(user=student_user).answer == "Partial"
+
+
+@pytest.mark.django_db
+class TestAskAssistantAnswerCache:
+    """Test semantic answer caching in ask_assistant."""
+    
+    @pytest.fixture
+    def cache_setup(self, settings, monkeypatch, lesson):
+        from assist import views
+        settings.USING_POSTGRESQL = True
+        calls = {"chat": [], "profile": 0}
+        
+        async def fake_embed(texts):
+            return [[0.1] * 768 for _ in texts]
+        
+        async def fake_chat(messages, **kwargs):
+            calls["chat"].append(messages)
+            return "Recursion is a function calling itself."
+        
+        def fake_profile(user):
+            calls["profile"] += 1
+            return "=== USER PROFILE ==="
+        
+        monkeypatch.setattr(views, "aembed_texts", fake_embed)
+        monkeypatch.setattr(views, "search_chunks", lambda *args, **kwargs: [])
+        monkeypatch.setattr(views, "achat", fake_chat)
+        monkeypatch.setattr(views, "get_user_profile_context", fake_profile)
+        return views, calls
+    
+    def ask(self, client, lesson, message, **extra):
+        return client.post(
+            reverse("assist:ask_assistant"),
+            data=json.dumps({"message": message, "lesson_id": lesson.id, **extra}),
+            content_type="application/json",
+        )
+    
+    def test_miss_stores_shareable_answer(self, student_client, student_user, lesson, cache_setup, monkeypatch):
+        """A general lesson question is answered without the profile and stored for reuse."""
+        views, calls = cache_setup
+        monkeypatch.setattr(views.answer_cache, "lookup", lambda embedding, lesson_id: None)
+        
+        data = json.loads(self.ask(student_client, lesson, "What is recursion?").content)
+        
+        assert data["cached"] is False
+        assert calls["profile"] == 0
+        assert "Not included" in calls["chat"][0][0]["content"]
+        logged = StudentQuestion.objects.get(user=student_user)
+        assert logged.lesson == lesson
+        assert logged.cacheable is True
+        assert logged.question_embedding is not None
+    
+    def test_partial_stream_is_not_cacheable(self, student_client, student_user, lesson, cache_setup, monkeypatch):
+        """An answer cut short mid-stream is logged but never served to other questions."""
+        views, calls = cache_setup
+        monkeypatch.setattr(views.answer_cache, "lookup", lambda embedding, lesson_id: None)
+        
+        async def failing_stream(messages, **kwargs):
+            yield "Recursion is"
+            raise RuntimeError("model crashed")
+        
+        monkeypatch.setattr(views, "achat_stream", failing_stream)
+        
+        events = parse_sse(self.ask(student_client, lesson, "What is recursion?", stream=True))
+        
+        assert events[-1][0] == "error"
+        logged = StudentQuestion.objects.get(user=student_user)
+        assert logged.answer == "Recursion is"
+        assert logged.cacheable is False
+    
+    def test_hit_skips_model(self, student_client, student_user, lesson, cache_setup, monkeypatch):
+        """A similar earlier question's answer is returned without a chat completion."""
+        views, calls = cache_setup
+        source = baker.make(StudentQuestion, user=baker.make(User), lesson=lesson, answer="Cached answer.", cacheable=True)
+        monkeypatch.setattr(views.answer_cache, "lookup", lambda embedding, lesson_id: source)
+        
+        data = json.loads(self.ask(student_client, lesson, "Explain recursion").content)
+        
+        assert data == {"reply": "Cached answer.", "sources": [], "usage_today": 1, "cached": True, "queue_wait_ms": 0}
+        assert calls["chat"] == []
+        hit = StudentQuestion.objects.get(user=student_user)
+        assert hit.from_cache is True
+        assert hit.cached_from == source
+        assert hit.cacheable is False
+    
+    def test_hit_streams_cached_answer(self, student_client, lesson, student_user, cache_setup, monkeypatch):
+        """In streaming mode a cache hit is sent as a single token."""
+        views, calls = cache_setup
+        source = baker.make(StudentQuestion, user=baker.make(User), lesson=lesson, answer="Cached answer.", cacheable=True)
+        monkeypatch.setattr(views.answer_cache, "lookup", lambda embedding, lesson_id: source)
+        
+        events = parse_sse(self.ask(student_client, lesson, "Explain recursion", stream=True))
+        
+        assert [data["text"] for event, data in events if event == "token"] == ["Cached answer."]
+        assert events[-1] == ("done", {"usage_today": 1, "cached": True, "queue_wait_ms": 0})
+    
+    def test_personal_question_bypasses_cache(self, student_client, student_user, lesson, cache_setup, monkeypatch):
+        """Personal questions use the profile and are never stored for reuse."""
+        views, calls = cache_setup
+        monkeypatch.setattr(views.answer_cache, "lookup", lambda embedding, lesson_id: pytest.fail("looked up"))
+        
+        self.ask(student_client, lesson, "What is my grade in this lesson?")
+        
+        assert calls["profile"] == 1
+        logged = StudentQuestion.objects.get(user=student_user)
+        assert logged.cacheable is False
+        assert logged.question_embedding is None
+
+
 @pytest.mark.django_db
 class TestAssistantUsage:
     """Test assistant_usage API endpoint."""
@@ -376,3 +591,22 @@ class TestRetrieveContext:
         # Results should exist
         assert isinstance(results, list)
 
+    
+    def test_retrieve_context_lesson_bias_fills_from_other_lessons(self, monkeypatch, teacher):
+        """Lesson chunks come first; other lessons fill the remaining slots."""
+        from django.db.models import F, FloatField
+        from django.db.models.functions import Cast
+        from assist import views
+        
+        # SQLite has no vector operators: rank by id so the expected order is known
+        monkeypatch.setattr(views, "embed_texts", lambda texts: [[0.1] * 768])
+        monkeypatch.setattr(views, "CosineDistance", lambda field, vector: Cast(F("id"), FloatField()))
+        lesson1 = baker.make(Lesson, unit_code="CS101", lesson_designer=teacher)
+        lesson2 = baker.make(Lesson, unit_code="CS102", lesson_designer=teacher)
+        other = [baker.make(DocumentChunk, lesson=lesson2, content=f"other {i}", embedding=[0.1] * 768) for i in range(4)]
+        own = [baker.make(DocumentChunk, lesson=lesson1, content=f"own {i}", embedding=[0.1] * 768) for i in range(4)]
+        
+        results = views.retrieve_context("Question", lesson_id=lesson1.id, top_k=5)
+        
+        assert [r["content"] for r in results] == ["own 0", "own 1", "own 2", "other 0", "other 1"]
+        assert results[0] == {"content": "own 0", "lesson_title": lesson1.title, "lesson_code": "CS101"}
@@ -0,0 +1,106 @@
+"""
+Pluggable token counting for prompt budgets and usage logging.
+
+settings.AI_TOKENIZER names the tokenizer class (a dotted path) and
+settings.AI_TOKENIZER_OPTIONS its keyword arguments. All of them work offline:
+
+- HeuristicTokenizer (default): BPE-style pre-tokenization with no dependencies;
+  an approximation, but one that follows word and number boundaries.
+- HuggingFaceTokenizer: exact counts from the chat model's own tokenizer.json
+  (needs the optional `tokenizers` package and a local file).
+- TiktokenTokenizer: exact counts for an OpenAI encoding (needs the optional
+  `tiktoken` package with its encoding cached locally).
+"""
+import math
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+class Tokenizer:
+    """Base class: subclasses implement count()."""
+
+    def count(self, text: str) -> int:
+        raise NotImplementedError
+
+
+class HeuristicTokenizer(Tokenizer):
+    """
+    Dependency-free approximation of a byte-pair tokenizer.
+
+    Splits text the way GPT/Llama pre-tokenizers do (words with their leading
+    space, digit groups of up to three, punctuation runs, whitespace), then
+    charges long words one token per `chars_per_token` characters.
+    """
+
+    _PIECES = re.compile(
+        r"'(?:s|t|re|ve|m|ll|d)\b| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+",
+        re.IGNORECASE,
+    )
+
+    def __init__(self, chars_per_token: float = 6.0):
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        total = 0
+        for piece in self._PIECES.findall(text):
+            word = piece.strip()
+            if not word:
+                total += 1
+            elif word[0].isalpha():
+                total += max(1, math.ceil(len(word) / self.chars_per_token))
+            elif word[0].isdigit():
+                total += 1
+            else:
+                total += max(1, math.ceil(len(word) / 2))
+        return total
+
+
+class HuggingFaceTokenizer(Tokenizer):
+    """Exact counts from a local tokenizer.json (e.g. the one shipped with the chat model)."""
+
+    def __init__(self, path: str):
+        try:
+            from tokenizers import Tokenizer as HFTokenizer
+        except ImportError as exc:
+            raise ImproperlyConfigured("HuggingFaceTokenizer requires the 'tokenizers' package") from exc
+        self._tokenizer = HFTokenizer.from_file(path)
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+class TiktokenTokenizer(Tokenizer):
+    """Exact counts for a tiktoken encoding; set TIKTOKEN_CACHE_DIR to use it offline."""
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        try:
+            import tiktoken
+        except ImportError as exc:
+            raise ImproperlyConfigured("TiktokenTokenizer requires the 'tiktoken' package") from exc
+        self._encoding = tiktoken.get_encoding(encoding)
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> Tokenizer:
+    """The configured tokenizer (built once per process)."""
+    path = getattr(settings, "AI_TOKENIZER", "assist.tokenizers.HeuristicTokenizer")
+    return import_string(path)(**getattr(settings, "AI_TOKENIZER_OPTIONS", {}))
+
+
+def count_tokens(text: str) -> int:
+    return get_tokenizer().count(text) if text else 0
+
+
+@receiver(setting_changed)
+def _reset_tokenizer(setting, **kwargs):
+    if setting in ("AI_TOKENIZER", "AI_TOKENIZER_OPTIONS"):
+        get_tokenizer.cache_clear()
@@ -7,4 +7,5 @@ app_name = "assist"
 urlpatterns = [
     path("api/notmoodle/ask/", views.ask_assistant, name="ask_assistant"),
     path("api/notmoodle/usage/", views.assistant_usage, name="assistant_usage"),
+    path("api/notmoodle/admission/", views.assistant_admission_stats, name="assistant_admission_stats"),
 ]
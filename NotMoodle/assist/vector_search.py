@@ -0,0 +1,114 @@
+"""
+Per-query tuning for the approximate nearest-neighbour index on DocumentChunk.embedding.
+
+The index itself is created by migration 0007 (HNSW by default, IVFFlat when
+settings.AI_VECTOR_INDEX = "ivfflat"). Recall/latency is traded off per query
+with hnsw.ef_search / ivfflat.probes, which only exist on PostgreSQL.
+
+With settings.AI_VECTOR_QUANTIZATION = "halfvec" or "binary", migration 0010
+indexes a quantized copy of the embedding instead (half-precision floats, or
+one bit per dimension) so the index is 2x / 32x smaller. Searches then take
+AI_VECTOR_RERANK_CANDIDATES nearest chunks by the quantized distance and
+re-rank them by the full-precision embedding (rerank_candidates).
+"""
+from contextlib import contextmanager
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.db.models import Func, Value
+from pgvector.django import CosineDistance, HammingDistance, VectorField
+
+QUANTIZATIONS = ("none", "halfvec", "binary")
+
+
+class HalfVec(Func):
+    """expression::halfvec(dimensions), matching the halfvec index expression."""
+
+    template = "(%(expressions)s)::halfvec(%(dimensions)s)"
+
+
+class BinaryQuantize(Func):
+    """binary_quantize(expression)::bit(dimensions), matching the binary index expression."""
+
+    template = "binary_quantize((%(expressions)s)::vector)::bit(%(dimensions)s)"
+
+
+def quantization() -> str:
+    """The configured embedding quantization ("none", "halfvec" or "binary")."""
+    mode = getattr(settings, "AI_VECTOR_QUANTIZATION", "none") or "none"
+    if mode not in QUANTIZATIONS:
+        raise ImproperlyConfigured(f"AI_VECTOR_QUANTIZATION must be one of {', '.join(QUANTIZATIONS)}, not {mode!r}")
+    return mode
+
+
+def quantized_distance(question_embedding: List[float], mode: Optional[str] = None, dimensions: int = 768):
+    """The distance expression the quantized index orders by."""
+    mode = mode or quantization()
+    vector = Value(VectorField().get_prep_value(question_embedding))
+    if mode == "halfvec":
+        return CosineDistance(HalfVec("embedding", dimensions=dimensions), HalfVec(vector, dimensions=dimensions))
+    if mode == "binary":
+        return HammingDistance(
+            BinaryQuantize("embedding", dimensions=dimensions), BinaryQuantize(vector, dimensions=dimensions)
+        )
+    raise ValueError("full-precision embeddings have no quantized distance")
+
+
+def rerank_candidates(queryset, question_embedding: List[float], limit: int, mode: Optional[str] = None):
+    """
+    Narrow `queryset` to the chunks a quantized index ranks nearest.
+    
+    The caller orders the result by full-precision distance, so only the
+    candidate set (at least AI_VECTOR_RERANK_CANDIDATES, and never fewer than
+    `limit`) is compared against the float32 embeddings. Unchanged without
+    quantization.
+    """
+    mode = mode or quantization()
+    if mode == "none":
+        return queryset
+    candidates = max(limit, getattr(settings, "AI_VECTOR_RERANK_CANDIDATES", 40))
+    nearest = queryset.order_by(quantized_distance(question_embedding, mode)).values("id")[:candidates]
+    return queryset.filter(id__in=nearest)
+
+
+def ann_settings(ef_search: Optional[int] = None, probes: Optional[int] = None) -> dict:
+    """The GUCs to apply for one query, with settings as defaults."""
+    if ef_search is None:
+        ef_search = getattr(settings, "AI_HNSW_EF_SEARCH", 40)
+        if quantization() != "none":
+            # HNSW returns at most ef_search rows, and the re-rank needs all the candidates
+            ef_search = max(ef_search, getattr(settings, "AI_VECTOR_RERANK_CANDIDATES", 40))
+    values = {
+        "hnsw.ef_search": ef_search,
+        "ivfflat.probes": probes or getattr(settings, "AI_IVFFLAT_PROBES", 10),
+    }
+    # pgvector >= 0.8: keep scanning until filtered queries (e.g. one lesson) fill their LIMIT
+    iterative_scan = getattr(settings, "AI_VECTOR_ITERATIVE_SCAN", "")
+    if iterative_scan:
+        values["hnsw.iterative_scan"] = iterative_scan
+        values["ivfflat.iterative_scan"] = iterative_scan
+    return values
+
+
+@contextmanager
+def ann_session(ef_search: Optional[int] = None, probes: Optional[int] = None, exact: bool = False):
+    """
+    Run the enclosed vector queries with the configured ANN search parameters.
+    
+    Opens a transaction so the SET LOCALs apply to these queries only. With
+    `exact=True` index scans are disabled, forcing an exact (sequential) search;
+    the benchmark uses this as ground truth. A no-op outside PostgreSQL.
+    """
+    if connection.vendor != "postgresql":
+        yield
+        return
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for name, value in ann_settings(ef_search, probes).items():
+                cursor.execute("SELECT set_config(%s, %s, true)", [name, str(value)])
+            if exact:
+                cursor.execute("SET LOCAL enable_indexscan = off")
+        yield
@@ -0,0 +1,329 @@
+"""
+Pluggable vector stores for chunk retrieval.
+
+settings.AI_VECTOR_STORE names the backend (a dotted path) and
+settings.AI_VECTOR_STORE_OPTIONS its keyword arguments:
+
+- PgVectorStore: DocumentChunk.embedding searched inside PostgreSQL with
+  pgvector's ANN index (views.search_chunks builds that query itself).
+- NumpyVectorStore: a float32 matrix of unit-length embeddings in a
+  memory-mapped .npy file, searched with one matrix-vector product. It lets
+  SQLite deployments run the assistant. It needs the optional `numpy` package.
+
+DocumentChunk rows stay the source of truth. index_lesson and
+remove_unpublished_chunks push their adds and deletes to a file-backed store
+after commit. A missing store file is rebuilt from the table on first use, and
+ids the table no longer has are dropped when a search returns them.
+"""
+import importlib.util
+import json
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+
+# (chunk id, cosine distance), nearest first
+Hits = List[Tuple[int, float]]
+# (chunk id, lesson id, embedding)
+Item = Tuple[int, int, Sequence[float]]
+
+
+class VectorStore:
+    """Base class for chunk embedding indexes."""
+
+    # Searched by SQL over DocumentChunk (nothing to keep in sync)
+    in_database = False
+
+    def is_available(self) -> bool:
+        raise NotImplementedError
+
+    def search(self, embedding: Sequence[float], top_k: int, lesson_id: Optional[int] = None,
+               exclude_lesson_id: Optional[int] = None) -> Hits:
+        raise NotImplementedError
+
+    def add(self, items: Iterable[Item]) -> None:
+        """Insert or replace chunk embeddings."""
+
+    def delete(self, chunk_ids: Iterable[int]) -> None:
+        """Forget chunks (unknown ids are ignored)."""
+
+    def rebuild(self) -> int:
+        """Reload every chunk from DocumentChunk; returns the number stored."""
+        return 0
+
+
+class PgVectorStore(VectorStore):
+    """Embeddings in the DocumentChunk table, searched with pgvector."""
+
+    in_database = True
+
+    def is_available(self) -> bool:
+        return settings.USING_POSTGRESQL
+
+    def search(self, embedding, top_k, lesson_id=None, exclude_lesson_id=None):
+        from pgvector.django import CosineDistance
+
+        from .models import DocumentChunk
+        from .vector_search import ann_session, rerank_candidates
+
+        queryset = DocumentChunk.objects.all()
+        if lesson_id:
+            queryset = queryset.filter(lesson_id=lesson_id)
+        if exclude_lesson_id:
+            queryset = queryset.exclude(lesson_id=exclude_lesson_id)
+        with ann_session():
+            return list(
+                rerank_candidates(queryset, embedding, top_k).annotate(distance=CosineDistance("embedding", embedding))
+                .order_by("distance").values_list("id", "distance")[:top_k]
+            )
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Embeddings in memory-mapped files under `path`.
+
+    vectors-<generation>.npy holds a float32 [capacity, dimensions] matrix of
+    normalized embeddings and rows-<generation>.npy the matching (chunk id,
+    lesson id) pairs, id 0 marking a free or deleted row. meta.json records the
+    current generation and how many rows are in use.
+    Writers fill rows in place and then replace meta.json; readers reload when
+    meta.json changes, so worker processes pick up a re-index without restarting.
+    Running out of room, or having more deleted rows than live ones, rewrites the
+    files under a new generation.
+    """
+
+    def __init__(self, path: Optional[str] = None, dimensions: int = 768, initial_capacity: int = 1024):
+        self.path = Path(path or getattr(settings, "AI_VECTOR_STORE_PATH", settings.BASE_DIR / "vector_store"))
+        self.dimensions = dimensions
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._meta = None
+        self._meta_mtime = None
+        self._vectors = None
+        self._rows = None
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("numpy") is not None
+
+    # --- files -------------------------------------------------------------
+
+    def _file(self, name: str) -> Path:
+        return self.path / name
+
+    @contextmanager
+    def _writing(self):
+        """Serialize writers across threads and (where flock exists) processes."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self._file("lock"), "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh(create=False)
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_meta(self, meta: dict) -> None:
+        tmp = self._file("meta.json.tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self._file("meta.json"))
+
+    def _open(self, meta: dict) -> None:
+        import numpy as np
+
+        self._vectors = np.load(self._file(f"vectors-{meta['generation']}.npy"), mmap_mode="r+")
+        self._rows = np.load(self._file(f"rows-{meta['generation']}.npy"), mmap_mode="r+")
+
+    def _refresh(self, create: bool = True) -> bool:
+        """Reopen the files if another process changed them; build them if missing."""
+        try:
+            mtime = self._file("meta.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            if create:
+                self.rebuild()
+                return True
+            self._meta = self._vectors = self._rows = None
+            return False
+        if mtime != self._meta_mtime:
+            meta = json.loads(self._file("meta.json").read_text())
+            if self._meta is None or meta["generation"] != self._meta["generation"]:
+                self._open(meta)
+            self._meta, self._meta_mtime = meta, mtime
+        return True
+
+    def _write_generation(self, items: List[Item], capacity: int) -> None:
+        """Write a fresh pair of files holding exactly `items` and switch to them."""
+        import numpy as np
+
+        generation = (self._meta["generation"] + 1) if self._meta else 1
+        vectors = np.lib.format.open_memmap(
+            self._file(f"vectors-{generation}.npy"), mode="w+", dtype=np.float32, shape=(capacity, self.dimensions)
+        )
+        rows = np.lib.format.open_memmap(
+            self._file(f"rows-{generation}.npy"), mode="w+", dtype=np.int64, shape=(capacity, 2)
+        )
+        if items:
+            rows[:len(items)] = [(chunk_id, lesson_id) for chunk_id, lesson_id, _ in items]
+            vectors[:len(items)] = _normalize(np.asarray([embedding for _, _, embedding in items], dtype=np.float32))
+        vectors.flush()
+        rows.flush()
+        del vectors, rows
+
+        old = self._meta
+        self._write_meta({"generation": generation, "count": len(items), "deleted": 0, "dimensions": self.dimensions})
+        self._meta_mtime = None
+        self._meta = None
+        self._refresh(create=False)
+        if old is not None:
+            # Processes that still map the old files keep them until they reload (POSIX unlink semantics)
+            for name in (f"vectors-{old['generation']}.npy", f"rows-{old['generation']}.npy"):
+                try:
+                    self._file(name).unlink(missing_ok=True)
+                except OSError:  # still mapped on Windows; removed by a later generation switch
+                    pass
+
+    def _live_items(self) -> List[Item]:
+        count = self._meta["count"]
+        rows, vectors = self._rows[:count], self._vectors[:count]
+        return [
+            (int(chunk_id), int(lesson_id), vectors[i])
+            for i, (chunk_id, lesson_id) in enumerate(rows) if chunk_id
+        ]
+
+    # --- API ---------------------------------------------------------------
+
+    def rebuild(self) -> int:
+        from .models import DocumentChunk
+
+        items = [
+            (chunk_id, lesson_id, list(embedding))
+            for chunk_id, lesson_id, embedding in DocumentChunk.objects.values_list("id", "lesson_id", "embedding")
+        ]
+        with self._writing():
+            self._write_generation(items, max(self.initial_capacity, 2 * len(items)))
+        return len(items)
+
+    def add(self, items: Iterable[Item]) -> None:
+        import numpy as np
+
+        items = list(items)
+        if not items:
+            return
+        with self._writing():
+            if self._meta is None:
+                self._write_generation([], max(self.initial_capacity, 2 * len(items)))
+            count = self._meta["count"]
+            positions = {int(chunk_id): i for i, chunk_id in enumerate(self._rows[:count, 0]) if chunk_id}
+            new = [item for item in items if item[0] not in positions]
+            if count + len(new) > len(self._rows):
+                replaced = {item[0] for item in items}
+                merged = [item for item in self._live_items() if item[0] not in replaced] + items
+                self._write_generation(merged, max(self.initial_capacity, 2 * len(merged)))
+                return
+            for chunk_id, lesson_id, embedding in items:
+                row = positions.get(chunk_id)
+                if row is None:
+                    row, count = count, count + 1
+                self._rows[row] = (chunk_id, lesson_id)
+                self._vectors[row] = _normalize(np.asarray(embedding, dtype=np.float32))
+            self._vectors.flush()
+            self._rows.flush()
+            self._write_meta({**self._meta, "count": count})
+
+    def delete(self, chunk_ids: Iterable[int]) -> None:
+        import numpy as np
+
+        chunk_ids = np.fromiter(chunk_ids, dtype=np.int64)
+        if not len(chunk_ids):
+            return
+        with self._writing():
+            if self._meta is None:
+                return
+            count = self._meta["count"]
+            hits = np.isin(self._rows[:count, 0], chunk_ids)
+            removed = int(hits.sum())
+            if not removed:
+                return
+            self._rows[:count, 0][hits] = 0
+            self._rows.flush()
+            deleted = self._meta.get("deleted", 0) + removed
+            if deleted * 2 > count:
+                live = self._live_items()
+                self._write_generation(live, max(self.initial_capacity, 2 * len(live)))
+            else:
+                self._write_meta({**self._meta, "deleted": deleted})
+
+    def search(self, embedding, top_k, lesson_id=None, exclude_lesson_id=None):
+        import numpy as np
+
+        with self._lock:
+            self._refresh()
+            count = self._meta["count"] if self._meta else 0
+            if not count or top_k <= 0:
+                return []
+            rows = self._rows[:count]
+            scores = self._vectors[:count] @ _normalize(np.asarray(embedding, dtype=np.float32))
+
+        mask = rows[:, 0] != 0
+        if lesson_id:
+            mask &= rows[:, 1] == lesson_id
+        if exclude_lesson_id:
+            mask &= rows[:, 1] != exclude_lesson_id
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+        k = min(top_k, len(candidates))
+        best = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(rows[i, 0]), float(1.0 - scores[i])) for i in best]
+
+
+def _normalize(vectors):
+    import numpy as np
+
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+@lru_cache(maxsize=1)
+def get_store() -> VectorStore:
+    """The configured vector store (one per process)."""
+    path = getattr(settings, "AI_VECTOR_STORE", "assist.vector_store.PgVectorStore")
+    return import_string(path)(**getattr(settings, "AI_VECTOR_STORE_OPTIONS", {}))
+
+
+def sync_on_commit(deleted_ids: Iterable[int] = (), added: Iterable[Item] = ()) -> None:
+    """Mirror chunk deletes and inserts into a file-backed store once the transaction commits."""
+    store = get_store()
+    if store.in_database or not store.is_available():
+        return
+    deleted_ids, added = list(deleted_ids), list(added)
+    if not deleted_ids and not added:
+        return
+
+    def apply():
+        store.delete(deleted_ids)
+        store.add(added)
+
+    transaction.on_commit(apply)
+
+
+@receiver(setting_changed)
+def _reset_store(setting, **kwargs):
+    if setting in ("AI_VECTOR_STORE", "AI_VECTOR_STORE_OPTIONS", "AI_VECTOR_STORE_PATH"):
+        get_store.cache_clear()
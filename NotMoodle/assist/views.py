@@ -1,196 +1,30 @@
 """Views for NotMoodle AI Assistant API."""
 import json
+import time
 from typing import Dict, List, Optional
-from datetime import date, datetime
+from datetime import datetime
 from decimal import Decimal
 
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
+from django.contrib.auth import get_user
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.conf import settings
-from django.db.models import Q
-from django.utils import timezone
+from django.db import connection, transaction
+from django.db.models import BooleanField, Q, Value
 from pgvector.django import CosineDistance
 
 from .models import DocumentChunk, StudentQuestion
-from .ollama import embed_texts, chat, estimate_tokens
-from student_management.models import Student, ManageCreditPoint
-from course_management.models import Enrollment
-from lesson_management.models import LessonEnrollment, Assignment, ReadingListProgress, VideoProgress
-from classroom_and_grading.models import AssignmentGrade, ClassroomStudent
-
-
-def get_user_profile_context(user) -> str:
-    """
-    Generate personalized context about the logged-in user.
-    
-    Includes:
-    - User profile information
-    - Enrolled courses
-    - Enrolled lessons with progress
-    - Grades and assignments
-    - Upcoming assignments
-    - Credits
-    
-    Args:
-        user: Django User object
-    
-    Returns:
-        Formatted string with user profile information
-    """
-    context_parts = []
-    
-    # Basic user information
-    context_parts.append(f"=== USER PROFILE ===")
-    context_parts.append(f"Username: {user.username}")
-    context_parts.append(f"Full Name: {user.get_full_name() or 'Not specified'}")
-    context_parts.append(f"Email: {user.email}")
-    
-    # Try to get student profile
-    try:
-        student = Student.objects.get(user=user)
-        context_parts.append(f"Student Name: {student.full_name()}")
-        context_parts.append(f"Enrollment Number: {student.enrollment_number}")
-        context_parts.append(f"Date of Birth: {student.date_of_birth}")
-        context_parts.append(f"Year of Study: {student.year_of_study or 'Not specified'}")
-        context_parts.append(f"GPA: {student.gpa or 'Not yet calculated'}")
-        context_parts.append(f"Status: {student.get_status_display()}")
-        
-        # Get credits
-        try:
-            credit = ManageCreditPoint.objects.get(student=student)
-            context_parts.append(f"Total Credits: {credit.credits}")
-        except ManageCreditPoint.DoesNotExist:
-            context_parts.append(f"Total Credits: 0")
-        
-        # Enrolled courses
-        context_parts.append(f"\n=== ENROLLED COURSES ===")
-        enrollments = Enrollment.objects.filter(student=student).select_related('course')
-        if enrollments.exists():
-            for enrollment in enrollments:
-                course = enrollment.course
-                context_parts.append(f"- {course.code}: {course.name}")
-                context_parts.append(f"  Status: {course.get_status_display()}")
-                context_parts.append(f"  Credits Required: {course.total_credits_required}")
-                context_parts.append(f"  Enrolled on: {enrollment.enrolled_at.strftime('%Y-%m-%d')}")
-                context_parts.append(f"  Enrolled by: {enrollment.get_enrolled_by_display()}")
-        else:
-            context_parts.append("No courses enrolled yet.")
-        
-        # Enrolled lessons with progress
-        context_parts.append(f"\n=== ENROLLED LESSONS ===")
-        lesson_enrollments = LessonEnrollment.objects.filter(
-            student=student
-        ).select_related('lesson', 'lesson__lesson_designer').order_by('-enrolled_at')
-        
-        if lesson_enrollments.exists():
-            for le in lesson_enrollments:
-                lesson = le.lesson
-                context_parts.append(f"\n- {lesson.unit_code}: {lesson.title}")
-                context_parts.append(f"  Description: {lesson.description[:100]}..." if len(lesson.description) > 100 else f"  Description: {lesson.description}")
-                context_parts.append(f"  Credits: {lesson.lesson_credits}")
-                context_parts.append(f"  Estimated Effort: {lesson.estimated_effort} hours/week")
-                context_parts.append(f"  Status: {lesson.get_status_display()}")
-                context_parts.append(f"  Enrolled on: {le.enrolled_at.strftime('%Y-%m-%d')}")
-                
-                # Check video progress
-                try:
-                    video_progress = VideoProgress.objects.get(student=student, lesson=lesson)
-                    context_parts.append(f"  Video: {'Watched ✓' if video_progress.watched else 'Not watched yet'}")
-                except VideoProgress.DoesNotExist:
-                    context_parts.append(f"  Video: Not watched yet")
-                
-                # Reading list progress
-                reading_list = lesson.reading_list.all()
-                if reading_list.exists():
-                    completed_readings = ReadingListProgress.objects.filter(
-                        student=student,
-                        reading__lesson=lesson,
-                        done=True
-                    ).count()
-                    total_readings = reading_list.count()
-                    context_parts.append(f"  Reading Progress: {completed_readings}/{total_readings} completed")
-                
-                # Calculate lesson grade
-                passed, percentage, details = lesson.student_passed(student)
-                if details.get('has_grades'):
-                    context_parts.append(f"  Overall Grade: {percentage:.2f}% ({'PASSED' if passed else 'NOT PASSED'})")
-                    context_parts.append(f"  Graded Assignments: {details['graded_assignments']}/{details['total_assignments']}")
-                
-        else:
-            context_parts.append("No lessons enrolled yet.")
-        
-        # Upcoming assignments
-        context_parts.append(f"\n=== UPCOMING ASSIGNMENTS ===")
-        now = timezone.now()
-        
-        # Get all lessons the student is enrolled in
-        enrolled_lesson_ids = lesson_enrollments.values_list('lesson_id', flat=True)
-        
-        # Find upcoming assignments (not yet due)
-        upcoming_assignments = Assignment.objects.filter(
-            lesson_id__in=enrolled_lesson_ids,
-            due_date__gte=now
-        ).select_related('lesson').order_by('due_date')[:10]
-        
-        if upcoming_assignments.exists():
-            for assignment in upcoming_assignments:
-                context_parts.append(f"\n- {assignment.title}")
-                context_parts.append(f"  Lesson: {assignment.lesson.unit_code} - {assignment.lesson.title}")
-                context_parts.append(f"  Release Date: {assignment.release_date.strftime('%Y-%m-%d %H:%M')}")
-                context_parts.append(f"  Due Date: {assignment.due_date.strftime('%Y-%m-%d %H:%M')}")
-                context_parts.append(f"  Total Marks: {assignment.marks}")
-                context_parts.append(f"  Weightage: {assignment.weightage}%")
-                
-                # Check if submitted
-                from lesson_management.models import AssignmentSubmission
-                try:
-                    submission = AssignmentSubmission.objects.get(assignment=assignment, student=student)
-                    context_parts.append(f"  Status: Submitted on {submission.submitted_at.strftime('%Y-%m-%d %H:%M')}")
-                except AssignmentSubmission.DoesNotExist:
-                    context_parts.append(f"  Status: Not yet submitted")
-                
-                # Check if graded
-                try:
-                    grade = AssignmentGrade.objects.get(assignment=assignment, student=student)
-                    if grade.marks_awarded is not None:
-                        percentage = (grade.marks_awarded / assignment.marks * 100) if assignment.marks > 0 else 0
-                        context_parts.append(f"  Grade: {grade.marks_awarded}/{assignment.marks} ({percentage:.1f}%)")
-                        if grade.feedback:
-                            context_parts.append(f"  Feedback: {grade.feedback[:100]}..." if len(grade.feedback) > 100 else f"  Feedback: {grade.feedback}")
-                except AssignmentGrade.DoesNotExist:
-                    context_parts.append(f"  Grade: Not yet graded")
-        else:
-            context_parts.append("No upcoming assignments.")
-        
-        # Past assignments (recently due)
-        context_parts.append(f"\n=== RECENT PAST ASSIGNMENTS ===")
-        past_assignments = Assignment.objects.filter(
-            lesson_id__in=enrolled_lesson_ids,
-            due_date__lt=now
-        ).select_related('lesson').order_by('-due_date')[:5]
-        
-        if past_assignments.exists():
-            for assignment in past_assignments:
-                context_parts.append(f"\n- {assignment.title}")
-                context_parts.append(f"  Lesson: {assignment.lesson.unit_code}")
-                context_parts.append(f"  Due Date: {assignment.due_date.strftime('%Y-%m-%d')}")
-                
-                # Check grade
-                try:
-                    grade = AssignmentGrade.objects.get(assignment=assignment, student=student)
-                    if grade.marks_awarded is not None:
-                        percentage = (grade.marks_awarded / assignment.marks * 100) if assignment.marks > 0 else 0
-                        context_parts.append(f"  Grade: {grade.marks_awarded}/{assignment.marks} ({percentage:.1f}%)")
-                except AssignmentGrade.DoesNotExist:
-                    context_parts.append(f"  Grade: Not yet graded")
-        
-    except Student.DoesNotExist:
-        context_parts.append("\nNote: No student profile found for this user.")
-        context_parts.append("User may be a teacher or administrator.")
-    
-    return "\n".join(context_parts)
+from .vector_search import ann_session, rerank_candidates
+from . import admission, answer_cache, generation, hybrid_search as lexical, rate_limit, single_flight, vector_store
+from .selectors import get_user_profile_context
+from .ollama import embed_texts, aembed_texts, achat, achat_stream
+from .prompt import build_prompt
+from .tokenizers import count_tokens
+from lesson_management.models import Lesson
 
 
 def retrieve_context(
@@ -199,7 +33,7 @@ def retrieve_context(
     top_k: int = 5
 ) -> List[Dict[str, str]]:
     """
-    Retrieve relevant document chunks for a question using vector similarity.
+    Retrieve relevant document chunks for a question (hybrid lexical + vector search).
     
     Args:
         question: User's question text
@@ -209,6 +43,12 @@ def retrieve_context(
     Returns:
         List of dicts with 'content', 'lesson_title', 'lesson_code' keys
     """
+    # Code-like questions ("CS101 week 3") can be answered by full-text search alone
+    if lexical.is_code_like(question):
+        results = lexical.lexical_search(question, lesson_id=lesson_id, limit=top_k)
+        if results:
+            return results
+    
     # Get question embedding
     try:
         embeddings = embed_texts([question])
@@ -217,72 +57,378 @@ def retrieve_context(
         print(f"Error generating question embedding: {e}")
         return []
     
-    # Build query
-    queryset = DocumentChunk.objects.select_related("lesson")
-    
-    if lesson_id:
-        # If lesson specified, get top results from that lesson
-        # plus some global results
-        lesson_chunks = list(
-            queryset.filter(lesson_id=lesson_id)
-            .annotate(distance=CosineDistance('embedding', question_embedding))
-            .order_by('distance')
-            [:max(3, top_k // 2)]
+    return hybrid_search(question, question_embedding, lesson_id=lesson_id, top_k=top_k)
+
+
+def _store_rows(store, question_embedding: List[float], limit: int, in_lesson: bool, **lesson_filter) -> List[dict]:
+    """search_chunks rows ranked by a file-backed vector store (lesson_id / exclude_lesson_id filter)."""
+    hits = store.search(question_embedding, limit, **lesson_filter)
+    found = {
+        row.pop("id"): row
+        for row in DocumentChunk.objects.filter(id__in=[chunk_id for chunk_id, _ in hits])
+        .values("id", "content", "lesson__title", "lesson__unit_code")
+    }
+    stale = [chunk_id for chunk_id, _ in hits if chunk_id not in found]
+    if stale:
+        # Deleted outside index_lesson (e.g. a lesson was removed)
+        store.delete(stale)
+    return [
+        {**found[chunk_id], "distance": distance, "in_lesson": in_lesson}
+        for chunk_id, distance in hits if chunk_id in found
+    ]
+
+
+def hybrid_search(
+    question: str,
+    question_embedding: List[float],
+    lesson_id: Optional[int] = None,
+    top_k: int = 5
+) -> List[Dict[str, str]]:
+    """
+    Vector and full-text rankings merged by reciprocal rank fusion.
+    
+    Each retriever contributes its top settings.AI_HYBRID_CANDIDATES chunks.
+    Without full-text search (SQLite, or AI_LEXICAL_SEARCH_ENABLED off) this
+    is plain vector search.
+    
+    Returns:
+        List of dicts with 'content', 'lesson_title', 'lesson_code' keys
+    """
+    if not lexical.is_available():
+        return search_chunks(question_embedding, lesson_id=lesson_id, top_k=top_k)
+    
+    candidates = max(top_k, getattr(settings, "AI_HYBRID_CANDIDATES", 20))
+    vector_rows = search_chunks(question_embedding, lesson_id=lesson_id, top_k=candidates)
+    lexical_rows = lexical.lexical_search(question, lesson_id=lesson_id, limit=candidates)
+    return lexical.reciprocal_rank_fusion([vector_rows, lexical_rows])[:top_k]
+
+
+def search_chunks(
+    question_embedding: List[float],
+    lesson_id: Optional[int] = None,
+    top_k: int = 5
+) -> List[Dict[str, str]]:
+    """
+    Nearest document chunks to an already-computed question embedding.
+    
+    Searched in PostgreSQL with pgvector, or in the configured file-backed
+    vector store (assist.vector_store) on other databases.
+    
+    Returns:
+        List of dicts with 'content', 'lesson_title', 'lesson_code' keys
+    """
+    # Only the columns the prompt needs; no model instances
+    fields = ("content", "lesson__title", "lesson__unit_code", "distance", "in_lesson")
+    store = vector_store.get_store()
+
+    def ranked(queryset, limit, in_lesson=False, **store_filter):
+        if not store.in_database:
+            return _store_rows(store, question_embedding, limit, in_lesson, **store_filter)
+        # With a quantized index, the candidates it finds are re-ranked at full precision
+        return (
+            rerank_candidates(queryset, question_embedding, limit)
+            .annotate(
+                distance=CosineDistance("embedding", question_embedding),
+                in_lesson=Value(in_lesson, output_field=BooleanField()),
+            )
+            .order_by("distance")
+            .values(*fields)[:limit]
         )
-        
-        # Get remaining from other lessons
-        remaining = top_k - len(lesson_chunks)
-        if remaining > 0:
-            global_chunks = list(
-                queryset.exclude(lesson_id=lesson_id)
-                .annotate(distance=CosineDistance('embedding', question_embedding))
-                .order_by('distance')
-                [:remaining]
+
+    # Use the ANN index with the configured ef_search/probes
+    with ann_session():
+        if lesson_id:
+            # Top results from the lesson plus the best from other lessons, fetched
+            # as one UNION ALL of two index-ordered subqueries (one round trip)
+            lesson_limit = max(3, top_k // 2)
+            lesson_part = ranked(
+                DocumentChunk.objects.filter(lesson_id=lesson_id), lesson_limit, in_lesson=True, lesson_id=lesson_id
             )
-            chunks = lesson_chunks + global_chunks
+            other_part = ranked(DocumentChunk.objects.exclude(lesson_id=lesson_id), top_k, exclude_lesson_id=lesson_id)
+            if store.in_database and connection.features.supports_slicing_ordering_in_compound:
+                rows = list(lesson_part.union(other_part, all=True))
+            else:
+                # SQLite cannot LIMIT inside a compound query
+                rows = list(lesson_part) + list(other_part)
+
+            lesson_rows = sorted((r for r in rows if r["in_lesson"]), key=lambda r: r["distance"])
+            other_rows = sorted((r for r in rows if not r["in_lesson"]), key=lambda r: r["distance"])
+            rows = lesson_rows + other_rows[:max(0, top_k - len(lesson_rows))]
         else:
-            chunks = lesson_chunks
-    else:
-        # Get top_k globally
-        chunks = list(
-            queryset
-            .annotate(distance=CosineDistance('embedding', question_embedding))
-            .order_by('distance')
-            [:top_k]
-        )
+            # Get top_k globally
+            rows = list(ranked(DocumentChunk.objects.all(), top_k))
     
     # Format results
     results = []
-    for chunk in chunks:
+    for row in rows:
         results.append({
-            "content": chunk.content,
-            "lesson_title": chunk.lesson.title,
-            "lesson_code": chunk.lesson.unit_code,
+            "content": row["content"],
+            "lesson_title": row["lesson__title"],
+            "lesson_code": row["lesson__unit_code"],
         })
     
     return results
 
 
+def format_sources(context_chunks: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Lesson label and a short excerpt for each retrieved chunk."""
+    sources = []
+    for chunk in context_chunks:
+        sources.append({
+            "lesson": f"{chunk['lesson_code']} - {chunk['lesson_title']}",
+            "excerpt": chunk["content"][:150] + "..." if len(chunk["content"]) > 150 else chunk["content"]
+        })
+    return sources
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _prepare_answer(user, message: str, lesson_id: Optional[int], shared: bool):
+    """
+    Retrieval and prompt assembly for one question.
+    
+    Returns (prompt, sources, log_fields, cached, budget): `cached` is the
+    earlier StudentQuestion whose answer can be reused, if any, and `budget`
+    the generation budget (assist.generation) the prompt was sized for.
+    `shared` (non-personal) questions are answered without the student's
+    profile, since the answer may reach others through the answer cache or a
+    coalesced flight.
+    """
+    log_fields = {"lesson_id": lesson_id}
+    
+    # Code-like questions ("CS101 week 3") are answered from full-text matches without embedding
+    context_chunks = []
+    if lexical.is_code_like(message):
+        try:
+            context_chunks = await sync_to_async(lexical.lexical_search)(message, lesson_id=lesson_id, limit=5)
+        except Exception as e:
+            print(f"Error in full-text search: {e}")
+    
+    # Otherwise embed the question once, for the answer cache and for retrieval
+    question_embedding = None
+    if not context_chunks:
+        try:
+            question_embedding = (await aembed_texts([message]))[0]
+        except Exception as e:
+            print(f"Error generating question embedding: {e}")
+    
+    # General questions about a lesson can reuse a recent answer to a similar question
+    cached = None
+    # (the cache is searched with pgvector, so file-backed stores go without it)
+    if (
+        answer_cache.is_cacheable(message, lesson_id)
+        and question_embedding is not None
+        and vector_store.get_store().in_database
+    ):
+        log_fields["question_embedding"] = question_embedding
+        try:
+            cached = await sync_to_async(answer_cache.lookup)(question_embedding, lesson_id)
+        except Exception as e:
+            print(f"Error looking up cached answer: {e}")
+        if cached is not None:
+            log_fields.update(from_cache=True, cached_from_id=cached.pk)
+        else:
+            log_fields["cacheable"] = True
+    
+    # Retrieve context
+    if question_embedding is not None:
+        try:
+            context_chunks = await sync_to_async(hybrid_search)(message, question_embedding, lesson_id=lesson_id, top_k=5)
+        except Exception as e:
+            print(f"Error retrieving context: {e}")
+    # Get personalized user context; answers that may be shared are generated without it
+    if shared:
+        user_profile_context = "=== USER PROFILE ===\nNot included: this is a general question."
+    else:
+        user_profile_context = await sync_to_async(get_user_profile_context)(user)
+    
+    # Fit profile and retrieved chunks into the token budget, leaving room in the model's
+    # context for the answer; sources are the chunks actually used
+    budget = generation.select_budget(message)
+    prompt = build_prompt(message, user_profile_context, context_chunks, budget=budget.prompt_budget())
+    return prompt, format_sources(prompt.chunks), log_fields, cached, budget
+
+
+def _answer_flight(user, message: str, lesson_id: Optional[int], stream: bool):
+    """
+    Join (or start) the single flight answering this question; see assist.single_flight.
+    
+    The flight's context is a dict with the prompt, the sources, the starting
+    request's log_fields, the cached StudentQuestion (or None), the generation
+    budget, and the model's usage, queue wait and timings, filled in once
+    generation ends. Returns (flight, started).
+    
+    The model is called through the fair-share admission queue (assist.admission),
+    so the flight fails with admission.Overloaded when no slot frees up in time.
+    """
+    # Non-personal questions share one flight across students, with or without a lesson
+    shared = not answer_cache.is_personal(message)
+    
+    async def produce(flight):
+        prompt, sources, log_fields, cached, budget = await _prepare_answer(user, message, lesson_id, shared)
+        context = {
+            "prompt": prompt, "sources": sources, "log_fields": log_fields, "cached": cached,
+            "budget": budget, "usage": {}, "queue_wait_ms": 0, "timings": {},
+        }
+        flight.set_context(context)
+        if cached is not None:
+            flight.publish(cached.answer)
+            return
+        async with admission.slot(user.pk) as ticket:
+            context["queue_wait_ms"] = ticket.wait_ms
+            messages = budget.apply(prompt.messages)
+            timings = context["timings"]
+            start = time.monotonic()
+            if stream:
+                async for piece in achat_stream(messages, usage=context["usage"], **budget.options()):
+                    timings.setdefault("first_token_ms", round((time.monotonic() - start) * 1000))
+                    flight.publish(piece)
+            else:
+                answer = await achat(messages, usage=context["usage"], **budget.options())
+                timings["first_token_ms"] = round((time.monotonic() - start) * 1000)
+                flight.publish(answer)
+            timings["generation_ms"] = round((time.monotonic() - start) * 1000)
+    
+    key = single_flight.question_key(message, lesson_id, None if shared else user.pk)
+    return single_flight.join(key, produce)
+
+
+def _log_fields(context: dict, answer: str, started: bool, lesson_id: Optional[int], completed: bool = True) -> dict:
+    """
+    StudentQuestion fields for one request, preferring the token counts reported by the server.
+    
+    Answers that did not complete (a model error or client disconnect
+    mid-stream), were shortened by a busy queue or were cut off at max_tokens
+    are not offered to the answer cache.
+    """
+    if not started:
+        # The tokens were spent (and the answer cached) by the request that started the flight
+        return {"lesson_id": lesson_id, "coalesced": True}
+    fields = dict(context["log_fields"])
+    if context["cached"] is None:
+        usage = context["usage"]
+        fields["tokens_in"] = usage.get("prompt_tokens") or context["prompt"].tokens
+        fields["tokens_out"] = usage.get("completion_tokens") or count_tokens(answer)
+        fields["queue_wait_ms"] = context["queue_wait_ms"]
+        budget = context["budget"]
+        fields.update(
+            budget=budget.name,
+            max_tokens=budget.max_tokens,
+            truncated=usage.get("finish_reason") == "length",
+            first_token_ms=context["timings"].get("first_token_ms"),
+            generation_ms=context["timings"].get("generation_ms"),
+        )
+        if budget.name == "brief" or fields["truncated"]:
+            fields["cacheable"] = False
+    if not completed:
+        fields["cacheable"] = False
+    return fields
+
+
+def _overloaded(error: admission.Overloaded) -> JsonResponse:
+    """503 telling the client when the model's queue is likely to have room again."""
+    response = JsonResponse(
+        {
+            "error": "The AI Assistant is busy right now. Please try again shortly.",
+            "retry_after": error.retry_after,
+        },
+        status=503
+    )
+    response["Retry-After"] = str(error.retry_after)
+    return response
+
+
+async def _stream_answer(user, message: str, lesson_id: Optional[int], questions_today: int):
+    """
+    Relay the model's tokens as Server-Sent Events.
+    
+    Events: `sources` first, then one `token` per piece of text, then `done`
+    with usage (or `error`). The question is logged once generation ends,
+    including partial answers cut short by an error or a client disconnect.
+    A cached answer is sent as a single token instead of calling the model.
+    
+    The flight is joined here rather than in the view so that it belongs to
+    the event loop that consumes the stream. Events only reach the client as
+    they are produced under ASGI (NotMoodle.asgi); WSGI collects them first.
+    """
+    flight, started = _answer_flight(user, message, lesson_id, stream=True)
+    try:
+        context = await flight.context()
+    except Exception as e:
+        print(f"Error preparing chat response: {e}")
+        yield _sse("error", {"error": "Failed to generate response. Please try again."})
+        return
+    yield _sse("sources", {"sources": context["sources"]})
+    
+    parts = []
+    completed = False
+    try:
+        async for piece in flight.pieces():
+            parts.append(piece)
+            yield _sse("token", {"text": piece})
+        completed = True
+    except admission.Overloaded as e:
+        yield _sse("error", {"error": "The AI Assistant is busy right now. Please try again shortly.", "retry_after": e.retry_after})
+    except Exception as e:
+        print(f"Error streaming chat response: {e}")
+        yield _sse("error", {"error": "Failed to generate response. Please try again."})
+    finally:
+        answer = "".join(parts)
+        if answer:
+            await StudentQuestion.objects.acreate(
+                user=user, question=message, answer=answer, **_log_fields(context, answer, started, lesson_id, completed)
+            )
+    
+    if completed:
+        yield _sse("done", {
+            "usage_today": questions_today + (1 if parts else 0),
+            "cached": context["cached"] is not None,
+            "queue_wait_ms": context["queue_wait_ms"],
+        })
+
+
+@transaction.non_atomic_requests  # ATOMIC_REQUESTS cannot wrap async views
 @csrf_exempt
 @require_POST
-@login_required
-def ask_assistant(request):
+async def ask_assistant(request):
     """
     Chat endpoint for NotMoodle AI Assistant.
     
     POST /api/notmoodle/ask/
     Body: {"message": "...", "lesson_id": optional int}
     
+    With "stream": true in the body (or Accept: text/event-stream) the reply is
+    streamed as Server-Sent Events instead; see _stream_answer.
+    
+    The view is async: under ASGI the embedding and chat calls await
+    httpx.AsyncClient and no worker thread is held while the model responds.
+    
+    General questions about a lesson may be answered from the semantic answer
+    cache (assist.answer_cache); "cached" in the reply says whether they were.
+    
+    Model calls wait their turn in a fair-share queue (assist.admission);
+    "queue_wait_ms" reports how long. When the queue is full the request is
+    refused with 503 and Retry-After instead of waiting.
+    
     Returns:
-        JSON: {"reply": "...", "sources": [...], "usage_today": int}
+        JSON: {"reply": "...", "sources": [...], "usage_today": int, "cached": bool, "queue_wait_ms": int}
         Or error: {"error": "..."}
     """
-    # Check if PostgreSQL is available (required for pgvector)
-    if not settings.USING_POSTGRESQL:
+    # Resolve the user in the ORM thread rather than with login_required/request.auser():
+    # the social-auth backend sessions are created with has no aget_user()
+    user = await sync_to_async(get_user)(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    
+    # Retrieval needs PostgreSQL with pgvector, or NumPy for the file-backed vector store
+    if not vector_store.get_store().is_available():
         return JsonResponse(
             {
                 "error": "AI Assistant requires PostgreSQL with pgvector extension. "
-                        "Currently using SQLite. Please set up PostgreSQL to enable this feature. "
+                        "Currently using SQLite. Please set up PostgreSQL (or install numpy and set "
+                        "AI_VECTOR_STORE to assist.vector_store.NumpyVectorStore) to enable this feature. "
                         "See AI_ASSISTANT_GUIDE.md for setup instructions."
             },
             status=503
@@ -299,79 +445,46 @@ def ask_assistant(request):
     
     lesson_id = data.get("lesson_id")
     
-    # Check rate limit
-    today = date.today()
-    questions_today = StudentQuestion.objects.filter(
-        user=request.user,
-        created_at__date=today
-    ).count()
+    # Check rate limit (rolling 24 hours, counted in the cache)
+    quota = await sync_to_async(rate_limit.get_usage)(user.pk)
+    questions_today = quota.count
     
-    if questions_today >= settings.AI_DAILY_QUESTION_LIMIT:
-        return JsonResponse(
+    if quota.exceeded:
+        response = JsonResponse(
             {
-                "error": f"Daily question limit reached ({settings.AI_DAILY_QUESTION_LIMIT}). Please try again tomorrow."
+                "error": f"Daily question limit reached ({quota.limit}). Please try again later.",
+                "retry_after": quota.retry_after,
             },
             status=429
         )
+        response["Retry-After"] = str(quota.retry_after)
+        return response
     
-    # Retrieve context
+    if lesson_id and not (str(lesson_id).isdigit() and await Lesson.objects.filter(pk=lesson_id).aexists()):
+        lesson_id = None
+    
+    # Shed load before any retrieval work when the model's queue is full
     try:
-        context_chunks = retrieve_context(message, lesson_id=lesson_id, top_k=5)
-    except Exception as e:
-        print(f"Error retrieving context: {e}")
-        context_chunks = []
-    
-    # Get personalized user context
-    user_profile_context = get_user_profile_context(request.user)
-    
-    # Build context string
-    if context_chunks:
-        context_text = "\n\n".join([
-            f"[From {chunk['lesson_code']} - {chunk['lesson_title']}]\n{chunk['content']}"
-            for chunk in context_chunks
-        ])
-    else:
-        context_text = "No relevant course content found."
-    
-    # Build system prompt with personalized information
-    system_prompt = f"""You are NotMoodle AI, a helpful and knowledgeable personal tutor for students in a Learning Management System.
-
-Your role:
-- Provide PERSONALIZED assistance to the logged-in student
-- Help students understand their enrolled courses and lessons
-- Answer questions based on both the student's personal information AND the course content provided below
-- Track and reference the student's progress, grades, and upcoming assignments
-- Explain concepts clearly with examples when helpful
-- Break down complex topics into digestible steps
-- Be encouraging, supportive, and patient
-
-Guidelines:
-- ALWAYS address the student by name when appropriate
-- Reference their specific enrollments, grades, and assignments when relevant
-- When asked about "my courses", "my lessons", "my grades", etc., use the student profile information below
-- If asked about enrolled lessons or courses, refer to the STUDENT PROFILE section first
-- Use both the student's personal data AND course materials to provide comprehensive answers
-- If the context contains the answer, provide it clearly and confidently
-- If the context is insufficient, acknowledge what information is available and what's missing
-- For conceptual questions, explain in a teaching style with examples
-- Keep responses focused and concise (2-4 paragraphs maximum)
-- Use markdown formatting for better readability (bold, lists, etc.)
-
-{user_profile_context}
-
-===================================
-
-Context from course materials:
-{context_text}
-"""
-    
-    # Generate response
+        admission.check(user.pk)
+    except admission.Overloaded as e:
+        return _overloaded(e)
+    
+    if data.get("stream") or "text/event-stream" in request.headers.get("Accept", ""):
+        response = StreamingHttpResponse(
+            _stream_answer(user, message, lesson_id, questions_today),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+        return response
+    
+    # Generate response (or wait for an identical question already being answered)
+    flight, started = _answer_flight(user, message, lesson_id, stream=False)
     try:
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": message}
-        ]
-        response = chat(messages)
+        context = await flight.context()
+        response = await flight.result()
+    except admission.Overloaded as e:
+        return _overloaded(e)
     except Exception as e:
         print(f"Error generating chat response: {e}")
         return JsonResponse(
@@ -379,30 +492,19 @@ Context from course materials:
             status=500
         )
     
-    # Log question
-    tokens_in = estimate_tokens(system_prompt + message)
-    tokens_out = estimate_tokens(response)
-    
-    StudentQuestion.objects.create(
-        user=request.user,
+    await StudentQuestion.objects.acreate(
+        user=user,
         question=message,
         answer=response,
-        tokens_in=tokens_in,
-        tokens_out=tokens_out,
+        **_log_fields(context, response, started, lesson_id),
     )
     
-    # Format sources
-    sources = []
-    for chunk in context_chunks:
-        sources.append({
-            "lesson": f"{chunk['lesson_code']} - {chunk['lesson_title']}",
-            "excerpt": chunk["content"][:150] + "..." if len(chunk["content"]) > 150 else chunk["content"]
-        })
-    
     return JsonResponse({
         "reply": response,
-        "sources": sources,
+        "sources": context["sources"],
         "usage_today": questions_today + 1,
+        "cached": context["cached"] is not None,
+        "queue_wait_ms": context["queue_wait_ms"],
     })
 
 
@@ -416,8 +518,8 @@ def assistant_usage(request):
     Returns:
         JSON: {"questions_today": int, "daily_limit": int, "available": bool}
     """
-    # Check if PostgreSQL is available
-    if not settings.USING_POSTGRESQL:
+    # Check if a vector store is available
+    if not vector_store.get_store().is_available():
         return JsonResponse({
             "questions_today": 0,
             "daily_limit": settings.AI_DAILY_QUESTION_LIMIT,
@@ -425,14 +527,28 @@ def assistant_usage(request):
             "message": "AI Assistant requires PostgreSQL. Currently using SQLite."
         })
     
-    today = date.today()
-    questions_today = StudentQuestion.objects.filter(
-        user=request.user,
-        created_at__date=today
-    ).count()
-    
+    # Served from the rate limiter's counters; StudentQuestion is only read after a cache loss
     return JsonResponse({
-        "questions_today": questions_today,
+        "questions_today": rate_limit.get_usage(request.user.pk).count,
         "daily_limit": settings.AI_DAILY_QUESTION_LIMIT,
         "available": True,
     })
+
+
+@login_required
+def assistant_admission_stats(request):
+    """
+    Admission queue counters for staff (assist.admission).
+    
+    GET /api/notmoodle/admission/
+    
+    The counters belong to the worker process that serves the request; shed
+    and timed-out requests from every process are also logged as warnings.
+    
+    Returns:
+        JSON: {"admitted", "queued", "shed", "timed_out", "mean_wait_seconds",
+        "max_wait_seconds", "active", "waiting", ...}
+    """
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Staff only."}, status=403)
+    return JsonResponse(admission.get_stats())
@@ -3,7 +3,7 @@ from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from student_management.models import Student
@@ -95,22 +95,25 @@ def award_credits_on_pass(sender, instance, created, **kwargs):
     """
     from student_management.models import ManageCreditPoint
     from lesson_management.models import LessonCreditAwarded
-    
-    # Only process if marks_awarded is set (not None)
-    if instance.marks_awarded is None:
-        return
+    from lesson_management.services import refresh_lesson_results
     
     # Get the lesson for this assignment
     lesson = instance.assignment.lesson
     student = instance.student
     
+    # Keep the materialized LessonResult row current (grades may also be cleared)
+    key = (student.pk, lesson.pk)
+    passed, percentage, details = refresh_lesson_results([key])[key]
+    
+    # Only process if marks_awarded is set (not None)
+    if instance.marks_awarded is None:
+        return
+    
     # Check if student has already been awarded credits for this lesson
     if LessonCreditAwarded.objects.filter(student=student, lesson=lesson).exists():
         return  # Already awarded, don't double-award
     
-    # Check if student has passed the lesson (>50%)
-    passed, percentage, details = lesson.student_passed(student)
-    
+    # Award only if the student has passed the lesson (>50%)
     if passed:
         # Award credits for this lesson (both core and elective units count)
         credit, _ = ManageCreditPoint.objects.get_or_create(student=student)
@@ -122,4 +125,15 @@ def award_credits_on_pass(sender, instance, created, **kwargs):
             student=student,
             lesson=lesson,
             credits_amount=credits_amount
-        )
\ No newline at end of file
+        )
+
+
+@receiver(post_delete, sender=AssignmentGrade)
+def drop_result_on_grade_delete(sender, instance, **kwargs):
+    """Invalidate the stored LessonResult; it is recomputed on next read."""
+    from lesson_management.models import LessonResult
+
+    LessonResult.objects.filter(
+        student_id=instance.student_id,
+        lesson__assignments=instance.assignment_id,
+    ).delete()
@@ -53,6 +53,7 @@ class Course(models.Model):
         but graduation also requires completing all core lessons for the course.
         """
         from lesson_management.models import LessonEnrollment
+        from lesson_management.services import get_stored_lesson_results_for_student
 
         # Get all required lessons for this course
         core_lesson_ids = set(
@@ -64,6 +65,7 @@ class Course(models.Model):
         all_lesson_enrollments = LessonEnrollment.objects.filter(
             student=student
         ).select_related('lesson')
+        results = get_stored_lesson_results_for_student(student.pk, [e.lesson_id for e in all_lesson_enrollments])
 
         # Initialize sets and counters
         completed_core_lessons = set()
@@ -71,7 +73,7 @@ class Course(models.Model):
         
         for enrollment in all_lesson_enrollments:
             # Check if student has passed this lesson
-            passed, _, _ = enrollment.lesson.student_passed(student)
+            passed, _, _ = results[enrollment.lesson_id]
             
             if passed:
                 # Add credits from ANY passed lesson (core, elective, or other)
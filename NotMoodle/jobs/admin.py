@@ -0,0 +1,21 @@
+from django.contrib import admin
+from .models import Job, WorkerHeartbeat
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["id", "kind", "status", "progress", "attempts", "created_by", "created_at", "finished_at"]
+    list_filter = ["status", "kind"]
+    search_fields = ["kind", "dedupe_key", "error"]
+    readonly_fields = ["created_at", "started_at", "finished_at", "heartbeat_at", "locked_by"]
+    actions = ["requeue"]
+
+    @admin.action(description="Requeue selected jobs")
+    def requeue(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(status=Job.QUEUED, attempts=0, error="", locked_by="")
+
+
+@admin.register(WorkerHeartbeat)
+class WorkerHeartbeatAdmin(admin.ModelAdmin):
+    list_display = ["worker_id", "started_at", "last_seen_at"]
+    readonly_fields = ["worker_id", "started_at", "last_seen_at"]
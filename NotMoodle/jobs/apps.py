@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "jobs"
+    verbose_name = "Background Jobs"
+
+    def ready(self):
+        # Each app registers its job handlers in a `tasks` module
+        autodiscover_modules("tasks")
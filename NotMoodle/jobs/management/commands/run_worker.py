@@ -0,0 +1,144 @@
+"""
+Run background jobs from the DB-backed queue.
+
+While it runs the worker records a heartbeat every few seconds
+(jobs.models.WorkerHeartbeat); without a live worker, request handlers that
+can do their work inline (e.g. the student report) skip the queue.
+
+Usage:
+    python manage.py run_worker [--concurrency 2] [--once] [--kind assist.index_lesson]
+"""
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from jobs.registry import registered_kinds
+from jobs.services import claim_next, record_heartbeat, remove_worker, requeue_stale, run_job
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 10  # seconds; keep well under settings.JOBS_WORKER_TIMEOUT
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs with a pool of worker threads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="Jobs to run in parallel")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is drained")
+        parser.add_argument("--kind", action="append", dest="kinds", help="Only run jobs of this kind (repeatable)")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        stop = threading.Event()
+        slots = threading.Semaphore(concurrency)
+
+        def request_stop(signum, frame):
+            self.stdout.write("Stopping after running jobs finish...")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale jobs"))
+        self.stdout.write(
+            f"Worker {worker_id} running {concurrency} threads for: {', '.join(options['kinds'] or registered_kinds())}"
+        )
+
+        def work(job):
+            try:
+                job = run_job(job)
+                style = self.style.SUCCESS if job.status == job.SUCCEEDED else self.style.WARNING
+                self.stdout.write(style(f"  Job {job.pk} {job.kind}: {job.status}"))
+            except Exception:
+                logger.exception("Worker error while running job %s", job.pk)
+            finally:
+                slots.release()
+                if concurrency > 1:
+                    # Each pool thread has its own DB connection; don't leak it between jobs
+                    connection.close()
+
+        heartbeat = threading.Thread(target=self._heartbeat, args=(worker_id, stop), daemon=True)
+        record_heartbeat(worker_id)
+        heartbeat.start()
+        try:
+            if concurrency == 1:
+                processed = self._run_serial(work, worker_id, stop, slots, options)
+            else:
+                processed = self._run_pool(work, worker_id, stop, slots, concurrency, options)
+        finally:
+            stop.set()
+            heartbeat.join()
+            remove_worker(worker_id)
+
+        self.stdout.write(self.style.SUCCESS(f"Worker stopped after {processed} jobs"))
+
+    def _heartbeat(self, worker_id, stop):
+        """Refresh the worker's heartbeat until it stops, even while a long job runs."""
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                record_heartbeat(worker_id)
+            except Exception:
+                logger.exception("Could not record worker heartbeat")
+            finally:
+                connection.close()
+
+    def _run_serial(self, work, worker_id, stop, slots, options):
+        """Run jobs one at a time in the main thread."""
+        processed = 0
+        while not stop.is_set():
+            slots.acquire()
+            close_old_connections()
+            job = claim_next(worker_id, kinds=options["kinds"])
+            if job is None:
+                slots.release()
+                if options["once"]:
+                    break
+                stop.wait(options["poll_interval"])
+                continue
+            processed += 1
+            work(job)
+        return processed
+
+    def _run_pool(self, work, worker_id, stop, slots, concurrency, options):
+        """Keep up to `concurrency` jobs running on a thread pool."""
+        processed = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while not stop.is_set():
+                slots.acquire()
+                close_old_connections()
+                job = claim_next(worker_id, kinds=options["kinds"])
+                if job is None:
+                    slots.release()
+                    if options["once"]:
+                        # Only stop once nothing is in flight; running jobs may still requeue retries
+                        if self._drained(slots, concurrency):
+                            break
+                        continue
+                    stop.wait(options["poll_interval"])
+                    continue
+                processed += 1
+                pool.submit(work, job)
+        return processed
+
+    def _drained(self, slots, concurrency):
+        """True when no job is in flight (all slots free)."""
+        taken = 0
+        while taken < concurrency and slots.acquire(timeout=0.1):
+            taken += 1
+        for _ in range(taken):
+            slots.release()
+        if taken < concurrency:
+            time.sleep(0.1)
+        return taken == concurrency
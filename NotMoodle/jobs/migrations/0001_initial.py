@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(help_text="Registered handler name", max_length=100)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                    ),
+                ),
+                ("priority", models.SmallIntegerField(default=0, help_text="Higher runs first")),
+                (
+                    "dedupe_key",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="While a job with this key is queued, enqueuing it again returns the queued job",
+                        max_length=200,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("max_attempts", models.PositiveSmallIntegerField(default=3)),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("progress", models.PositiveSmallIntegerField(default=0, help_text="Percent complete (0-100)")),
+                ("progress_message", models.CharField(blank=True, default="", max_length=255)),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("result_file", models.FileField(blank=True, upload_to="job_results/%Y/%m/")),
+                ("error", models.TextField(blank=True, default="")),
+                ("locked_by", models.CharField(blank=True, default="", max_length=100)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("heartbeat_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(fields=["status", "-priority", "run_after"], name="jobs_job_status_936e3a_idx"),
+                    models.Index(fields=["kind", "dedupe_key", "status"], name="jobs_job_kind_586813_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,108 @@
+"""Models for the DB-backed background job queue."""
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    One unit of background work, claimed and run by `manage.py run_worker`.
+    
+    `kind` names a handler registered with jobs.registry.task; `payload` holds
+    its keyword arguments. Handlers report progress and may attach a result file.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=100, help_text="Registered handler name")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    dedupe_key = models.CharField(
+        max_length=200,
+        blank=True,
+        default="",
+        help_text="While a job with this key is queued, enqueuing it again returns the queued job"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent complete (0-100)")
+    progress_message = models.CharField(max_length=255, blank=True, default="")
+    result = models.JSONField(null=True, blank=True)
+    result_file = models.FileField(upload_to="job_results/%Y/%m/", blank=True)
+    error = models.TextField(blank=True, default="")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs"
+    )
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "-priority", "run_after"]),
+            models.Index(fields=["kind", "dedupe_key", "status"]),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} {self.kind} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    def set_progress(self, progress: int, message: str = "") -> None:
+        """Record progress from inside a handler; also serves as the worker heartbeat."""
+        self.progress = max(0, min(100, int(progress)))
+        self.progress_message = message[:255]
+        self.heartbeat_at = timezone.now()
+        type(self).objects.filter(pk=self.pk).update(
+            progress=self.progress, progress_message=self.progress_message, heartbeat_at=self.heartbeat_at
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.pk,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "progress_message": self.progress_message,
+            "result": self.result,
+            "error": self.error if self.status == self.FAILED else "",
+            "has_file": bool(self.result_file),
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class WorkerHeartbeat(models.Model):
+    """
+    A running `manage.py run_worker` process, refreshed while it runs.
+    
+    Lets request handlers tell whether queued work will be picked up
+    (jobs.services.worker_alive) and fall back to doing it inline otherwise.
+    """
+    worker_id = models.CharField(max_length=100, unique=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    last_seen_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"Worker {self.worker_id} (last seen {self.last_seen_at:%Y-%m-%d %H:%M:%S})"
@@ -0,0 +1,38 @@
+"""
+Registry of job handlers.
+
+Apps register handlers in their `tasks.py` (autodiscovered by JobsConfig.ready):
+
+    from jobs.registry import task
+
+    @task("assist.index_lesson")
+    def index_lesson(job, lesson_id):
+        job.set_progress(50, "Embedding chunks")
+        return {"created": 3}
+
+The handler's return value is stored as the job's JSON `result`.
+"""
+from typing import Callable, Dict
+
+_handlers: Dict[str, Callable] = {}
+
+
+def task(kind: str):
+    """Register the decorated function as the handler for jobs of `kind`."""
+    def decorator(fn: Callable) -> Callable:
+        if kind in _handlers and _handlers[kind] is not fn:
+            raise ValueError(f"Duplicate job handler for {kind!r}")
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+
+def get_handler(kind: str) -> Callable:
+    try:
+        return _handlers[kind]
+    except KeyError:
+        raise LookupError(f"No job handler registered for {kind!r}") from None
+
+
+def registered_kinds():
+    return sorted(_handlers)
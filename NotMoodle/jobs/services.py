@@ -0,0 +1,138 @@
+"""Enqueue, claim and run background jobs."""
+import logging
+import traceback
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job, WorkerHeartbeat
+from .registry import get_handler
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(
+    kind: str,
+    payload: Optional[dict] = None,
+    *,
+    dedupe_key: str = "",
+    priority: int = 0,
+    max_attempts: int = 3,
+    created_by=None,
+    delay: Optional[timedelta] = None,
+) -> Job:
+    """
+    Queue a job for the worker and return it.
+    
+    With a `dedupe_key`, an identical job that is still queued is returned
+    instead of creating a second one. With settings.JOBS_RUN_INLINE the job
+    runs immediately in the calling process (handy without a worker running).
+    """
+    get_handler(kind)  # fail fast on typos
+    if dedupe_key:
+        existing = Job.objects.filter(kind=kind, dedupe_key=dedupe_key, status=Job.QUEUED).first()
+        if existing is not None:
+            return existing
+
+    job = Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        dedupe_key=dedupe_key,
+        priority=priority,
+        max_attempts=max_attempts,
+        created_by=created_by,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+    if getattr(settings, "JOBS_RUN_INLINE", False):
+        run_job(job)
+    return job
+
+
+def enqueue_on_commit(kind: str, payload: Optional[dict] = None, **kwargs) -> None:
+    """Enqueue once the current transaction commits (for use from signals and views)."""
+    transaction.on_commit(lambda: enqueue(kind, payload, **kwargs))
+
+
+def claim_next(worker_id: str, kinds=None) -> Optional[Job]:
+    """
+    Atomically claim the next runnable job for `worker_id`.
+    
+    The claim is a conditional UPDATE on status, so concurrent workers (threads
+    or processes, on SQLite or PostgreSQL) never run the same job twice.
+    """
+    candidates = Job.objects.filter(status=Job.QUEUED, run_after__lte=timezone.now())
+    if kinds:
+        candidates = candidates.filter(kind__in=kinds)
+    for job_id in candidates.order_by("-priority", "run_after", "id").values_list("id", flat=True)[:10]:
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker_id, started_at=now, heartbeat_at=now
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def run_job(job: Job) -> Job:
+    """
+    Run a claimed (or inline) job and record its outcome.
+    
+    Failures are retried with exponential backoff until max_attempts is reached.
+    """
+    job.attempts += 1
+    job.status = Job.RUNNING
+    job.started_at = job.started_at or timezone.now()
+    Job.objects.filter(pk=job.pk).update(attempts=job.attempts, status=job.status, started_at=job.started_at)
+
+    try:
+        result = get_handler(job.kind)(job, **job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            backoff = getattr(settings, "JOBS_RETRY_BACKOFF", 30) * (2 ** (job.attempts - 1))
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=backoff)
+            job.locked_by = ""
+            logger.warning("Job %s (%s) failed, retrying in %ss", job.pk, job.kind, backoff)
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+            logger.exception("Job %s (%s) failed permanently", job.pk, job.kind)
+        job.save(update_fields=["status", "error", "run_after", "locked_by", "finished_at"])
+        return job
+
+    job.status = Job.SUCCEEDED
+    job.result = result
+    job.progress = 100
+    job.error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "progress", "error", "finished_at", "result_file"])
+    return job
+
+
+def requeue_stale(stale_after: Optional[int] = None) -> int:
+    """Put back running jobs whose worker stopped heartbeating (e.g. it was killed)."""
+    stale_after = stale_after or getattr(settings, "JOBS_STALE_AFTER", 600)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=cutoff).update(
+        status=Job.QUEUED, locked_by=""
+    )
+
+
+def record_heartbeat(worker_id: str) -> None:
+    """Mark a worker as alive now."""
+    WorkerHeartbeat.objects.update_or_create(worker_id=worker_id, defaults={"last_seen_at": timezone.now()})
+
+
+def remove_worker(worker_id: str) -> None:
+    """Forget a worker that is shutting down."""
+    WorkerHeartbeat.objects.filter(worker_id=worker_id).delete()
+
+
+def worker_alive(within: Optional[int] = None) -> bool:
+    """Whether some run_worker process has sent a heartbeat in the last JOBS_WORKER_TIMEOUT seconds."""
+    within = within or getattr(settings, "JOBS_WORKER_TIMEOUT", 60)
+    return WorkerHeartbeat.objects.filter(last_seen_at__gte=timezone.now() - timedelta(seconds=within)).exists()
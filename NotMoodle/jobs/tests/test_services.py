@@ -0,0 +1,166 @@
+"""
+Tests for the background job queue (jobs.services and run_worker).
+"""
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from jobs import registry
+from jobs.models import Job, WorkerHeartbeat
+from jobs.services import claim_next, enqueue, record_heartbeat, run_job, worker_alive
+
+
+@pytest.fixture
+def handlers():
+    """Register throwaway handlers for the duration of a test."""
+    calls = []
+
+    def echo(job, value):
+        calls.append(value)
+        job.set_progress(50, "halfway")
+        return {"value": value}
+
+    def flaky(job):
+        calls.append("flaky")
+        if len(calls) < 2:
+            raise RuntimeError("try again")
+        return "ok"
+
+    def broken(job):
+        raise RuntimeError("always fails")
+
+    added = {"test.echo": echo, "test.flaky": flaky, "test.broken": broken}
+    registry._handlers.update(added)
+    yield calls
+    for kind in added:
+        registry._handlers.pop(kind, None)
+
+
+@pytest.mark.django_db
+class TestJobQueue:
+    """Test enqueueing, claiming and running jobs."""
+
+    def test_run_job_records_result(self, handlers):
+        """A successful handler's return value becomes the job result."""
+        job = enqueue("test.echo", {"value": 3})
+
+        job = run_job(claim_next("w1"))
+
+        assert job.status == Job.SUCCEEDED
+        assert job.result == {"value": 3}
+        assert job.progress == 100
+        assert handlers == [3]
+
+    def test_dedupe_key_returns_queued_job(self, handlers):
+        """Enqueuing the same key twice while queued creates one job."""
+        first = enqueue("test.echo", {"value": 1}, dedupe_key="same")
+        second = enqueue("test.echo", {"value": 1}, dedupe_key="same")
+
+        assert first.pk == second.pk
+        assert Job.objects.count() == 1
+
+    def test_claim_is_exclusive(self, handlers):
+        """A claimed job cannot be claimed by another worker."""
+        enqueue("test.echo", {"value": 1})
+
+        assert claim_next("w1") is not None
+        assert claim_next("w2") is None
+
+    def test_failures_are_retried_then_marked_failed(self, handlers):
+        """Failed jobs are requeued until max_attempts, then marked failed."""
+        flaky = enqueue("test.flaky")
+        flaky = run_job(claim_next("w1"))
+        assert flaky.status == Job.QUEUED
+        assert run_job(claim_next("w1")).status == Job.SUCCEEDED
+
+        broken = enqueue("test.broken", max_attempts=1)
+        broken = run_job(claim_next("w1"))
+        assert broken.status == Job.FAILED
+        assert "always fails" in broken.error
+
+    def test_unknown_kind_rejected(self):
+        """Typos in job kinds fail at enqueue time."""
+        with pytest.raises(LookupError):
+            enqueue("test.missing")
+
+    def test_run_worker_once_drains_queue(self, handlers):
+        """run_worker --once processes every queued job and exits."""
+        for value in range(3):
+            enqueue("test.echo", {"value": value})
+
+        call_command("run_worker", "--once", "--concurrency", "1", stdout=StringIO())
+
+        assert sorted(handlers) == [0, 1, 2]
+        assert not Job.objects.exclude(status=Job.SUCCEEDED).exists()
+        assert not WorkerHeartbeat.objects.exists()  # a stopped worker signs off
+
+    def test_worker_alive_follows_heartbeats(self, settings):
+        """A worker counts as alive until its heartbeat is older than JOBS_WORKER_TIMEOUT."""
+        settings.JOBS_WORKER_TIMEOUT = 60
+        assert not worker_alive()
+
+        record_heartbeat("w1")
+        assert worker_alive()
+
+        WorkerHeartbeat.objects.update(last_seen_at=timezone.now() - timedelta(seconds=120))
+        assert not worker_alive()
+
+
+@pytest.mark.django_db
+class TestJobHandlers:
+    """Test the handlers apps register for slow work."""
+
+    def test_rebuild_credits_job(self, student):
+        """The credit rebuild runs as a job and reports its counts."""
+        call_command("rebuild_credits", "--background", stdout=StringIO())
+
+        job = run_job(claim_next("w1"))
+
+        assert job.status == Job.SUCCEEDED
+        assert job.result["students"] == 1
+
+    REPORT = {
+            "student": {"name": "Jane Doe", "email": "jane@example.com", "enrollment_number": 1},
+            "course": {"title": "Python", "code": "PY1", "total_credits_required": 144},
+            "progress": {"percentage": 0, "credits": 0},
+            "assignments": {"total_marks": 0, "earned_marks": 0, "weighted_percentage": 0, "passed": False,
+                            "total_assignments": 0, "graded_assignments": 0, "details": []},
+            "generated_at": "today",
+    }
+
+    def test_student_report_job_attaches_pdf(self, client, teacher_user, teacher):
+        """With a worker running, background report requests return a job whose result is the PDF."""
+        client.force_login(teacher_user)
+        record_heartbeat("w1")
+
+        response = client.post(
+            "/teachers/generate-student-report/?background=1", self.REPORT, content_type="application/json"
+        )
+        assert response.status_code == 202
+        run_job(claim_next("w1"))
+
+        status = client.get(response.json()["status_url"]).json()
+        assert status["status"] == Job.SUCCEEDED
+        download = client.get(status["download_url"])
+        assert download.status_code == 200
+        assert b"".join(download.streaming_content).startswith(b"%PDF")
+
+    def test_student_report_without_worker_is_built_inline(self, client, teacher_user, teacher):
+        """Without a live worker the report is not queued (it would never run) but returned directly."""
+        client.force_login(teacher_user)
+
+        response = client.post(
+            "/teachers/generate-student-report/?background=1", self.REPORT, content_type="application/json"
+        )
+
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+        assert not Job.objects.exists()
+
+    def test_job_status_private_to_creator(self, client, user, handlers):
+        """Other users cannot see someone else's job."""
+        job = enqueue("test.echo", {"value": 1})
+        client.force_login(user)
+
+        assert client.get(f"/jobs/{job.pk}/").status_code == 404
@@ -0,0 +1,10 @@
+"""URL configuration for jobs app."""
+from django.urls import path
+from . import views
+
+app_name = "jobs"
+
+urlpatterns = [
+    path("<int:job_id>/", views.job_status, name="job_status"),
+    path("<int:job_id>/download/", views.job_download, name="job_download"),
+]
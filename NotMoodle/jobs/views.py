@@ -0,0 +1,38 @@
+"""Views for polling background jobs and downloading their results."""
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from .models import Job
+
+
+def _get_visible_job(request, job_id) -> Job:
+    job = get_object_or_404(Job, pk=job_id)
+    # Jobs are private to whoever queued them (staff can see all)
+    if job.created_by_id != request.user.pk and not request.user.is_staff:
+        raise Http404("Job not found")
+    return job
+
+
+@login_required
+def job_status(request, job_id):
+    """
+    GET /jobs/<job_id>/
+    
+    Returns the job's status and progress, plus a download URL once it has a result file.
+    """
+    job = _get_visible_job(request, job_id)
+    data = job.as_dict()
+    if job.status == Job.SUCCEEDED and job.result_file:
+        data["download_url"] = reverse("jobs:job_download", args=[job.pk])
+    return JsonResponse(data)
+
+
+@login_required
+def job_download(request, job_id):
+    """GET /jobs/<job_id>/download/ streams the job's result file."""
+    job = _get_visible_job(request, job_id)
+    if job.status != Job.SUCCEEDED or not job.result_file:
+        raise Http404("No result file")
+    return FileResponse(job.result_file.open("rb"), as_attachment=True, filename=job.result_file.name.rsplit("/", 1)[-1])
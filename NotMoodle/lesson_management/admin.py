@@ -1,7 +1,7 @@
 # lesson_management/admin.py
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Lesson, Assignment, ReadingList, AssignmentAttachment, LessonCreditAwarded
+from .models import Lesson, Assignment, ReadingList, AssignmentAttachment, LessonCreditAwarded, LessonResult
 
 # ----- ReadingList inline under Lesson -----
 class ReadingListInline(admin.TabularInline):
@@ -85,3 +85,15 @@ class LessonCreditAwardedAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         # Allow deletion for corrections/adjustments
         return request.user.is_superuser
+
+
+@admin.register(LessonResult)
+class LessonResultAdmin(admin.ModelAdmin):
+    list_display = ("student", "lesson", "percentage", "graded_assignments", "total_assignments", "passed", "updated_at")
+    list_filter = ("passed", "lesson")
+    search_fields = ("student__first_name", "student__last_name", "student__enrollment_number", "lesson__unit_code", "lesson__title")
+    readonly_fields = ("student", "lesson", "percentage", "graded_assignments", "total_assignments", "passed", "updated_at")
+
+    def has_add_permission(self, request):
+        # Rows are maintained by grade/assignment signals and rebuild_lesson_results
+        return False
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from classroom_and_grading.models import AssignmentGrade
+from lesson_management.models import LessonEnrollment, LessonResult
+from lesson_management.selectors import get_lesson_results
+from lesson_management.services import refresh_lesson_results
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized LessonResult table from grades and report any rows that had drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--student", type=int, help="Rebuild results for a single student id")
+        parser.add_argument("--lesson", type=int, help="Rebuild results for a single lesson id")
+        parser.add_argument("--batch-size", type=int, default=1000, help="(student, lesson) pairs per batch")
+        parser.add_argument("--dry-run", action="store_true", help="Only verify; report drift without writing")
+
+    def handle(self, *args, **options):
+        dry_run = options.get("dry_run")
+        batch_size = options.get("batch_size") or 1000
+
+        enrollments = LessonEnrollment.objects.all()
+        grades = AssignmentGrade.objects.all()
+        rows = LessonResult.objects.all()
+        if options.get("student"):
+            enrollments = enrollments.filter(student_id=options["student"])
+            grades = grades.filter(student_id=options["student"])
+            rows = rows.filter(student_id=options["student"])
+        if options.get("lesson"):
+            enrollments = enrollments.filter(lesson_id=options["lesson"])
+            grades = grades.filter(assignment__lesson_id=options["lesson"])
+            rows = rows.filter(lesson_id=options["lesson"])
+
+        # Every enrolled or graded pair should have a row
+        expected = set(enrollments.values_list("student_id", "lesson_id"))
+        expected.update(grades.values_list("student_id", "assignment__lesson_id"))
+        stored = {}
+        row_ids = {}
+        for row_id, student_id, lesson_id, percentage, graded, total, weightage, passed in rows.values_list(
+            "id", "student_id", "lesson_id", "percentage", "graded_assignments", "total_assignments",
+            "total_weightage", "passed",
+        ):
+            stored[(student_id, lesson_id)] = (percentage, graded, total, weightage, passed)
+            row_ids[(student_id, lesson_id)] = row_id
+
+        stale = stored.keys() - expected
+        missing = 0
+        drifted = 0
+        pairs = sorted(expected)
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            if dry_run:
+                results = get_lesson_results(batch)
+            else:
+                with transaction.atomic():
+                    results = refresh_lesson_results(batch)
+
+            # Compare against the snapshot taken before any rows were rewritten
+            for key, (passed, percentage, details) in results.items():
+                if key not in stored:
+                    missing += 1
+                    continue
+                computed = (
+                    round(percentage, 2),
+                    details.get("graded_assignments", 0),
+                    details.get("total_assignments", 0),
+                    details.get("total_weightage", 0),
+                    passed,
+                )
+                if computed != stored[key]:
+                    drifted += 1
+                    self.stdout.write(f"  Drift for student {key[0]}, lesson {key[1]}: stored {stored[key]}, computed {computed}")
+
+        if stale and not dry_run:
+            LessonResult.objects.filter(id__in=[row_ids[key] for key in stale]).delete()
+
+        verb = "Found" if dry_run else "Repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {len(expected)} results: {verb} {drifted} drifted, {missing} missing and {len(stale)} stale rows"
+        ))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lesson_management", "0010_alter_lesson_lesson_credits"),
+        ("student_management", "0006_alter_student_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LessonResult",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("percentage", models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ("graded_assignments", models.PositiveIntegerField(default=0)),
+                ("total_assignments", models.PositiveIntegerField(default=0)),
+                ("passed", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "lesson",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="results",
+                        to="lesson_management.lesson",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lesson_results",
+                        to="student_management.student",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["lesson", "passed"], name="lesson_mana_lesson__f64be1_idx")],
+                "unique_together": {("student", "lesson")},
+            },
+        ),
+    ]
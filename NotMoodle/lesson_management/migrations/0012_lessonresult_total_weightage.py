@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:14
+"""
+Store each LessonResult's lesson weightage total, so stored results carry the
+same details as computed ones. Existing rows are backfilled from assignments.
+"""
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+
+
+def backfill_total_weightage(apps, schema_editor):
+    Assignment = apps.get_model("lesson_management", "Assignment")
+    LessonResult = apps.get_model("lesson_management", "LessonResult")
+    totals = (
+        Assignment.objects.filter(lesson_id=OuterRef("lesson_id"))
+        .order_by().values("lesson_id").annotate(total=Sum("weightage")).values("total")
+    )
+    LessonResult.objects.filter(total_assignments__gt=0).update(total_weightage=Subquery(totals))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lesson_management", "0011_lessonresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lessonresult",
+            name="total_weightage",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.RunPython(backfill_total_weightage, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,7 @@ from django.db import models
 from django.core.validators import FileExtensionValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from teachersManagement.models import TeacherProfile
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from student_management.models import Student, ManageCreditPoint
 
@@ -100,66 +100,14 @@ class Lesson(models.Model):
         """
         Calculate if a student has passed this lesson (50%+ overall).
         Returns a tuple: (passed: bool, percentage: Decimal, details: dict)
+
+        Thin wrapper over lesson_management.selectors.get_lesson_results; use
+        that directly when evaluating many (student, lesson) pairs at once.
         """
-        from classroom_and_grading.models import AssignmentGrade
-        from decimal import Decimal
-        
-        assignments = self.assignments.all()
-        if not assignments.exists():
-            return (False, Decimal('0'), {
-                'message': 'No assignments in this lesson',
-                'has_grades': False,
-                'total_assignments': 0,
-                'graded_assignments': 0
-            })
-        
-        total_weightage = sum(a.weightage for a in assignments)
-        if total_weightage == 0:
-            return (False, Decimal('0'), {
-                'message': 'Total weightage is 0',
-                'has_grades': False,
-                'total_assignments': assignments.count(),
-                'graded_assignments': 0
-            })
-        
-        # Calculate weighted score
-        weighted_score = Decimal('0')
-        graded_assignments = 0
-        
-        for assignment in assignments:
-            try:
-                grade = AssignmentGrade.objects.get(assignment=assignment, student=student)
-                # Check if marks_awarded is not None (nullable field)
-                if grade.marks_awarded is not None and assignment.marks > 0:
-                    # Contribution is the achieved fraction times the assignment weightage (in %)
-                    # e.g. 100% on a 50%-weight assignment contributes 50 to overall
-                    weighted_contribution = (grade.marks_awarded / assignment.marks) * assignment.weightage
-                    weighted_score += weighted_contribution
-                    graded_assignments += 1
-            except AssignmentGrade.DoesNotExist:
-                # Student hasn't been graded for this assignment
-                continue
-        
-        if graded_assignments == 0:
-            return (False, Decimal('0'), {
-                'message': 'No grades found for this student',
-                'has_grades': False,
-                'total_weightage': total_weightage,
-                'graded_assignments': 0,
-                'total_assignments': assignments.count()
-            })
-        
-        # Final percentage is the sum of weighted contributions.
-        # Cap at 100 in case of misconfigured weightage totals > 100.
-        final_percentage = weighted_score if weighted_score <= 100 else Decimal('100')
-        passed = final_percentage >= Decimal('50')
-        
-        return (passed, final_percentage, {
-            'total_weightage': total_weightage,
-            'graded_assignments': graded_assignments,
-            'total_assignments': assignments.count(),
-            'has_grades': True
-        })
+        from .selectors import get_lesson_results
+
+        key = (student.pk, self.pk)
+        return get_lesson_results([key])[key]
 
 
 # ---------------------------
@@ -348,4 +296,65 @@ class LessonCreditAwarded(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.student.full_name()} • {self.lesson.unit_code} • {self.credits_amount} credits"
\ No newline at end of file
+        return f"{self.student.full_name()} • {self.lesson.unit_code} • {self.credits_amount} credits"
+
+class LessonResult(models.Model):
+    """
+    Materialized per-(student, lesson) grade result.
+
+    Kept current by the AssignmentGrade/Assignment signals; rebuild and verify
+    with `manage.py rebuild_lesson_results`.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="lesson_results")
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="results")
+    percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    graded_assignments = models.PositiveIntegerField(default=0)
+    total_assignments = models.PositiveIntegerField(default=0)
+    total_weightage = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    passed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("student", "lesson")
+        indexes = [
+            models.Index(fields=["lesson", "passed"]),
+        ]
+
+    def __str__(self):
+        return f"{self.student.full_name()} • {self.lesson.unit_code} • {self.percentage}% ({'pass' if self.passed else 'not passed'})"
+
+    def as_result(self):
+        """Return the (passed, percentage, details) tuple Lesson.student_passed() returns, details included."""
+        details = {
+            'has_grades': self.graded_assignments > 0,
+            'graded_assignments': self.graded_assignments,
+            'total_assignments': self.total_assignments,
+        }
+        # Same messages and keys as lesson_management.selectors.evaluate_lesson_result
+        if self.total_assignments == 0:
+            details['message'] = 'No assignments in this lesson'
+        elif self.total_weightage == 0:
+            details['message'] = 'Total weightage is 0'
+        else:
+            details['total_weightage'] = self.total_weightage
+            if self.graded_assignments == 0:
+                details['message'] = 'No grades found for this student'
+        return (self.passed, self.percentage, details)
+
+
+@receiver(post_save, sender=Assignment)
+def refresh_results_on_assignment_change(sender, instance: Assignment, raw=False, **kwargs):
+    """Marks/weightage changes (and new assignments) alter every stored result for the lesson."""
+    from .services import refresh_lesson_results
+
+    if raw:
+        return
+
+    pairs = LessonResult.objects.filter(lesson_id=instance.lesson_id).values_list("student_id", "lesson_id")
+    refresh_lesson_results(pairs)
+
+
+@receiver(post_delete, sender=Assignment)
+def drop_results_on_assignment_delete(sender, instance: Assignment, **kwargs):
+    # Rows are recomputed on next read; deleting avoids writing during cascades.
+    LessonResult.objects.filter(lesson_id=instance.lesson_id).delete()
@@ -0,0 +1,114 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+
+PASS_MARK = Decimal("50")
+
+# (passed, percentage, details) -- the same shape Lesson.student_passed() returns
+GradeResult = Tuple[bool, Decimal, dict]
+
+
+def evaluate_lesson_result(assignments: List[dict], marks_by_assignment: Dict[int, Decimal]) -> GradeResult:
+    """
+    Compute the weighted result for one student in one lesson, in memory.
+
+    `assignments` are dicts with "id", "marks" and "weightage" keys for every
+    assignment in the lesson; `marks_by_assignment` maps assignment id to the
+    student's non-null marks_awarded.
+    """
+    if not assignments:
+        return (False, Decimal('0'), {
+            'message': 'No assignments in this lesson',
+            'has_grades': False,
+            'total_assignments': 0,
+            'graded_assignments': 0
+        })
+
+    total_weightage = sum(a["weightage"] for a in assignments)
+    if total_weightage == 0:
+        return (False, Decimal('0'), {
+            'message': 'Total weightage is 0',
+            'has_grades': False,
+            'total_assignments': len(assignments),
+            'graded_assignments': 0
+        })
+
+    weighted_score = Decimal('0')
+    graded_assignments = 0
+    for a in assignments:
+        marks_awarded = marks_by_assignment.get(a["id"])
+        if marks_awarded is not None and a["marks"] > 0:
+            # e.g. 100% on a 50%-weight assignment contributes 50 to overall
+            weighted_score += (marks_awarded / a["marks"]) * a["weightage"]
+            graded_assignments += 1
+
+    if graded_assignments == 0:
+        return (False, Decimal('0'), {
+            'message': 'No grades found for this student',
+            'has_grades': False,
+            'total_weightage': total_weightage,
+            'graded_assignments': 0,
+            'total_assignments': len(assignments)
+        })
+
+    # Cap at 100 in case of misconfigured weightage totals > 100.
+    final_percentage = weighted_score if weighted_score <= 100 else Decimal('100')
+    passed = final_percentage >= PASS_MARK
+
+    return (passed, final_percentage, {
+        'total_weightage': total_weightage,
+        'graded_assignments': graded_assignments,
+        'total_assignments': len(assignments),
+        'has_grades': True
+    })
+
+
+def get_lesson_results(pairs: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], GradeResult]:
+    """
+    Return {(student_id, lesson_id): (passed, percentage, details)} for every pair.
+
+    Runs two queries regardless of how many pairs are requested: one for the
+    assignments of all lessons and one for the matching grades.
+    """
+    from classroom_and_grading.models import AssignmentGrade
+    from .models import Assignment
+
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+
+    student_ids = {student_id for student_id, _ in pairs}
+    lesson_ids = {lesson_id for _, lesson_id in pairs}
+
+    assignments_by_lesson = defaultdict(list)
+    for a in (Assignment.objects
+              .filter(lesson_id__in=lesson_ids)
+              .order_by()
+              .values("id", "lesson_id", "marks", "weightage")):
+        assignments_by_lesson[a["lesson_id"]].append(a)
+
+    marks = defaultdict(dict)  # (student_id, lesson_id) -> {assignment_id: marks_awarded}
+    if assignments_by_lesson:
+        grades = (AssignmentGrade.objects
+                  .filter(student_id__in=student_ids,
+                          assignment__lesson_id__in=list(assignments_by_lesson),
+                          marks_awarded__isnull=False)
+                  .order_by()
+                  .values_list("student_id", "assignment__lesson_id", "assignment_id", "marks_awarded"))
+        for student_id, lesson_id, assignment_id, marks_awarded in grades:
+            marks[(student_id, lesson_id)][assignment_id] = marks_awarded
+
+    return {
+        (student_id, lesson_id): evaluate_lesson_result(
+            assignments_by_lesson.get(lesson_id, []),
+            marks.get((student_id, lesson_id), {}),
+        )
+        for student_id, lesson_id in pairs
+    }
+
+
+def get_lesson_results_for_student(student_id: int, lesson_ids: Iterable[int]) -> Dict[int, GradeResult]:
+    """Return {lesson_id: (passed, percentage, details)} for one student."""
+    results = get_lesson_results((student_id, lesson_id) for lesson_id in lesson_ids)
+    return {lesson_id: result for (_, lesson_id), result in results.items()}
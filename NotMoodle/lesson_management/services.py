@@ -0,0 +1,72 @@
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+
+from .models import LessonResult
+from .selectors import GradeResult, get_lesson_results
+
+
+def _to_row(student_id: int, lesson_id: int, result: GradeResult) -> LessonResult:
+    passed, percentage, details = result
+    return LessonResult(
+        student_id=student_id,
+        lesson_id=lesson_id,
+        percentage=Decimal(percentage).quantize(Decimal("0.01")),
+        graded_assignments=details.get("graded_assignments", 0),
+        total_assignments=details.get("total_assignments", 0),
+        total_weightage=details.get("total_weightage", 0),
+        passed=passed,
+    )
+
+
+def refresh_lesson_results(pairs: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], GradeResult]:
+    """
+    Recompute (student_id, lesson_id) results from grades and upsert their LessonResult rows.
+
+    Returns the freshly computed {(student_id, lesson_id): (passed, percentage, details)}.
+    """
+    results = get_lesson_results(pairs)
+    if results:
+        LessonResult.objects.bulk_create(
+            [_to_row(student_id, lesson_id, result) for (student_id, lesson_id), result in results.items()],
+            update_conflicts=True,
+            unique_fields=["student", "lesson"],
+            update_fields=[
+                "percentage", "graded_assignments", "total_assignments", "total_weightage", "passed", "updated_at",
+            ],
+            batch_size=500,
+        )
+    return results
+
+
+def get_stored_lesson_results(pairs: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], GradeResult]:
+    """
+    Read results from the LessonResult table, computing any missing rows from grades.
+
+    Missing rows are not written here (this runs on GET views); the grade and
+    assignment signals, refresh_lesson_results and `manage.py
+    rebuild_lesson_results` fill the table.
+
+    Returns {(student_id, lesson_id): (passed, percentage, details)} for every pair.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+
+    student_ids = {student_id for student_id, _ in pairs}
+    lesson_ids = {lesson_id for _, lesson_id in pairs}
+    results = {
+        (row.student_id, row.lesson_id): row.as_result()
+        for row in LessonResult.objects.filter(student_id__in=student_ids, lesson_id__in=lesson_ids)
+        if (row.student_id, row.lesson_id) in pairs
+    }
+
+    missing = pairs - results.keys()
+    if missing:
+        results.update(get_lesson_results(missing))
+    return results
+
+
+def get_stored_lesson_results_for_student(student_id: int, lesson_ids: Iterable[int]) -> Dict[int, GradeResult]:
+    """Return {lesson_id: (passed, percentage, details)} for one student from stored rows."""
+    results = get_stored_lesson_results((student_id, lesson_id) for lesson_id in lesson_ids)
+    return {lesson_id: result for (_, lesson_id), result in results.items()}
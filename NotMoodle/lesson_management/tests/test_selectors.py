@@ -0,0 +1,84 @@
+"""Tests for lesson_management selectors (batch grade computation)."""
+import pytest
+from decimal import Decimal
+from django.utils import timezone
+from datetime import timedelta
+from model_bakery import baker
+from lesson_management.models import Lesson, Assignment
+from lesson_management.selectors import get_lesson_results, get_lesson_results_for_student
+from classroom_and_grading.models import AssignmentGrade
+from student_management.models import Student
+
+
+def make_assignment(lesson, marks="100", weightage="50"):
+    return baker.make(
+        Assignment,
+        lesson=lesson,
+        marks=Decimal(marks),
+        weightage=Decimal(weightage),
+        release_date=timezone.now(),
+        due_date=timezone.now() + timedelta(days=7),
+    )
+
+
+@pytest.mark.django_db
+class TestGetLessonResults:
+    """Test get_lesson_results batch engine."""
+
+    def test_empty_pairs(self):
+        """No pairs means no queries and no results."""
+        assert get_lesson_results([]) == {}
+
+    def test_matches_student_passed(self, lesson, student):
+        """Batch results agree with Lesson.student_passed for the same pair."""
+        a1 = make_assignment(lesson)
+        a2 = make_assignment(lesson)
+        baker.make(AssignmentGrade, assignment=a1, student=student, marks_awarded=Decimal("80"))
+        baker.make(AssignmentGrade, assignment=a2, student=student, marks_awarded=None)
+
+        results = get_lesson_results([(student.pk, lesson.pk)])
+
+        assert results[(student.pk, lesson.pk)] == lesson.student_passed(student)
+        passed, percentage, details = results[(student.pk, lesson.pk)]
+        assert passed is False
+        assert percentage == Decimal("40")
+        assert details["graded_assignments"] == 1
+        assert details["total_assignments"] == 2
+
+    def test_no_assignments_and_no_grades(self, lesson, teacher, student):
+        """Lessons without assignments or grades report has_grades=False."""
+        other = baker.make(Lesson, unit_code="EMPTY1", lesson_designer=teacher)
+        make_assignment(lesson)
+
+        results = get_lesson_results_for_student(student.pk, [lesson.pk, other.pk])
+
+        assert results[other.pk][2]["message"] == "No assignments in this lesson"
+        assert results[lesson.pk][2]["message"] == "No grades found for this student"
+
+    def test_percentage_capped_at_100(self, lesson, student):
+        """Misconfigured weightage totals are capped at 100%."""
+        a1 = make_assignment(lesson, weightage="80")
+        a2 = make_assignment(lesson, weightage="80")
+        baker.make(AssignmentGrade, assignment=a1, student=student, marks_awarded=Decimal("100"))
+        baker.make(AssignmentGrade, assignment=a2, student=student, marks_awarded=Decimal("100"))
+
+        passed, percentage, _ = get_lesson_results([(student.pk, lesson.pk)])[(student.pk, lesson.pk)]
+
+        assert passed is True
+        assert percentage == Decimal("100")
+
+    def test_query_count_is_constant(self, teacher, django_assert_num_queries):
+        """Many students and lessons are graded with two queries."""
+        lessons = [baker.make(Lesson, unit_code=f"BATCH{i}", lesson_designer=teacher) for i in range(3)]
+        students = baker.make(Student, _quantity=4)
+        for lesson in lessons:
+            for assignment in (make_assignment(lesson), make_assignment(lesson)):
+                for s in students:
+                    baker.make(AssignmentGrade, assignment=assignment, student=s, marks_awarded=Decimal("60"))
+
+        pairs = [(s.pk, l.pk) for s in students for l in lessons]
+        with django_assert_num_queries(2):
+            results = get_lesson_results(pairs)
+
+        assert len(results) == 12
+        assert all(passed for passed, _, _ in results.values())
@@ -0,0 +1,115 @@
+"""Tests for the materialized LessonResult table and its maintenance."""
+import pytest
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from model_bakery import baker
+from lesson_management.models import Assignment, LessonResult
+from lesson_management.selectors import get_lesson_results
+from lesson_management.services import get_stored_lesson_results, refresh_lesson_results
+from classroom_and_grading.models import AssignmentGrade
+
+
+@pytest.fixture
+def graded_assignment(lesson, student):
+    assignment = baker.make(
+        Assignment,
+        lesson=lesson,
+        marks=Decimal("100"),
+        weightage=Decimal("100"),
+        release_date=timezone.now(),
+        due_date=timezone.now() + timedelta(days=7),
+    )
+    AssignmentGrade.objects.create(assignment=assignment, student=student, marks_awarded=Decimal("60"))
+    return assignment
+
+
+@pytest.mark.django_db
+class TestLessonResultMaintenance:
+    """Test that LessonResult rows follow grade and assignment changes."""
+
+    def test_grade_save_writes_result(self, lesson, student, graded_assignment):
+        """Saving a grade upserts the student's LessonResult row."""
+        row = LessonResult.objects.get(student=student, lesson=lesson)
+
+        assert row.passed is True
+        assert row.percentage == Decimal("60.00")
+        assert row.graded_assignments == 1
+        assert row.total_assignments == 1
+
+    def test_assignment_change_refreshes_result(self, lesson, student, graded_assignment):
+        """Changing an assignment's marks recomputes stored results for the lesson."""
+        graded_assignment.marks = Decimal("200")
+        graded_assignment.save()
+
+        row = LessonResult.objects.get(student=student, lesson=lesson)
+        assert row.percentage == Decimal("30.00")
+        assert row.passed is False
+
+    def test_grade_delete_invalidates_result(self, lesson, student, graded_assignment):
+        """Deleting a grade drops the row; reads compute the result without writing it back."""
+        AssignmentGrade.objects.filter(assignment=graded_assignment, student=student).delete()
+
+        assert not LessonResult.objects.filter(student=student, lesson=lesson).exists()
+        passed, percentage, details = get_stored_lesson_results([(student.pk, lesson.pk)])[(student.pk, lesson.pk)]
+        assert passed is False
+        assert details["has_grades"] is False
+        assert not LessonResult.objects.filter(student=student, lesson=lesson).exists()
+
+    def test_stored_read_uses_single_query(self, lesson, student, graded_assignment, django_assert_num_queries):
+        """Reading existing rows costs one query."""
+        with django_assert_num_queries(1):
+            results = get_stored_lesson_results([(student.pk, lesson.pk)])
+
+        assert results[(student.pk, lesson.pk)][0] is True
+
+    @pytest.mark.parametrize("weightage,marks_awarded", [
+        (Decimal("100"), Decimal("60")),  # graded
+        (Decimal("100"), None),  # not graded yet
+        (Decimal("0"), Decimal("60")),  # no weightage
+    ])
+    def test_stored_result_matches_computed(self, lesson, student, weightage, marks_awarded):
+        """A stored row gives back exactly the (passed, percentage, details) the live computation does."""
+        assignment = baker.make(
+            Assignment, lesson=lesson, marks=Decimal("100"), weightage=weightage,
+            release_date=timezone.now(), due_date=timezone.now(),
+        )
+        AssignmentGrade.objects.create(assignment=assignment, student=student, marks_awarded=marks_awarded)
+        key = (student.pk, lesson.pk)
+
+        assert LessonResult.objects.get(student=student, lesson=lesson).as_result() == get_lesson_results([key])[key]
+
+    def test_stored_result_without_assignments(self, lesson, student):
+        key = (student.pk, lesson.pk)
+        refresh_lesson_results([key])
+
+        assert LessonResult.objects.get(student=student, lesson=lesson).as_result() == get_lesson_results([key])[key]
+
+
+@pytest.mark.django_db
+class TestRebuildLessonResultsCommand:
+    """Test the rebuild_lesson_results management command."""
+
+    def test_repairs_drift(self, lesson, student, graded_assignment):
+        """Rows changed behind the signals' back are detected and repaired."""
+        LessonResult.objects.filter(student=student, lesson=lesson).update(passed=False, percentage=Decimal("1"))
+
+        out = StringIO()
+        call_command("rebuild_lesson_results", stdout=out)
+
+        assert "1 drifted" in out.getvalue()
+        row = LessonResult.objects.get(student=student, lesson=lesson)
+        assert row.passed is True
+        assert row.percentage == Decimal("60.00")
+
+    def test_dry_run_does_not_write(self, lesson, student, graded_assignment):
+        """--dry-run reports missing rows without creating them."""
+        LessonResult.objects.all().delete()
+
+        out = StringIO()
+        call_command("rebuild_lesson_results", "--dry-run", stdout=out)
+
+        assert "1 missing" in out.getvalue()
+        assert not LessonResult.objects.exists()
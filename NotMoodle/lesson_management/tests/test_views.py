@@ -400,6 +400,15 @@ class TestLessonDetailView:
         assert prereq in response.context['completed_prerequisites']
         assert prereq not in response.context['missing_prerequisites']
 
+    def test_lesson_detail_scopes_ai_assistant_to_lesson(self, client, student_user, student, lesson):
+        """The AI assistant widget on a lesson page sends that lesson's id with each question"""
+        client.force_login(student_user)
+
+        response = client.get(reverse('lessons:detail', kwargs={'lesson_id': lesson.id}))
+
+        assert response.status_code == 200
+        assert f'data-lesson-id="{lesson.id}"' in response.content.decode()
+
 
 @pytest.mark.django_db  
 class TestAssignmentSubmission:
@@ -43,6 +43,7 @@ from .models import Lesson, ReadingList, ReadingListProgress, VideoProgress, Ass
 from .forms import LessonForm, AssignmentSubmissionForm
 from student_management.models import ManageCreditPoint
 from .models import LessonEnrollment, AssignmentSubmission
+from .selectors import get_lesson_results_for_student
 from student_management.models import Student
 from django.contrib import messages
 from django.db.models import Exists, OuterRef
@@ -418,11 +419,18 @@ def student_lessons_list(request):
             .values_list("lesson_id", flat=True)
         )
         
+        # Grade enrolled lessons and every prerequisite in a single batch
+        lessons = list(lessons)
+        graded_ids = set(enrolled_ids)
+        for lesson in lessons:
+            graded_ids.update(p.id for p in lesson.prerequisites.all())
+        results = get_lesson_results_for_student(student.pk, graded_ids)
+
         # Calculate marks and pass status for enrolled lessons
         # Also check prerequisite status for all lessons
         for lesson in lessons:
             if lesson.id in enrolled_ids:
-                passed, percentage, details = lesson.student_passed(student)
+                passed, percentage, details = results[lesson.id]
                 lesson_stats[lesson.id] = {
                     'percentage': round(percentage, 1),
                     'passed': passed,
@@ -432,10 +440,10 @@ def student_lessons_list(request):
             
             # Check prerequisites for all lessons
             prerequisites = lesson.prerequisites.all()
-            if prerequisites.exists():
+            if prerequisites:
                 prereq_info = []
                 for prereq in prerequisites:
-                    prereq_passed, _, _ = prereq.student_passed(student)
+                    prereq_passed, _, _ = results[prereq.id]
                     prereq_info.append({
                         'lesson': prereq,
                         'passed': prereq_passed
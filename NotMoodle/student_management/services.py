@@ -0,0 +1,65 @@
+from typing import Callable, Optional
+
+from django.db import transaction
+
+from lesson_management.models import LessonCreditAwarded, LessonEnrollment
+from lesson_management.services import get_stored_lesson_results_for_student
+from .models import ManageCreditPoint, Student
+
+
+def rebuild_student_credits(
+    students=None,
+    dry_run: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Recalculate credits from passed lessons (core and electives) and backfill
+    LessonCreditAwarded records.
+
+    Args:
+        students: Student queryset to process (defaults to all students)
+        dry_run: Count what would change without writing
+        progress: Optional callback called with (done, total) after each student
+
+    Returns:
+        Dict with `students`, `updated` and `created_awards` counts
+    """
+    qs = students if students is not None else Student.objects.all()
+    total_students = qs.count()
+    updated = 0
+    created_awards = 0
+
+    for done, student in enumerate(qs.iterator(), start=1):
+        with transaction.atomic():
+            # Compute credits from all PASSED lessons
+            enrollments = list(LessonEnrollment.objects.filter(student=student).select_related("lesson"))
+            results = get_stored_lesson_results_for_student(student.pk, [e.lesson_id for e in enrollments])
+            awarded_lesson_ids = set(
+                LessonCreditAwarded.objects.filter(student=student).values_list("lesson_id", flat=True)
+            )
+            computed_credits = 0
+            for e in enrollments:
+                passed, _, _ = results[e.lesson_id]
+                if passed:
+                    computed_credits += (e.lesson.lesson_credits or 0)
+                    # Ensure an award record exists
+                    if e.lesson_id not in awarded_lesson_ids:
+                        if not dry_run:
+                            LessonCreditAwarded.objects.create(
+                                student=student,
+                                lesson=e.lesson,
+                                credits_amount=(e.lesson.lesson_credits or 0) or 0,
+                            )
+                        created_awards += 1
+
+            credit, _ = ManageCreditPoint.objects.get_or_create(student=student)
+            if credit.credits != computed_credits:
+                if not dry_run:
+                    credit.credits = computed_credits
+                    credit.save(update_fields=["credits"])
+                updated += 1
+
+        if progress is not None:
+            progress(done, total_students)
+
+    return {"students": total_students, "updated": updated, "created_awards": created_awards}
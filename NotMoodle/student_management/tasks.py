@@ -0,0 +1,19 @@
+"""Background job handlers for student_management."""
+from jobs.registry import task
+from .models import Student
+from .services import rebuild_student_credits
+
+
+@task("student_management.rebuild_credits")
+def rebuild_credits(job, student_id=None):
+    """Recompute credits for one student, or everyone when student_id is None."""
+    students = Student.objects.all()
+    if student_id:
+        students = students.filter(pk=student_id)
+
+    def report(done, total):
+        # Throttle progress writes to roughly every 5%
+        if done == total or done % max(1, total // 20) == 0:
+            job.set_progress(done * 100 // total, f"{done}/{total} students")
+
+    return rebuild_student_credits(students, progress=report)
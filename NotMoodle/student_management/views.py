@@ -12,6 +12,7 @@ from .models import Student, ManageCreditPoint
 from .forms import CreditChangeForm, StudentSignupForm, StudentLoginForm
 from course_management.models import Enrollment
 from lesson_management.models import LessonEnrollment, Lesson, Assignment, AssignmentSubmission
+from lesson_management.services import get_stored_lesson_results_for_student
 from classroom_and_grading.models import Classroom, ClassroomStudent
 from teachersManagement.models import TeacherProfile
 
@@ -155,9 +156,9 @@ def student_dashboard(request):
     total_required = enrollment.course.total_credits_required if enrollment else 144
 
     # Lessons from LessonEnrollment
-    lesson_enrollments = (LessonEnrollment.objects
-                          .filter(student=student)
-                          .select_related("lesson"))
+    lesson_enrollments = list(LessonEnrollment.objects
+                              .filter(student=student)
+                              .select_related("lesson"))
 
     # Get or create credit point record for student
     credit_record, _ = ManageCreditPoint.objects.get_or_create(student=student)
@@ -195,8 +196,11 @@ def student_dashboard(request):
     passed_lessons = []
     active_lessons = []
     
+    # Read every enrolled lesson's stored result in one batch instead of per-lesson queries
+    lesson_results = get_stored_lesson_results_for_student(student.pk, [le.lesson_id for le in lesson_enrollments])
+
     for le in lesson_enrollments:
-        passed, percentage, details = le.lesson.student_passed(student)
+        passed, percentage, details = lesson_results[le.lesson_id]
         lesson_data = {
             "id": le.lesson.id,
             "title": le.lesson.title,
@@ -260,16 +264,14 @@ def student_dashboard(request):
         course_lessons = enrollment.course.course_lessons.filter(is_required=True).select_related('lesson')
         
         # Get student's lesson enrollments for quick lookup
-        student_lesson_enrollments = set(
-            LessonEnrollment.objects.filter(student=student).values_list('lesson_id', flat=True)
-        )
+        student_lesson_enrollments = {le.lesson_id for le in lesson_enrollments}
         
         for course_lesson in course_lessons:
             lesson = course_lesson.lesson
             is_enrolled = lesson.id in student_lesson_enrollments
             
             if is_enrolled:
-                passed, percentage, details = lesson.student_passed(student)
+                passed, percentage, details = lesson_results[lesson.id]
                 status = "completed" if passed else "in_progress"
             else:
                 passed = False
@@ -0,0 +1,352 @@
+"""PDF rendering of the teacher dashboard's student progress report."""
+import io
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+
+
+def report_filename(data) -> str:
+    return f'Student_Report_{data["student"]["name"].replace(" ", "_")}.pdf'
+
+
+def build_student_report_pdf(data) -> bytes:
+    """Render the student progress report for the dashboard's report payload."""
+    # Create PDF buffer
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+
+    # Get styles
+    styles = getSampleStyleSheet()
+
+    # Create custom styles
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.darkblue
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        textColor=colors.darkblue
+    )
+
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6
+    )
+
+    # Build PDF content
+    story = []
+
+    # Title
+    story.append(Paragraph("Student Progress Report", title_style))
+    story.append(Paragraph(f"Course: {data['course']['title']} ({data['course']['code']})", normal_style))
+    story.append(Spacer(1, 20))
+
+    # Student Information
+    story.append(Paragraph("Student Information", heading_style))
+    student_info = [
+        ["Student Name:", data['student']['name']],
+        ["Email:", data['student']['email']],
+        ["Enrollment Number:", data['student']['enrollment_number']],
+        ["Report Generated:", data['generated_at']]
+    ]
+
+    student_table = Table(student_info, colWidths=[2*inch, 3.5*inch])
+    student_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8F4F8')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    story.append(student_table)
+    story.append(Spacer(1, 24))
+
+    # Course Completion Progress
+    story.append(Paragraph("Course Completion Progress", heading_style))
+
+    # Calculate completion status
+    total_credits_needed = data['course'].get('total_credits_required', 144)
+    credits_earned = data['progress']['credits']
+    completion_percentage = (credits_earned / total_credits_needed * 100) if total_credits_needed > 0 else 0
+
+    # Determine overall status
+    if data['assignments']['passed'] and credits_earned >= total_credits_needed:
+        overall_status = "GRADUATED"
+        status_color = colors.green
+    elif data['assignments']['passed']:
+        overall_status = "IN PROGRESS (Passing)"
+        status_color = colors.blue
+    else:
+        overall_status = "IN PROGRESS (Not Passing)"
+        status_color = colors.orange
+
+    completion_data = [
+        ["Overall Status:", overall_status],
+        ["Credits Earned:", f"{credits_earned} / {total_credits_needed} credits ({completion_percentage:.1f}%)"],
+        ["Overall Weighted Percentage:", f"{data['assignments']['weighted_percentage']}%"],
+        ["Academic Standing:", "PASS" if data['assignments']['weighted_percentage'] >= 50 else "FAIL"],
+    ]
+
+    completion_table = Table(completion_data, colWidths=[2.5*inch, 3*inch])
+    completion_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8F4F8')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        # Highlight overall status
+        ('BACKGROUND', (1, 0), (1, 0), colors.HexColor('#FFF9E6')),
+        ('TEXTCOLOR', (1, 0), (1, 0), status_color),
+        ('FONTNAME', (1, 0), (1, 0), 'Helvetica-Bold'),
+        # Highlight academic standing
+        ('TEXTCOLOR', (1, -1), (1, -1), colors.green if data['assignments']['weighted_percentage'] >= 50 else colors.red),
+        ('FONTNAME', (1, -1), (1, -1), 'Helvetica-Bold'),
+    ]))
+    story.append(completion_table)
+    story.append(Spacer(1, 24))
+
+    # Assignment Summary - Recalculate based on actual lesson details (classroom-enrolled only)
+    story.append(Paragraph("Assignment Summary", heading_style))
+
+    # Recalculate assignment statistics from lesson details
+    total_assignments_count = 0
+    graded_assignments_count = 0
+    total_marks_available = 0
+    total_marks_earned = 0
+
+    for lesson_detail in data['assignments']['details']:
+        for assignment_detail in lesson_detail.get('assignment_details', []):
+            total_assignments_count += 1
+            total_marks_available += float(assignment_detail.get('max_marks', 0))
+
+            if assignment_detail.get('marks_awarded') != 'Not graded':
+                graded_assignments_count += 1
+                total_marks_earned += float(assignment_detail.get('marks_awarded', 0))
+
+    ungraded_count = total_assignments_count - graded_assignments_count
+
+    assignment_summary_data = [
+        ["Total Assignments:", f"{total_assignments_count}"],
+        ["Graded Assignments:", f"{graded_assignments_count}"],
+        ["Ungraded Assignments:", f"{ungraded_count}"],
+        ["Total Marks Available:", f"{total_marks_available:.1f}"],
+        ["Marks Earned:", f"{total_marks_earned:.1f}"],
+    ]
+
+    assignment_summary_table = Table(assignment_summary_data, colWidths=[2.5*inch, 3*inch])
+    assignment_summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E8F4F8')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    story.append(assignment_summary_table)
+    story.append(Spacer(1, 24))
+
+    # Lesson-by-Lesson Breakdown
+    if data['assignments']['details']:
+        story.append(Paragraph("Lesson-by-Lesson Breakdown", heading_style))
+        story.append(Spacer(1, 8))
+
+        # Process each lesson's assignments
+        for idx, lesson_detail in enumerate(data['assignments']['details']):
+            lesson_title = lesson_detail.get('lesson_title', 'Unknown Lesson')
+            lesson_code = lesson_detail.get('lesson_code', '')
+            lesson_credits = lesson_detail.get('credits', 0)
+            lesson_weighted_pct = lesson_detail.get('weighted_percentage', 0)
+            lesson_passed = lesson_detail.get('passed', False)
+
+            # Lesson header with status
+            lesson_status = "PASS" if lesson_passed else "FAIL"
+            lesson_status_color = colors.green if lesson_passed else colors.red
+
+            lesson_header_style = ParagraphStyle(
+                'LessonHeader',
+                parent=styles['Normal'],
+                fontSize=11,
+                fontName='Helvetica-Bold',
+                spaceAfter=6,
+                textColor=colors.HexColor('#1e40af')
+            )
+
+            story.append(Paragraph(
+                f"<b>{lesson_code}: {lesson_title}</b> | Credits: {lesson_credits} | Score: {lesson_weighted_pct:.1f}% | Status: <font color='{'green' if lesson_passed else 'red'}'>{lesson_status}</font>",
+                lesson_header_style
+            ))
+
+            if lesson_detail.get('assignment_details'):
+                # Table headers with status column
+                assignment_headers = [
+                    Paragraph("<b>Assignment</b>", ParagraphStyle('HeaderLeft', parent=styles['Normal'], fontSize=9, alignment=TA_LEFT)),
+                    Paragraph("<b>Status</b>", ParagraphStyle('HeaderCenter', parent=styles['Normal'], fontSize=9, alignment=TA_CENTER)),
+                    Paragraph("<b>Marks</b>", ParagraphStyle('HeaderCenter', parent=styles['Normal'], fontSize=9, alignment=TA_CENTER)),
+                    Paragraph("<b>Max</b>", ParagraphStyle('HeaderCenter', parent=styles['Normal'], fontSize=9, alignment=TA_CENTER)),
+                    Paragraph("<b>Weight</b>", ParagraphStyle('HeaderCenter', parent=styles['Normal'], fontSize=9, alignment=TA_CENTER)),
+                    Paragraph("<b>Contribution</b>", ParagraphStyle('HeaderCenter', parent=styles['Normal'], fontSize=9, alignment=TA_CENTER)),
+                ]
+                assignment_data = [assignment_headers]
+
+                # Cell styles
+                table_cell_style = ParagraphStyle(
+                    'TableCell', parent=styles['Normal'], fontSize=8, leading=10, wordWrap='CJK'
+                )
+                table_cell_style_left = ParagraphStyle(
+                    'TableCellLeft', parent=table_cell_style, alignment=TA_LEFT
+                )
+                table_cell_style_center = ParagraphStyle(
+                    'TableCellCenter', parent=table_cell_style, alignment=TA_CENTER
+                )
+
+                # Track graded vs ungraded
+                graded_count = 0
+                ungraded_count = 0
+
+                for assignment in lesson_detail['assignment_details']:
+                    title_par = Paragraph(assignment['title'], table_cell_style_left)
+
+                    # Check if assignment has been graded
+                    if assignment['marks_awarded'] == "Not graded":
+                        ungraded_count += 1
+                        status_par = Paragraph("<font color='orange'><b>Not Graded</b></font>", table_cell_style_center)
+                        marks_par = Paragraph("-", table_cell_style_center)
+                        max_par = Paragraph(f"{float(assignment['max_marks']):.1f}", table_cell_style_center)
+                        weight_par = Paragraph(f"{float(assignment['weightage']):.1f}%", table_cell_style_center)
+                        contrib_par = Paragraph("-", table_cell_style_center)
+
+                        assignment_data.append([
+                            title_par,
+                            status_par,
+                            marks_par,
+                            max_par,
+                            weight_par,
+                            contrib_par,
+                        ])
+                        continue
+
+                    graded_count += 1
+
+                    # Calculate contribution: (marks_awarded / max_marks) * weightage
+                    marks_awarded = float(assignment['marks_awarded'])
+                    max_marks = float(assignment['max_marks'])
+                    weightage = float(assignment['weightage'])
+
+                    if max_marks > 0:
+                        contribution = (marks_awarded / max_marks) * weightage
+                        percentage = (marks_awarded / max_marks) * 100
+                    else:
+                        contribution = 0
+                        percentage = 0
+
+                    # Determine status based on percentage
+                    if percentage >= 50:
+                        status_text = "<font color='green'><b>Pass</b></font>"
+                    else:
+                        status_text = "<font color='red'><b>Fail</b></font>"
+
+                    status_par = Paragraph(status_text, table_cell_style_center)
+
+                    assignment_data.append([
+                        title_par,
+                        status_par,
+                        Paragraph(f"{marks_awarded:.1f}", table_cell_style_center),
+                        Paragraph(f"{max_marks:.1f}", table_cell_style_center),
+                        Paragraph(f"{weightage:.1f}%", table_cell_style_center),
+                        Paragraph(f"{contribution:.2f}%", table_cell_style_center),
+                    ])
+
+                # Calculate total weighted percentage for this lesson (only graded assignments)
+                total_contribution = sum(
+                    (float(a['marks_awarded']) / float(a['max_marks'])) * float(a['weightage'])
+                    if a['marks_awarded'] != "Not graded" and float(a['max_marks']) > 0 else 0
+                    for a in lesson_detail['assignment_details']
+                )
+
+                # Add summary row with graded/ungraded counts
+                summary_style = ParagraphStyle(
+                    'Summary', parent=styles['Normal'], fontSize=9, alignment=TA_LEFT, fontName='Helvetica-Bold'
+                )
+                summary_center_style = ParagraphStyle(
+                    'SummaryCenter', parent=styles['Normal'], fontSize=9, alignment=TA_CENTER, fontName='Helvetica-Bold'
+                )
+
+                assignment_data.append([
+                    Paragraph(f"<b>Summary: {graded_count} Graded, {ungraded_count} Ungraded</b>", summary_style),
+                    '',
+                    '',
+                    '',
+                    Paragraph("<b>Total:</b>", summary_center_style),
+                    Paragraph(f"<b>{total_contribution:.1f}%</b>", summary_center_style),
+                ])
+
+                # Adjusted column widths
+                assignment_table = Table(assignment_data, colWidths=[2.2*inch, 0.9*inch, 0.7*inch, 0.6*inch, 0.7*inch, 1*inch], repeatRows=1)
+                assignment_table.setStyle(TableStyle([
+                    # Header row styling
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, 0), 9),
+                    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+                    ('TOPPADDING', (0, 0), (-1, 0), 8),
+                    ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+                    ('ALIGN', (1, 0), (-1, 0), 'CENTER'),
+
+                    # Data rows styling
+                    ('BACKGROUND', (0, 1), (-1, -2), colors.HexColor('#FEFCE8')),
+                    ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
+                    ('FONTSIZE', (0, 1), (-1, -2), 8),
+                    ('ALIGN', (0, 1), (0, -2), 'LEFT'),
+                    ('ALIGN', (1, 1), (-1, -2), 'CENTER'),
+
+                    # Summary row styling
+                    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#E0E7FF')),
+                    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, -1), (-1, -1), 9),
+                    ('SPAN', (0, -1), (3, -1)),
+                    ('ALIGN', (0, -1), (0, -1), 'LEFT'),
+                    ('ALIGN', (4, -1), (-1, -1), 'CENTER'),
+
+                    # General table styling
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+                    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+                    ('TOPPADDING', (0, 1), (-1, -1), 6),
+                    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+                    ('WORDWRAP', (0, 0), (-1, -1), 'CJK'),
+                ]))
+                story.append(assignment_table)
+                story.append(Spacer(1, 16))
+
+    # Build PDF
+    doc.build(story)
+
+    # Get PDF content
+    pdf_content = buffer.getvalue()
+    buffer.close()
+    return pdf_content
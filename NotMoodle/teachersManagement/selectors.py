@@ -0,0 +1,286 @@
+from collections import defaultdict
+from typing import Iterable, List
+
+from django.db.models import Count, Q, QuerySet
+
+from course_management.models import Course, Enrollment
+from classroom_and_grading.models import AssignmentGrade, ClassroomStudent
+from lesson_management.models import (
+    Assignment, Lesson, LessonEnrollment, ReadingList, ReadingListProgress, VideoProgress,
+)
+from lesson_management.selectors import evaluate_lesson_result
+from student_management.models import ManageCreditPoint, Student
+
+
+def _assignment_detail(assignment, grade):
+    """Per-assignment row for the dashboard; `grade` is (marks_awarded, feedback) or None."""
+    detail = {
+        "title": assignment.title,
+        "marks_awarded": "Not graded",
+        "max_marks": float(assignment.marks),
+        "weightage": float(assignment.weightage),
+        "feedback": "Not graded",
+    }
+    if grade is not None:
+        marks_awarded, feedback = grade
+        if marks_awarded is not None:
+            detail["marks_awarded"] = float(marks_awarded)
+            detail["feedback"] = feedback
+        else:
+            detail["feedback"] = feedback or "Not graded"
+    return detail
+
+
+# Whitelisted ?sort= values for the dashboard JSON API
+COURSE_SORTS = {
+    "code": ("code",),
+    "-code": ("-code",),
+    "title": ("name",),
+    "-title": ("-name",),
+    "enrolled": ("enrolled_count", "code"),
+    "-enrolled": ("-enrolled_count", "code"),
+}
+STUDENT_SORTS = {
+    "name": ("student__last_name", "student__first_name", "pk"),
+    "-name": ("-student__last_name", "-student__first_name", "-pk"),
+    "enrollment_number": ("student__enrollment_number",),
+    "-enrollment_number": ("-student__enrollment_number",),
+    "credits": ("student__credit__credits", "pk"),
+    "-credits": ("-student__credit__credits", "pk"),
+    "enrolled_at": ("enrolled_at", "pk"),
+    "-enrolled_at": ("-enrolled_at", "-pk"),
+}
+
+
+def get_dashboard_metrics() -> dict:
+    """Headline counts shown at the top of the teacher dashboard."""
+    return {
+        "students": Student.objects.count(),
+        "courses": Course.objects.count(),
+        # Count all lessons so new creations reflect immediately regardless of status
+        "totalLessons": Lesson.objects.count(),
+    }
+
+
+def get_course_summaries(q: str = "", status: str = "", sort: str = "code") -> List[dict]:
+    """Course rows (without students) with enrollment counts, filtered and sorted in the database."""
+    courses = Course.objects.annotate(enrolled_count=Count("enrollments"))
+    if q:
+        courses = courses.filter(Q(code__icontains=q) | Q(name__icontains=q))
+    if status:
+        courses = courses.filter(status=status)
+    courses = courses.order_by(*COURSE_SORTS.get(sort, COURSE_SORTS["code"]))
+    return [
+        {
+            "id": course.id,
+            "title": course.name,
+            "code": course.code,
+            "status": course.status,
+            "total_credits_required": course.total_credits_required,
+            "enrolledCount": course.enrolled_count,
+        }
+        for course in courses
+    ]
+
+
+def get_course_enrollments(course_id: int, q: str = "", sort: str = "name") -> QuerySet[Enrollment]:
+    """Enrollments of one course, filtered by name/email/enrollment number and sorted."""
+    enrollments = (
+        Enrollment.objects
+        .filter(course_id=course_id)
+        .select_related("course", "student", "student__user")
+    )
+    if q:
+        match = (
+            Q(student__first_name__icontains=q)
+            | Q(student__last_name__icontains=q)
+            | Q(student__user__email__icontains=q)
+        )
+        if q.isdigit():
+            match |= Q(student__enrollment_number__startswith=q)
+        enrollments = enrollments.filter(match)
+    return enrollments.order_by(*STUDENT_SORTS.get(sort, STUDENT_SORTS["name"]))
+
+
+def get_students_dashboard_data(enrollments: Iterable[Enrollment], details: bool = True) -> List[dict]:
+    """
+    Build dashboard entries for the given enrollments.
+
+    Enrollments must have `student`, `student__user` and `course` loaded. Credits,
+    lesson enrollments, classroom memberships, reading/video progress, assignments
+    and grades are each loaded once for all students, then assembled in memory.
+    With `details`, each entry has its per-lesson and per-assignment breakdown
+    ("lesson_details"); without, only the summary and a "lessonCount".
+    """
+    enrollments = list(enrollments)
+    student_ids = {e.student_id for e in enrollments}
+    if not student_ids:
+        return []
+
+    credits_by_student = dict(
+        ManageCreditPoint.objects.filter(student_id__in=student_ids).values_list("student_id", "credits")
+    )
+
+    # All published lessons each student has taken (core + electives), newest first
+    lessons_by_student = defaultdict(list)
+    lessons = {}
+    for le in (LessonEnrollment.objects
+               .filter(student_id__in=student_ids, lesson__status="published")
+               .select_related("lesson")):
+        lessons_by_student[le.student_id].append(le.lesson_id)
+        lessons[le.lesson_id] = le.lesson
+    lesson_ids = list(lessons)
+
+    in_classroom = set(
+        ClassroomStudent.objects
+        .filter(student_id__in=student_ids, classroom__lesson_id__in=lesson_ids)
+        .values_list("student_id", "classroom__lesson_id")
+    )
+
+    reading_totals = dict(
+        ReadingList.objects.filter(lesson_id__in=lesson_ids)
+        .values("lesson_id").annotate(n=Count("id")).order_by()
+        .values_list("lesson_id", "n")
+    )
+    readings_done = {
+        (row["student_id"], row["reading__lesson_id"]): row["n"]
+        for row in (ReadingListProgress.objects
+                    .filter(student_id__in=student_ids, reading__lesson_id__in=lesson_ids, done=True)
+                    .values("student_id", "reading__lesson_id").annotate(n=Count("id")).order_by())
+    }
+    videos_watched = set(
+        VideoProgress.objects
+        .filter(student_id__in=student_ids, lesson_id__in=lesson_ids, watched=True)
+        .values_list("student_id", "lesson_id")
+    )
+
+    assignments_by_lesson = defaultdict(list)
+    for a in Assignment.objects.filter(lesson_id__in=lesson_ids):
+        assignments_by_lesson[a.lesson_id].append(a)
+
+    # Feedback is only shown in the per-assignment breakdown
+    grade_fields = ("marks_awarded", "feedback") if details else ("marks_awarded",)
+    grades = {
+        (student_id, assignment_id): (marks_awarded, *feedback)
+        for student_id, assignment_id, marks_awarded, *feedback in (
+            AssignmentGrade.objects
+            .filter(student_id__in=student_ids, assignment__lesson_id__in=lesson_ids)
+            .values_list("student_id", "assignment_id", *grade_fields)
+        )
+    }
+
+    return [
+        _build_student_data(
+            enrollment.student,
+            enrollment.course.code,
+            lessons_by_student[enrollment.student_id],
+            lessons=lessons,
+            in_classroom=in_classroom,
+            reading_totals=reading_totals,
+            readings_done=readings_done,
+            videos_watched=videos_watched,
+            assignments_by_lesson=assignments_by_lesson,
+            grades=grades,
+            credits=credits_by_student.get(enrollment.student_id, 0),
+            details=details,
+        )
+        for enrollment in enrollments
+    ]
+
+
+def _build_student_data(student, course_code, lesson_ids, *, lessons, in_classroom, reading_totals, readings_done,
+                        videos_watched, assignments_by_lesson, grades, credits, details=True):
+    """Assemble one student's dashboard entry from the preloaded maps (no queries)."""
+    total_progress = 0
+    total_marks = 0
+    total_earned_marks = 0
+    total_assignments = 0
+    graded_assignments = 0
+    lesson_details = []
+
+    for lesson_id in lesson_ids:
+        # Skip lessons where student is not in a classroom
+        if (student.id, lesson_id) not in in_classroom:
+            continue
+        lesson = lessons[lesson_id]
+
+        lesson_total_items = reading_totals.get(lesson_id, 0)
+        lesson_completed = readings_done.get((student.id, lesson_id), 0)
+        if lesson.youtube_link:
+            lesson_total_items += 1
+            lesson_completed += 1 if (student.id, lesson_id) in videos_watched else 0
+        lesson_progress_pct = int((lesson_completed / lesson_total_items) * 100) if lesson_total_items else 0
+        total_progress += lesson_progress_pct
+
+        assignments = assignments_by_lesson[lesson_id]
+        total_assignments += len(assignments)
+        lesson_total_marks = 0
+        lesson_earned_marks = 0
+        lesson_graded_assignments = 0
+        lesson_assignment_details = []
+        marks_by_assignment = {}
+
+        for assignment in assignments:
+            lesson_total_marks += float(assignment.marks)
+            grade = grades.get((student.id, assignment.id))
+            if grade is not None and grade[0] is not None:
+                lesson_earned_marks += float(grade[0])
+                lesson_graded_assignments += 1
+                marks_by_assignment[assignment.id] = grade[0]
+            if details:
+                lesson_assignment_details.append(_assignment_detail(assignment, grade))
+
+        # Graded assignments only count towards a weighted score when the lesson has weightage
+        if sum(float(a.weightage) for a in assignments) > 0:
+            graded_assignments += sum(
+                1 for a in assignments if a.id in marks_by_assignment and a.marks > 0
+            )
+
+        total_marks += lesson_total_marks
+        total_earned_marks += lesson_earned_marks
+
+        lesson_passed, lesson_percentage, _ = evaluate_lesson_result(
+            [{"id": a.id, "marks": a.marks, "weightage": a.weightage} for a in assignments],
+            marks_by_assignment,
+        )
+
+        lesson_details.append({
+            "lesson_title": lesson.title,
+            "lesson_code": lesson.unit_code,
+            "progress_pct": lesson_progress_pct,
+            "credits": getattr(lesson, "lesson_credits", 0) or 0,
+            "total_marks": lesson_total_marks,
+            "earned_marks": lesson_earned_marks,
+            "graded_assignments": lesson_graded_assignments,
+            "total_assignments": len(assignments),
+            "weighted_percentage": float(lesson_percentage),
+            "passed": lesson_passed,
+            "assignment_details": lesson_assignment_details,
+        })
+
+    # Overall averages (only for classroom-enrolled lessons)
+    num_classroom_lessons = len(lesson_details)
+    avg_progress = int(total_progress / num_classroom_lessons) if num_classroom_lessons > 0 else 0
+    total_weighted_percentage = sum(ld["weighted_percentage"] for ld in lesson_details)
+    overall_weighted_percentage = total_weighted_percentage / num_classroom_lessons if num_classroom_lessons > 0 else 0
+
+    student_data = {
+        "id": student.id,
+        "name": student.full_name(),
+        "email": student.user.email if student.user else "",
+        "enrollment_number": student.enrollment_number,
+        "course_code": course_code,
+        "progressPct": avg_progress,
+        "credits": credits,  # Actual awarded credits from ManageCreditPoint
+        "total_marks": total_marks,
+        "earned_marks": total_earned_marks,
+        "total_assignments": total_assignments,
+        "graded_assignments": graded_assignments,
+        "weighted_percentage": round(overall_weighted_percentage, 1),
+        "passed": overall_weighted_percentage >= 50,
+    }
+    if details:
+        student_data["lesson_details"] = lesson_details
+    else:
+        student_data["lessonCount"] = num_classroom_lessons
+    return student_data
@@ -0,0 +1,14 @@
+"""Background job handlers for teachersManagement."""
+from django.core.files.base import ContentFile
+
+from jobs.registry import task
+from .reports import build_student_report_pdf, report_filename
+
+
+@task("teachersManagement.student_report")
+def student_report(job, data):
+    """Build a student progress PDF and attach it to the job."""
+    job.set_progress(10, "Building report")
+    pdf_content = build_student_report_pdf(data)
+    job.result_file.save(report_filename(data), ContentFile(pdf_content), save=False)
+    return {"filename": report_filename(data), "size": len(pdf_content)}
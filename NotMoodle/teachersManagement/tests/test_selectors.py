@@ -0,0 +1,87 @@
+"""
+Tests for teachersManagement selectors (teacher dashboard data builders)
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from course_management.models import Enrollment
+from lesson_management.models import Assignment, LessonEnrollment
+from classroom_and_grading.models import AssignmentGrade, ClassroomStudent
+from student_management.models import Student
+from teachersManagement.selectors import get_course_enrollments, get_students_dashboard_data
+
+
+def enroll_graded_student(course, lesson, classroom, assignment, marks):
+    student = baker.make(Student, user=baker.make(User), date_of_birth=date(2000, 1, 1))
+    Enrollment.objects.create(student=student, course=course, enrolled_by="teacher")
+    LessonEnrollment.objects.create(student=student, lesson=lesson)
+    ClassroomStudent.objects.create(classroom=classroom, student=student)
+    AssignmentGrade.objects.create(assignment=assignment, student=student, marks_awarded=Decimal(marks))
+    return student
+
+
+@pytest.mark.django_db
+class TestStudentsDashboardData:
+    """Test get_students_dashboard_data"""
+
+    @pytest.fixture
+    def graded_assignment(self, lesson):
+        return baker.make(
+            Assignment,
+            lesson=lesson,
+            marks=Decimal("100"),
+            weightage=Decimal("100"),
+            release_date=timezone.now(),
+            due_date=timezone.now(),
+        )
+
+    def test_student_lesson_breakdown(self, course, lesson, classroom, graded_assignment):
+        """Student entries carry per-lesson grades and pass status"""
+        student = enroll_graded_student(course, lesson, classroom, graded_assignment, "70")
+
+        student_data, = get_students_dashboard_data(get_course_enrollments(course.id))
+
+        assert student_data["id"] == student.id
+        assert student_data["course_code"] == course.code
+        assert student_data["weighted_percentage"] == 70.0
+        assert student_data["passed"] is True
+        lesson_data = student_data["lesson_details"][0]
+        assert lesson_data["lesson_code"] == lesson.unit_code
+        assert lesson_data["assignment_details"][0]["marks_awarded"] == 70.0
+
+    def test_skips_lessons_without_classroom(self, course, lesson, student, enrollment, lesson_enrollment):
+        """Lessons the student is not rostered into are left out"""
+        student_data, = get_students_dashboard_data(get_course_enrollments(course.id))
+
+        assert student_data["lesson_details"] == []
+        assert student_data["progressPct"] == 0
+
+    def test_query_count_flat_in_students(self, course, lesson, classroom, graded_assignment):
+        """Adding students does not add queries"""
+        enroll_graded_student(course, lesson, classroom, graded_assignment, "40")
+        with CaptureQueriesContext(connection) as few:
+            get_students_dashboard_data(get_course_enrollments(course.id))
+
+        for _ in range(5):
+            enroll_graded_student(course, lesson, classroom, graded_assignment, "60")
+        with CaptureQueriesContext(connection) as many:
+            data = get_students_dashboard_data(get_course_enrollments(course.id))
+
+        assert len(many) == len(few)
+        assert len(data) == 6
+
+    def test_summary_without_details(self, course, lesson, classroom, graded_assignment):
+        """Without details, entries carry the same summary and a lesson count but no breakdown"""
+        enroll_graded_student(course, lesson, classroom, graded_assignment, "70")
+
+        summary, = get_students_dashboard_data(get_course_enrollments(course.id), details=False)
+        full, = get_students_dashboard_data(get_course_enrollments(course.id))
+
+        assert "lesson_details" not in summary
+        assert summary["lessonCount"] == 1
+        assert summary == {**{k: v for k, v in full.items() if k != "lesson_details"}, "lessonCount": 1}
@@ -109,3 +109,60 @@ class TestTeacherLessonManagement:
         url = reverse('teachersManagement:lessons:list')
         response = client.get(url)
         assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestTeacherDashboardApi:
+    """Test the lazily loaded teacher dashboard JSON API"""
+
+    def test_courses_api_filters_by_query(self, client, teacher_user, teacher, course):
+        """Courses endpoint returns summaries matching ?q="""
+        client.force_login(teacher_user)
+        url = reverse('teachersManagement:dashboard_courses_api')
+
+        response = client.get(url, {'q': course.code})
+        assert response.status_code == 200
+        data = response.json()
+        assert [c['id'] for c in data['courses']] == [course.id]
+        assert 'students' not in data['courses'][0]
+
+        response = client.get(url, {'q': 'no-such-course'})
+        assert response.json()['courses'] == []
+
+    def test_students_api_paginates(self, client, teacher_user, teacher, course):
+        """Students endpoint pages enrollments without lesson details"""
+        from datetime import date
+        from model_bakery import baker
+        for i in range(3):
+            student = baker.make(Student, last_name=f"Student{i}", date_of_birth=date(2000, 1, 1))
+            Enrollment.objects.create(student=student, course=course, enrolled_by="teacher")
+        client.force_login(teacher_user)
+        url = reverse('teachersManagement:dashboard_course_students_api', args=[course.id])
+
+        response = client.get(url, {'page_size': 2, 'sort': 'name'})
+        data = response.json()
+        assert data['count'] == 3
+        assert data['has_next'] is True
+        assert [s['name'].split()[-1] for s in data['students']] == ['Student0', 'Student1']
+        assert 'lesson_details' not in data['students'][0]
+
+        response = client.get(url, {'page_size': 2, 'page': 2})
+        assert len(response.json()['students']) == 1
+
+    def test_student_lessons_api(self, client, teacher_user, teacher, course, student, enrollment):
+        """Student endpoint returns the full per-lesson breakdown"""
+        client.force_login(teacher_user)
+        url = reverse('teachersManagement:dashboard_student_lessons_api', args=[course.id, student.id])
+
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.json()['student']['lesson_details'] == []
+
+        other = reverse('teachersManagement:dashboard_student_lessons_api', args=[course.id, student.id + 999])
+        assert client.get(other).status_code == 404
+
+    def test_api_requires_teacher(self, client, user, course):
+        """Non-teachers are redirected away from the API"""
+        client.force_login(user)
+        response = client.get(reverse('teachersManagement:dashboard_courses_api'))
+        assert response.status_code == 302
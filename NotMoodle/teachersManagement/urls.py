@@ -14,4 +14,16 @@ urlpatterns = [
     path("students/status/", views.StudentStatusListView.as_view(), name="student_status_list"),
     path("students/status/<int:pk>/", views.StudentStatusUpdateView.as_view(), name="student_status_edit"),
     path("generate-student-report/", views.generate_student_report, name="generate_student_report"),
+    # Lazily loaded dashboard data
+    path("api/dashboard/courses/", views.dashboard_courses_api, name="dashboard_courses_api"),
+    path(
+        "api/dashboard/courses/<int:course_id>/students/",
+        views.dashboard_course_students_api,
+        name="dashboard_course_students_api",
+    ),
+    path(
+        "api/dashboard/courses/<int:course_id>/students/<int:student_id>/",
+        views.dashboard_student_lessons_api,
+        name="dashboard_student_lessons_api",
+    ),
 ]